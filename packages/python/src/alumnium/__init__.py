@@ -6,14 +6,34 @@ from .logutils import configure_logging, get_logger
 logger: logging.Logger = get_logger(__name__)
 logger.addHandler(logging.NullHandler())
 
+CASSETTE = getenv("ALUMNIUM_CASSETTE", "none").lower()
+CASSETTE_PATH = getenv("ALUMNIUM_CASSETTE_PATH")
 CHANGE_ANALYSIS = getenv("ALUMNIUM_CHANGE_ANALYSIS", "false").lower() == "true"
 DELAY = float(getenv("ALUMNIUM_DELAY", 0.5))
 EXCLUDE_ATTRIBUTES = set(filter(None, getenv("ALUMNIUM_EXCLUDE_ATTRIBUTES", "").split(",")))
 FULL_PAGE_SCREENSHOT = getenv("ALUMNIUM_FULL_PAGE_SCREENSHOT", "false").lower() == "true"
+LOCAL_FAST_PATH = getenv("ALUMNIUM_LOCAL_FAST_PATH", "false").lower() == "true"
 PLANNER = getenv("ALUMNIUM_PLANNER", "true").lower() == "true"
+RECHECK_ON_CHANGE = getenv("ALUMNIUM_RECHECK_ON_CHANGE", "false").lower() == "true"
 RETRIES = int(getenv("ALUMNIUM_RETRIES", 2))
+SCREENSHOT_FORMAT = getenv("ALUMNIUM_SCREENSHOT_FORMAT", "png").lower()
+SCREENSHOT_GRAYSCALE = getenv("ALUMNIUM_SCREENSHOT_GRAYSCALE", "false").lower() == "true"
+SCREENSHOT_MAX_HEIGHT = int(getenv("ALUMNIUM_SCREENSHOT_MAX_HEIGHT", 0))
+SCREENSHOT_MAX_WIDTH = int(getenv("ALUMNIUM_SCREENSHOT_MAX_WIDTH", 0))
+SCREENSHOT_QUALITY = int(getenv("ALUMNIUM_SCREENSHOT_QUALITY", 80))
+SERVER_SHARED = getenv("ALUMNIUM_SERVER_SHARED", "false").lower() == "true"
+SERVER_SOCKET = getenv("ALUMNIUM_SERVER_SOCKET", "false").lower() == "true"
+
+# Formats supported by Page.captureScreenshot
+SCREENSHOT_FORMATS = ("png", "jpeg", "webp")
+if SCREENSHOT_FORMAT not in SCREENSHOT_FORMATS:
+    raise ValueError(
+        f"Unsupported ALUMNIUM_SCREENSHOT_FORMAT '{SCREENSHOT_FORMAT}', expected {', '.join(SCREENSHOT_FORMATS)}"
+    )
 
 configure_logging()
 
 from .alumni import *
+from .codegen import generate_code
 from .models import Model, Provider
+from .parallel import Parallel
@@ -1,9 +1,15 @@
 from abc import ABC, abstractmethod
+from xml.etree.ElementTree import fromstring
 
 from .accessibility_element import AccessibilityElement
+from .fingerprints import compute_fingerprints, match_fingerprint
 
 
 class BaseAccessibilityTree(ABC):
+    _fingerprints: dict[int, str] | None = None
+    # Identifies the page state the tree was captured from, see BaseDriver.refresh_accessibility_tree()
+    change_token: str | None = None
+
     @abstractmethod
     def to_str(self) -> str:
         pass
@@ -15,3 +21,28 @@ class BaseAccessibilityTree(ABC):
     @abstractmethod
     def scope_to_area(self, raw_id: int) -> "BaseAccessibilityTree":
         pass
+
+    @property
+    def fingerprints(self) -> dict[int, str]:
+        """Mapping of raw IDs to fingerprints that identify elements across snapshots."""
+        # Trees compute fingerprints during serialization, when elements are already built
+        raw_xml = self.to_str()
+        if self._fingerprints is None:
+            roots = list(fromstring(f"<root>{raw_xml}</root>")) if raw_xml else []
+            self._fingerprints = compute_fingerprints(roots)
+        return self._fingerprints
+
+    def fingerprint(self, raw_id: int) -> str:
+        """
+        Returns the fingerprint of the element, which unlike its raw ID survives changes elsewhere in the tree.
+
+        Raises:
+            KeyError: If the element is not found.
+        """
+        if raw_id not in self.fingerprints:
+            raise KeyError(f"No element with raw_id {raw_id} found")
+        return self.fingerprints[raw_id]
+
+    def raw_id_by_fingerprint(self, fingerprint: str) -> int | None:
+        """Returns the raw ID of the element with the fingerprint taken from this or an earlier snapshot."""
+        return match_fingerprint(fingerprint, self.fingerprints)
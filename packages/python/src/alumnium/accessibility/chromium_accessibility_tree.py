@@ -2,6 +2,7 @@ from xml.etree.ElementTree import Element, fromstring, indent, tostring
 
 from .accessibility_element import AccessibilityElement
 from .base_accessibility_tree import BaseAccessibilityTree
+from .fingerprints import compute_fingerprints
 
 
 class ChromiumAccessibilityTree(BaseAccessibilityTree):
@@ -13,12 +14,18 @@ class ChromiumAccessibilityTree(BaseAccessibilityTree):
         self._frame_chain_map: dict[int, list[int]] = {}  # raw_id -> frame chain (list of iframe backendNodeIds)
 
     @classmethod
-    def _from_xml(cls, xml_string: str, frame_map: dict[int, object] | None = None) -> "ChromiumAccessibilityTree":
+    def _from_xml(
+        cls,
+        xml_string: str,
+        frame_map: dict[int, object] | None = None,
+        fingerprints: dict[int, str] | None = None,
+    ) -> "ChromiumAccessibilityTree":
         """Create a ChromiumAccessibilityTree instance from pre-computed XML."""
         instance = cls(cdp_response={})
         instance._raw = xml_string
         if frame_map:
             instance._frame_map = frame_map
+        instance._fingerprints = fingerprints
         return instance
 
     def to_str(self) -> str:
@@ -29,6 +36,7 @@ class ChromiumAccessibilityTree(BaseAccessibilityTree):
         nodes = self.cdp_response.get("nodes", [])
         if not nodes:
             self._raw = ""
+            self._fingerprints = {}
             return self._raw
 
         # Create a lookup table for nodes by their ID
@@ -52,6 +60,7 @@ class ChromiumAccessibilityTree(BaseAccessibilityTree):
         for node in true_roots:
             xml_node = self._node_to_xml(node, node_lookup, iframe_children)
             root_nodes.append(xml_node)
+        self._fingerprints = compute_fingerprints(root_nodes)
 
         # Combine all root nodes into a single XML string
         xml_string = ""
@@ -200,4 +209,7 @@ class ChromiumAccessibilityTree(BaseAccessibilityTree):
         indent(target_elem)
         scoped_xml = tostring(target_elem, encoding="unicode")
 
-        return self._from_xml(scoped_xml, self._frame_map)
+        # Raw IDs are kept in the scoped tree, so fingerprints from the whole tree stay valid
+        scoped_ids = {int(elem.get("raw_id", 0)) for elem in target_elem.iter()}
+        fingerprints = {raw_id: fp for raw_id, fp in self.fingerprints.items() if raw_id in scoped_ids}
+        return self._from_xml(scoped_xml, self._frame_map, fingerprints)
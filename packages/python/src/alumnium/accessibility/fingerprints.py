@@ -0,0 +1,74 @@
+from collections import Counter
+from hashlib import sha1
+from xml.etree.ElementTree import Element
+
+# Attributes naming an element on different platforms, in order of preference
+NAME_ATTRIBUTES = ("name", "text", "content-desc", "label")
+# Attributes holding node IDs that are stable while the page is not reloaded
+STABLE_ID_ATTRIBUTES = ("backendDOMNodeId",)
+
+
+def compute_fingerprints(roots: list[Element]) -> dict[int, str]:
+    """
+    Computes fingerprints of elements serialized with raw_id attributes.
+
+    Unlike raw IDs, fingerprints do not depend on the number of elements before the element,
+    so they survive insertion and removal of unrelated elements and can be matched across snapshots.
+    A fingerprint is a hash of the element role and name, the roles and names of its ancestors,
+    and the position among siblings with the same role and name. When a node ID that is stable
+    within the page is available, it is appended to the fingerprint after `@`.
+
+    Args:
+        roots: Root elements of the serialized tree.
+
+    Returns:
+        Mapping of raw IDs to fingerprints.
+    """
+    fingerprints: dict[int, str] = {}
+
+    def visit(elem: Element, path: str):
+        raw_id = elem.get("raw_id")
+        if raw_id is not None:
+            fingerprint = sha1(path.encode()).hexdigest()[:16]
+            stable_id = next((elem.get(attr) for attr in STABLE_ID_ATTRIBUTES if elem.get(attr)), None)
+            fingerprints[int(raw_id)] = f"{fingerprint}@{stable_id}" if stable_id else fingerprint
+
+        seen: Counter[str] = Counter()
+        for child in elem:
+            key = _key(child)
+            seen[key] += 1
+            visit(child, f"{path}/{key}#{seen[key]}")
+
+    seen: Counter[str] = Counter()
+    for root in roots:
+        # Root names are page titles or application names, which are not specific to elements
+        key = _role(root)
+        seen[key] += 1
+        visit(root, f"{key}#{seen[key]}")
+
+    return fingerprints
+
+
+def match_fingerprint(fingerprint: str, fingerprints: dict[int, str]) -> int | None:
+    """
+    Finds the raw ID of the element with the fingerprint, possibly computed for another snapshot.
+    Elements are matched by their position and texts first, and by their stable node IDs otherwise.
+    """
+    path_hash, _, stable_id = fingerprint.partition("@")
+    by_stable_id = None
+    for raw_id, candidate in fingerprints.items():
+        candidate_hash, _, candidate_stable_id = candidate.partition("@")
+        if candidate_hash == path_hash:
+            return raw_id
+        if stable_id and candidate_stable_id == stable_id:
+            by_stable_id = raw_id
+    return by_stable_id
+
+
+def _role(elem: Element) -> str:
+    return elem.get("type") or elem.get("class") or elem.tag
+
+
+def _key(elem: Element) -> str:
+    name = next((elem.get(attr) for attr in NAME_ATTRIBUTES if elem.get(attr)), "")
+    return f"{_role(elem)}[{name}]"
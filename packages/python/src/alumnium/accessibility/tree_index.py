@@ -0,0 +1,169 @@
+import re
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from xml.etree.ElementTree import Element, fromstring
+
+from .base_accessibility_tree import BaseAccessibilityTree
+
+# Platform-specific roles mapped to their web counterparts
+ROLE_ALIASES = {
+    "edittext": "textbox",
+    "imagebutton": "button",
+    "imageview": "image",
+    "img": "image",
+    "radiobutton": "radio",
+    "searchbox": "textbox",
+    "searchfield": "textbox",
+    "securetextfield": "textbox",
+    "statictext": "text",
+    "textfield": "textbox",
+    "textview": "text",
+}
+
+# Words in element descriptions referring to roles
+ROLE_WORDS = {
+    "button": "button",
+    "checkbox": "checkbox",
+    "field": "textbox",
+    "heading": "heading",
+    "image": "image",
+    "input": "textbox",
+    "link": "link",
+    "option": "option",
+    "radio": "radio",
+    "switch": "switch",
+    "tab": "tab",
+    "textbox": "textbox",
+}
+STOP_WORDS = {"a", "an", "called", "for", "in", "labeled", "labelled", "named", "of", "on", "the", "titled", "with"}
+FUZZY_RATIO = 0.8
+
+
+@dataclass
+class IndexedNode:
+    raw_id: int
+    role: str
+    name: str = ""
+    label: str = ""
+    value: str = ""
+    parent_raw_id: int | None = None
+    display_name: str = ""  # name as shown on the page, before normalization
+
+    @property
+    def texts(self) -> list[str]:
+        return [text for text in (self.name, self.label, self.value) if text]
+
+
+class TreeIndex:
+    """
+    Lookup of accessibility tree nodes by their role and texts, used to answer simple queries
+    on the client without sending the tree to the server.
+    """
+
+    def __init__(self, nodes: list[IndexedNode]):
+        self.nodes = nodes
+
+    @classmethod
+    def from_tree(cls, tree: BaseAccessibilityTree) -> "TreeIndex":
+        raw_xml = tree.to_str()
+        if not raw_xml:
+            return cls([])
+
+        nodes: list[IndexedNode] = []
+
+        def visit(elem: Element, parent_raw_id: int | None):
+            raw_id = elem.get("raw_id")
+            if raw_id is not None and elem.get("ignored") != "true":
+                name = elem.get("name") or elem.get("text") or elem.get("content-desc") or ""
+                nodes.append(
+                    IndexedNode(
+                        raw_id=int(raw_id),
+                        role=_role(elem),
+                        name=normalize(name),
+                        label=normalize(elem.get("label") or elem.get("content-desc") or ""),
+                        value=normalize(elem.get("value") or elem.get("text") or ""),
+                        parent_raw_id=parent_raw_id,
+                        display_name=" ".join(name.split()),
+                    )
+                )
+                parent_raw_id = int(raw_id)
+            for child in elem:
+                visit(child, parent_raw_id)
+
+        visit(fromstring(f"<root>{raw_xml}</root>"), None)
+        return cls(nodes)
+
+    def by_raw_id(self, raw_id: int) -> IndexedNode | None:
+        return next((node for node in self.nodes if node.raw_id == raw_id), None)
+
+    def with_text(self, text: str) -> list[IndexedNode]:
+        """Returns nodes containing the text in their name, label or value, as whole words."""
+        words = _tokenize(text)
+        if not words:
+            return []
+        return [node for node in self.nodes if any(_contains_words(_tokenize(t), words) for t in node.texts)]
+
+    def with_role_and_name(self, role: str, name: str) -> list[IndexedNode]:
+        """Returns nodes of the role whose name, label or value is exactly the name."""
+        role, name = canonical_role(role), normalize(name)
+        return [node for node in self.nodes if node.role == role and name in node.texts]
+
+    def resolve(self, description: str) -> IndexedNode | None:
+        """
+        Finds the only node matching an element description such as 'Submit button' or 'search field'.
+        Description words other than roles must match the node texts, exactly or with minor typos.
+
+        Returns:
+            The matching node, or None if there is no match or the description is ambiguous.
+        """
+        words = _tokenize(description)
+        roles = {ROLE_WORDS[word] for word in words if word in ROLE_WORDS}
+        name_words = [word for word in words if word not in ROLE_WORDS and word not in STOP_WORDS]
+        if len(roles) > 1 or not name_words:
+            return None
+
+        candidates = [node for node in self.nodes if not roles or node.role in roles]
+        exact = [node for node in candidates if any(_tokenize(text) == name_words for text in node.texts)]
+        matches = exact or [node for node in candidates if _fuzzy_match(name_words, node)]
+
+        # Texts of elements are often repeated by their children (e.g. StaticText of buttons)
+        matched_ids = {node.raw_id for node in matches}
+        matches = [node for node in matches if node.parent_raw_id not in matched_ids]
+        return matches[0] if len(matches) == 1 else None
+
+
+def normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+def canonical_role(role: str) -> str:
+    role = role.replace(" ", "").casefold()
+    return ROLE_ALIASES.get(role, role)
+
+
+def _role(elem: Element) -> str:
+    # XCUITest
+    if element_type := elem.get("type"):
+        return canonical_role(element_type.removeprefix("XCUIElementType"))
+    # UIAutomator2
+    if element_class := elem.get("class"):
+        return canonical_role(element_class.rsplit(".", 1)[-1])
+    # Chromium
+    return canonical_role(elem.tag)
+
+
+def _tokenize(text: str) -> list[str]:
+    return re.findall(r"\w+", text.casefold())
+
+
+def _contains_words(text_words: list[str], words: list[str]) -> bool:
+    return any(text_words[start : start + len(words)] == words for start in range(len(text_words) - len(words) + 1))
+
+
+def _fuzzy_match(words: list[str], node: IndexedNode) -> bool:
+    node_words = {word for text in node.texts for word in _tokenize(text)}
+    return all(
+        word in node_words
+        or any(SequenceMatcher(None, word, node_word).ratio() >= FUZZY_RATIO for node_word in node_words)
+        for word in words
+    )
@@ -3,6 +3,7 @@ from xml.etree.ElementTree import Element, fromstring, indent, tostring
 
 from .accessibility_element import AccessibilityElement
 from .base_accessibility_tree import BaseAccessibilityTree
+from .fingerprints import compute_fingerprints
 
 
 class UIAutomator2AccessibilityTree(BaseAccessibilityTree):
@@ -29,6 +30,7 @@ class UIAutomator2AccessibilityTree(BaseAccessibilityTree):
 
         # Add raw_id attributes recursively
         self._add_raw_ids(root)
+        self._fingerprints = compute_fingerprints([root])
 
         # Serialize back to string
         indent(root)
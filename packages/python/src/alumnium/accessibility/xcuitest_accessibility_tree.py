@@ -2,6 +2,7 @@ from xml.etree.ElementTree import Element, fromstring, indent, tostring
 
 from .accessibility_element import AccessibilityElement
 from .base_accessibility_tree import BaseAccessibilityTree
+from .fingerprints import compute_fingerprints
 
 
 class XCUITestAccessibilityTree(BaseAccessibilityTree):
@@ -20,6 +21,7 @@ class XCUITestAccessibilityTree(BaseAccessibilityTree):
 
         # Add raw_id attributes recursively
         self._add_raw_ids(root)
+        self._fingerprints = compute_fingerprints([root])
 
         # Serialize back to string
         indent(root)
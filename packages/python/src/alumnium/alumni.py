@@ -1,26 +1,40 @@
+from __future__ import annotations
+
+import sys
 from asyncio import AbstractEventLoop
+from dataclasses import replace
+from functools import partial
 from os import getenv
+from time import perf_counter
+from typing import TYPE_CHECKING
 
-from appium.webdriver.webdriver import WebDriver as Appium
-from playwright.async_api import Page as PageAsync
-from playwright.sync_api import Page
-from retry import retry
-from selenium.webdriver.remote.webdriver import WebDriver
+from retry import retry, retry_call
 
-from . import CHANGE_ANALYSIS, DELAY, EXCLUDE_ATTRIBUTES, PLANNER, RETRIES
+from . import CHANGE_ANALYSIS, DELAY, EXCLUDE_ATTRIBUTES, LOCAL_FAST_PATH, PLANNER, RECHECK_ON_CHANGE, RETRIES
+from .accessibility.base_accessibility_tree import BaseAccessibilityTree
 from .area import Area
+from .batch import check_all, retrieve_all
 from .cache import Cache
 from .clients.http_client import HttpClient
 from .clients.typecasting import Data
-from .drivers import Element
-from .drivers.appium_driver import AppiumDriver
-from .drivers.playwright_async_driver import PlaywrightAsyncDriver
-from .drivers.playwright_driver import PlaywrightDriver
-from .drivers.selenium_driver import SeleniumDriver
+from .drivers.base_driver import BaseDriver
+from .drivers.page_state import PageState
+from .fast_path import LocalFastPath
 from .logutils import get_logger
 from .models import Model
-from .result import DoResult, DoStep
+from .result import CheckResult, DoResult, WaitResult
+from .step_executor import StepExecutor
+from .telemetry import set_attributes
+from .timings import TimingStats, current, phase, timed
 from .tools import BaseTool
+from .wait import poll_until, recheck_while_changing
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page as PageAsync
+    from playwright.sync_api import Page
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+    from .drivers import Element
 
 logger = get_logger(__name__)
 
@@ -35,24 +49,17 @@ class Alumni:
         planner: bool | None = None,
         change_analysis: bool | None = None,
         exclude_attributes: set[str] | None = None,
+        recheck_on_change: bool | None = None,
+        local_fast_path: bool | None = None,
     ):
         planner = planner if planner is not None else PLANNER
         self.change_analysis = change_analysis if change_analysis is not None else CHANGE_ANALYSIS
+        self.recheck_on_change = recheck_on_change if recheck_on_change is not None else RECHECK_ON_CHANGE
+        self.fast_path = LocalFastPath(local_fast_path if local_fast_path is not None else LOCAL_FAST_PATH)
+        self.timings = TimingStats()
         exclude_attributes = exclude_attributes if exclude_attributes is not None else EXCLUDE_ATTRIBUTES
 
-        if isinstance(driver, Appium):
-            self.driver = AppiumDriver(driver)
-        elif isinstance(driver, Page):
-            self.driver = PlaywrightDriver(driver)
-        elif (
-            isinstance(driver, tuple) and isinstance(driver[0], PageAsync) and isinstance(driver[1], AbstractEventLoop)
-        ):
-            # Asynchronous Playwright driver requires a shared event loop
-            self.driver = PlaywrightAsyncDriver(driver[0], driver[1])
-        elif isinstance(driver, WebDriver):
-            self.driver = SeleniumDriver(driver)
-        else:
-            raise NotImplementedError(f"Driver {driver} not implemented")
+        self.driver = self._build_driver(driver)
 
         self.tools = {}
         for tool in self.driver.supported_tools | set(extra_tools or []):
@@ -82,39 +89,41 @@ class Alumni:
         self.client.quit()
         self.driver.quit()
 
-    @retry(tries=RETRIES, delay=DELAY, logger=logger)  # pyright: ignore[reportArgumentType]
+    @timed("do")
     def do(self, goal: str) -> DoResult:
         """
         Executes a series of steps to achieve the given goal.
 
+        A failing step is retried on its own without repeating the steps that already succeeded.
+
         Args:
             goal: The goal to be achieved.
 
         Returns:
-            DoResult containing the explanation and executed steps with their actions.
+            DoResult containing the explanation and executed steps with their actions, attempts and timings.
         """
+        started = perf_counter()
         app = self.driver.app
-        initial_accessibility_tree = self.driver.accessibility_tree
+        initial_accessibility_tree = self._capture_accessibility_tree()
         before_tree = initial_accessibility_tree.to_str() if self.change_analysis else None
         before_url = self.driver.url if self.change_analysis else None
-        explanation, steps = self.client.plan_actions(goal, initial_accessibility_tree.to_str(), app=app)
-
-        executed_steps = []
-        for idx, step in enumerate(steps):
-            # If the step is the first step, use the initial accessibility tree.
-            accessibility_tree = initial_accessibility_tree if idx == 0 else self.driver.accessibility_tree
-            actor_explanation, actions = self.client.execute_action(goal, step, accessibility_tree.to_str(), app=app)
-
-            # When planner is off, explanation is just the goal — replace with actor's reasoning.
-            if explanation == goal:
-                explanation = actor_explanation
-
-            called_tools = []
-            for tool_call in actions:
-                called_tool = BaseTool.execute_tool_call(tool_call, self.tools, self.driver)
-                called_tools.append(called_tool)
+        explanation, steps = retry_call(
+            self.client.plan_actions,
+            fargs=[goal, initial_accessibility_tree.to_str()],
+            fkwargs={"app": app},
+            tries=RETRIES,
+            delay=DELAY,
+            logger=logger,  # pyright: ignore[reportArgumentType]
+        )
 
-            executed_steps.append(DoStep(name=step, tools=called_tools))
+        executor = StepExecutor(
+            self.client,
+            self.driver,
+            self.tools,
+            self._capture_accessibility_tree,
+            refresh_accessibility_tree=self._capture_accessibility_tree,
+        )
+        explanation, executed_steps = executor.execute(goal, explanation, steps, initial_accessibility_tree)
 
         changes = ""
         if self.change_analysis and executed_steps:
@@ -124,19 +133,28 @@ class Alumni:
                 changes = self.client.analyze_changes(
                     before_accessibility_tree=before_tree,
                     before_url=before_url,
-                    after_accessibility_tree=self.driver.accessibility_tree.to_str(),
+                    after_accessibility_tree=self._capture_accessibility_tree().to_str(),
                     after_url=self.driver.url,
                 )
             except Exception as e:
                 logger.error(f"Error analyzing changes: {e}")
 
-        return DoResult(explanation=explanation, steps=executed_steps, changes=changes)
+        return DoResult(
+            explanation=explanation,
+            steps=executed_steps,
+            changes=changes,
+            duration=perf_counter() - started,
+            timings=current(),
+        )
 
-    @retry(tries=RETRIES, delay=DELAY, logger=logger)  # pyright: ignore[reportArgumentType]
+    @timed("check")
     def check(self, statement: str, vision: bool = False) -> str:
         """
         Checks a given statement true or false.
 
+        Only driver and server errors are retried, while false statements fail right away.
+        With recheck on change enabled, false statements are checked again as long as the page keeps changing.
+
         Args:
             statement: The statement to be checked.
             vision: A flag indicating whether to use a vision-based verification via a screenshot. Defaults to False.
@@ -147,18 +165,21 @@ class Alumni:
         Raises:
             AssertionError: If the verification fails.
         """
-        explanation, value = self.client.retrieve(
-            f"Is the following true or false - {statement}",
-            self.driver.accessibility_tree.to_str(),
-            title=self.driver.title,
-            url=self.driver.url,
-            screenshot=self.driver.screenshot if vision else None,
-            app=self.driver.app,
-        )
+        question = f"Is the following true or false - {statement}"
+        state = self._capture_page_state(vision)
+        if not vision and state.accessibility_tree is not None:
+            if local_explanation := self.fast_path.check(statement, state.accessibility_tree):
+                return local_explanation
+
+        explanation, value = self._retrieve(question, state)
+        if self.recheck_on_change:
+            capture = partial(self._capture_page_state, vision)
+            explanation, value = recheck_while_changing(question, state, (explanation, value), capture, self._retrieve)
+
         assert value, explanation
         return explanation
 
-    @retry(tries=RETRIES, delay=DELAY, logger=logger)  # pyright: ignore[reportArgumentType]
+    @timed("get")
     def get(self, data: str, vision: bool = False) -> Data:
         """
         Extracts requested data from the page.
@@ -170,16 +191,68 @@ class Alumni:
         Returns:
             The extracted data. If data cannot be extracted, returns the explanation string.
         """
-        explanation, value = self.client.retrieve(
-            data,
-            self.driver.accessibility_tree.to_str(),
-            title=self.driver.title,
-            url=self.driver.url,
-            screenshot=self.driver.screenshot if vision else None,
-            app=self.driver.app,
-        )
+        explanation, value = self._retrieve(data, self._capture_page_state(vision))
         return explanation if value is None else value
 
+    @timed("check_all")
+    def check_all(self, statements: list[str], vision: bool = False) -> list[CheckResult]:
+        """
+        Checks several statements against a single capture of the page.
+        Statements are sent to the server concurrently, so checking them takes about as long as checking one.
+
+        Args:
+            statements: The statements to be checked.
+            vision: A flag indicating whether to use a vision-based verification via a screenshot. Defaults to False.
+
+        Returns:
+            Results of the statements in the same order.
+
+        Raises:
+            AssertionError: If any of the statements is false, with explanations of all false statements.
+        """
+        return check_all(statements, self._capture_page_state(vision), self._retrieve, self.fast_path, vision)
+
+    @timed("get_many")
+    def get_many(self, data: dict[str, str], vision: bool = False) -> dict[str, Data]:
+        """
+        Extracts several pieces of data from a single capture of the page.
+        Requests are sent to the server concurrently, so extracting them takes about as long as extracting one.
+
+        Args:
+            data: The data to extract, keyed by names to return it under.
+            vision: A flag indicating whether to use a vision-based extraction via a screenshot. Defaults to False.
+
+        Returns:
+            The extracted data keyed by the same names. Data that cannot be extracted is the explanation string.
+        """
+        answers = retrieve_all(list(data.values()), self._capture_page_state(vision), self._retrieve)
+        return {name: explanation if value is None else value for name, (explanation, value) in zip(data, answers)}
+
+    def wait_until(self, statement: str, timeout: float = 10.0, vision: bool = False) -> WaitResult:
+        """
+        Waits until a given statement is true.
+        The statement is checked again only when the page accessibility tree changes.
+
+        Args:
+            statement: The statement to wait for.
+            timeout: Maximum time to wait in seconds. Defaults to 10.
+            vision: A flag indicating whether to use a vision-based verification via a screenshot. Defaults to False.
+
+        Returns:
+            WaitResult containing the explanation, the time spent and the number of evaluations.
+
+        Raises:
+            AssertionError: If the statement is still false after the timeout.
+        """
+
+        def retrieve(question: str, state: PageState) -> tuple[str, Data]:
+            if vision:
+                state = replace(state, screenshot=self.driver.capture_screenshot())
+            return self._retrieve(question, state)
+
+        return poll_until(statement, lambda: self._capture_page_state(False), retrieve, timeout)
+
+    @timed("find")
     @retry(tries=RETRIES, delay=DELAY, logger=logger)  # pyright: ignore[reportArgumentType]
     def find(self, description: str) -> Element:
         """
@@ -191,9 +264,13 @@ class Alumni:
         Returns:
             Native driver element (Selenium WebElement, Playwright Locator, or Appium WebElement).
         """
-        response = self.client.find_element(description, self.driver.accessibility_tree.to_str(), app=self.driver.app)
-        return self.driver.find_element(response["id"])
+        accessibility_tree = self._capture_accessibility_tree()
+        raw_id = self.fast_path.find(description, accessibility_tree)
+        if raw_id is None:
+            raw_id = self.client.find_element(description, accessibility_tree.to_str(), app=self.driver.app)["id"]
+        return self.driver.find_element(raw_id)
 
+    @timed("area")
     def area(self, description: str) -> Area:
         """
         Creates an area for the agents to work within.
@@ -208,8 +285,12 @@ class Alumni:
         Returns:
             Area: An instance of the Area class that represents the area of the accessibility tree to use.
         """
-        accessibility_tree = self.driver.accessibility_tree
+        accessibility_tree = self._capture_accessibility_tree()
         response = self.client.find_area(description, accessibility_tree.to_str(), app=self.driver.app)
+        try:
+            element = accessibility_tree.element_by_id(response["id"])
+        except (KeyError, ValueError):
+            element = None
         return Area(
             id=response["id"],
             description=response["explanation"],
@@ -217,6 +298,11 @@ class Alumni:
             accessibility_tree=accessibility_tree.scope_to_area(response["id"]),
             tools=self.tools,
             client=self.client,
+            element=element,
+            fast_path=self.fast_path,
+            timings=self.timings,
+            page_accessibility_tree=accessibility_tree,
+            recheck_on_change=self.recheck_on_change,
         )
 
     def learn(self, goal: str, actions: list[str]) -> None:
@@ -236,8 +322,74 @@ class Alumni:
         self.client.clear_examples()
 
     @property
-    def stats(self) -> dict[str, dict[str, int]]:
+    def stats(self) -> dict[str, dict]:
         """
-        Returns the stats of the session.
+        Returns the stats of the session, including requests answered locally without the server
+        and time spent in each phase of do, check, check_all, get, get_many, find and area calls.
         """
-        return self.client.stats
+        return {**self.client.stats, "local": dict(self.fast_path.hits), "timings": self.timings.summary()}
+
+    def _capture_accessibility_tree(self, previous: BaseAccessibilityTree | None = None) -> BaseAccessibilityTree:
+        with phase("capture"):
+            if previous is None:
+                accessibility_tree = self.driver.accessibility_tree
+            else:
+                accessibility_tree = self.driver.refresh_accessibility_tree(previous)
+        with phase("serialize"):
+            set_attributes(size=len(accessibility_tree.to_str()))
+        return accessibility_tree
+
+    @retry(tries=RETRIES, delay=DELAY, logger=logger)  # pyright: ignore[reportArgumentType]
+    def _capture_page_state(self, vision: bool) -> PageState:
+        with phase("capture"):
+            state = self.driver.capture_page_state(screenshot=vision)
+        if state.accessibility_tree is not None:
+            with phase("serialize"):
+                set_attributes(size=len(state.accessibility_tree.to_str()))
+        return state
+
+    @retry(tries=RETRIES, delay=DELAY, logger=logger)  # pyright: ignore[reportArgumentType]
+    def _retrieve(self, question: str, state: PageState) -> tuple[str, Data]:
+        assert state.accessibility_tree is not None
+        return self.client.retrieve(
+            question,
+            state.accessibility_tree.to_str(),
+            title=state.title,
+            url=state.url,
+            screenshot=state.screenshot,
+            app=state.app,
+        )
+
+    @staticmethod
+    def _build_driver(driver: Page | WebDriver | tuple[PageAsync, AbstractEventLoop]) -> BaseDriver:
+        # Only the driver library actually in use gets imported
+        if _is_instance(driver, "appium.webdriver.webdriver", "WebDriver"):
+            from .drivers.appium_driver import AppiumDriver
+
+            return AppiumDriver(driver)
+        elif _is_instance(driver, "playwright.sync_api", "Page"):
+            from .drivers.playwright_driver import PlaywrightDriver
+
+            return PlaywrightDriver(driver)
+        elif (
+            isinstance(driver, tuple)
+            and _is_instance(driver[0], "playwright.async_api", "Page")
+            and isinstance(driver[1], AbstractEventLoop)
+        ):
+            from .drivers.playwright_async_driver import PlaywrightAsyncDriver
+
+            # Asynchronous Playwright driver requires a shared event loop
+            return PlaywrightAsyncDriver(driver[0], driver[1])
+        elif _is_instance(driver, "selenium.webdriver.remote.webdriver", "WebDriver"):
+            from .drivers.selenium_driver import SeleniumDriver
+
+            return SeleniumDriver(driver)
+        else:
+            raise NotImplementedError(f"Driver {driver} not implemented")
+
+
+def _is_instance(obj: object, module_name: str, class_name: str) -> bool:
+    # An instance of the class can only exist if its module has been imported already,
+    # so there is no need to import driver libraries just for the check
+    module = sys.modules.get(module_name)
+    return module is not None and isinstance(obj, getattr(module, class_name))
@@ -1,14 +1,31 @@
-from retry import retry
+from __future__ import annotations
+
+from dataclasses import replace
+from functools import partial
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from retry import retry, retry_call
 
 from . import DELAY, RETRIES
+from .accessibility.accessibility_element import AccessibilityElement
 from .accessibility.base_accessibility_tree import BaseAccessibilityTree
+from .batch import check_all, retrieve_all
 from .clients.http_client import HttpClient
 from .clients.typecasting import Data
-from .drivers import Element
 from .drivers.base_driver import BaseDriver
+from .drivers.page_state import PageState
+from .fast_path import LocalFastPath
 from .logutils import get_logger
-from .result import DoResult, DoStep
+from .result import CheckResult, DoResult, WaitResult
+from .step_executor import StepExecutor
+from .telemetry import set_attributes
+from .timings import TimingStats, current, phase, timed
 from .tools import BaseTool
+from .wait import poll_until, recheck_while_changing
+
+if TYPE_CHECKING:
+    from .drivers import Element
 
 logger = get_logger(__name__)
 
@@ -22,6 +39,11 @@ class Area:
         accessibility_tree: BaseAccessibilityTree,
         tools: dict[str, BaseTool],
         client: HttpClient,
+        element: AccessibilityElement | None = None,
+        fast_path: LocalFastPath | None = None,
+        timings: TimingStats | None = None,
+        page_accessibility_tree: BaseAccessibilityTree | None = None,
+        recheck_on_change: bool = False,
     ):
         self.id = id
         self.description = description
@@ -29,44 +51,63 @@ class Area:
         self.accessibility_tree = accessibility_tree
         self.tools = tools
         self.client = client
+        self.element = element  # used to clip screenshots to the area
+        self.fast_path = fast_path or LocalFastPath(enabled=False)
+        self.timings = timings
+        self.recheck_on_change = recheck_on_change
+        # Raw IDs change between snapshots, so the area is located in new ones by the fingerprint of its root
+        self.fingerprint = (page_accessibility_tree or accessibility_tree).fingerprints.get(id)
+        self._page_accessibility_tree = page_accessibility_tree
 
-    @retry(tries=RETRIES, delay=DELAY, logger=logger)
+    @timed("do")
     def do(self, goal: str) -> DoResult:
         """
         Executes a series of steps to achieve the given goal within the area.
+        The area is located again in the page before every step, so that steps see the changes of previous ones.
+
+        A failing step is retried on its own without repeating the steps that already succeeded.
 
         Args:
             goal: The goal to be achieved.
 
         Returns:
-            DoResult containing the explanation and executed steps with their actions.
+            DoResult containing the explanation and executed steps with their actions, attempts and timings.
         """
-        explanation, steps = self.client.plan_actions(goal, self.accessibility_tree.to_str(), app=self.driver.app)
-
-        executed_steps = []
-        for step in steps:
-            actor_explanation, actions = self.client.execute_action(
-                goal, step, self.accessibility_tree.to_str(), app=self.driver.app
-            )
-
-            # When planner is off, explanation is just the goal — replace with actor's reasoning.
-            if explanation == goal:
-                explanation = actor_explanation
-
-            called_tools = []
-            for tool_call in actions:
-                called_tool = BaseTool.execute_tool_call(tool_call, self.tools, self.driver)
-                called_tools.append(called_tool)
+        started = perf_counter()
+        accessibility_tree = self._capture_accessibility_tree(self.accessibility_tree)
+        explanation, steps = retry_call(
+            self.client.plan_actions,
+            fargs=[goal, accessibility_tree.to_str()],
+            fkwargs={"app": self.driver.app},
+            tries=RETRIES,
+            delay=DELAY,
+            logger=logger,
+        )
 
-            executed_steps.append(DoStep(name=step, tools=called_tools))
+        executor = StepExecutor(
+            self.client,
+            self.driver,
+            self.tools,
+            self._capture_accessibility_tree,
+            refresh_accessibility_tree=self._capture_accessibility_tree,
+        )
+        explanation, executed_steps = executor.execute(goal, explanation, steps, accessibility_tree)
 
-        return DoResult(explanation=explanation, steps=executed_steps)
+        return DoResult(
+            explanation=explanation,
+            steps=executed_steps,
+            duration=perf_counter() - started,
+            timings=current(),
+        )
 
-    @retry(tries=RETRIES, delay=DELAY, logger=logger)
+    @timed("check")
     def check(self, statement: str, vision: bool = False) -> str:
         """
         Checks a given statement true or false within the area.
 
+        Only driver and server errors are retried, while false statements fail right away.
+        With recheck on change enabled, false statements are checked again as long as the area keeps changing.
+
         Args:
             statement: The statement to be checked.
             vision: A flag indicating whether to use a vision-based verification via a screenshot. Defaults to False.
@@ -77,18 +118,20 @@ class Area:
         Raises:
             AssertionError: If the verification fails.
         """
-        explanation, value = self.client.retrieve(
-            f"Is the following true or false - {statement}",
-            self.accessibility_tree.to_str(),
-            title=self.driver.title,
-            url=self.driver.url,
-            screenshot=self.driver.screenshot if vision else None,
-            app=self.driver.app,
-        )
+        state = self._capture_page_state(vision)
+        assert state.accessibility_tree is not None
+        if not vision and (local_explanation := self.fast_path.check(statement, state.accessibility_tree)):
+            return local_explanation
+
+        question = f"Is the following true or false - {statement}"
+        explanation, value = self._retrieve(question, state)
+        if self.recheck_on_change:
+            capture = partial(self._capture_page_state, vision)
+            explanation, value = recheck_while_changing(question, state, (explanation, value), capture, self._retrieve)
         assert value, explanation
         return explanation
 
-    @retry(tries=RETRIES, delay=DELAY, logger=logger)
+    @timed("get")
     def get(self, data: str, vision: bool = False) -> Data:
         """
         Extracts requested data from the area.
@@ -100,16 +143,67 @@ class Area:
         Returns:
             The extracted data. If data cannot be extracted, returns the explanation string.
         """
-        explanation, value = self.client.retrieve(
-            data,
-            self.accessibility_tree.to_str(),
-            title=self.driver.title,
-            url=self.driver.url,
-            screenshot=self.driver.screenshot if vision else None,
-            app=self.driver.app,
-        )
+        explanation, value = self._retrieve(data, self._capture_page_state(vision))
         return explanation if value is None else value
 
+    @timed("check_all")
+    def check_all(self, statements: list[str], vision: bool = False) -> list[CheckResult]:
+        """
+        Checks several statements within the area concurrently.
+
+        Args:
+            statements: The statements to be checked.
+            vision: A flag indicating whether to use a vision-based verification via a screenshot. Defaults to False.
+
+        Returns:
+            Results of the statements in the same order.
+
+        Raises:
+            AssertionError: If any of the statements is false, with explanations of all false statements.
+        """
+        return check_all(statements, self._capture_page_state(vision), self._retrieve, self.fast_path, vision)
+
+    @timed("get_many")
+    def get_many(self, data: dict[str, str], vision: bool = False) -> dict[str, Data]:
+        """
+        Extracts several pieces of data from the area concurrently.
+
+        Args:
+            data: The data to extract, keyed by names to return it under.
+            vision: A flag indicating whether to use a vision-based extraction via a screenshot. Defaults to False.
+
+        Returns:
+            The extracted data keyed by the same names. Data that cannot be extracted is the explanation string.
+        """
+        answers = retrieve_all(list(data.values()), self._capture_page_state(vision), self._retrieve)
+        return {name: explanation if value is None else value for name, (explanation, value) in zip(data, answers)}
+
+    def wait_until(self, statement: str, timeout: float = 10.0, vision: bool = False) -> WaitResult:
+        """
+        Waits until a given statement is true within the area.
+        The area is located again in the current page on every poll,
+        and the statement is checked again only when its accessibility tree changes.
+
+        Args:
+            statement: The statement to wait for.
+            timeout: Maximum time to wait in seconds. Defaults to 10.
+            vision: A flag indicating whether to use a vision-based verification via a screenshot. Defaults to False.
+
+        Returns:
+            WaitResult containing the explanation, the time spent and the number of evaluations.
+
+        Raises:
+            AssertionError: If the statement is still false after the timeout.
+        """
+
+        def retrieve(question: str, state: PageState) -> tuple[str, Data]:
+            if vision:
+                state = replace(state, screenshot=self.driver.capture_screenshot(clip=self.element))
+            return self._retrieve(question, state)
+
+        return poll_until(statement, self._capture_scoped_state, retrieve, timeout)
+
+    @timed("find")
     @retry(tries=RETRIES, delay=DELAY, logger=logger)
     def find(self, description: str) -> Element:
         """
@@ -121,5 +215,65 @@ class Area:
         Returns:
             Native driver element (Selenium WebElement, Playwright Locator, or Appium WebElement).
         """
-        response = self.client.find_element(description, self.accessibility_tree.to_str(), app=self.driver.app)
-        return self.driver.find_element(response["id"])
+        accessibility_tree = self._capture_accessibility_tree(self.accessibility_tree)
+        raw_id = self.fast_path.find(description, accessibility_tree)
+        if raw_id is None:
+            raw_id = self.client.find_element(description, accessibility_tree.to_str(), app=self.driver.app)["id"]
+        return self.driver.find_element(raw_id)
+
+    def _capture_accessibility_tree(self, previous: BaseAccessibilityTree | None = None) -> BaseAccessibilityTree:
+        """
+        Captures the page and scopes it to the area.
+        With the previous tree of the area given, the page is only captured again if it has changed since.
+        """
+        with phase("capture"):
+            if previous is None or self._page_accessibility_tree is None:
+                page_accessibility_tree = self.driver.accessibility_tree
+            else:
+                page_accessibility_tree = self.driver.refresh_accessibility_tree(self._page_accessibility_tree)
+        if page_accessibility_tree is not self._page_accessibility_tree:
+            self._scope(page_accessibility_tree)
+        return self.accessibility_tree
+
+    def _scope(self, page_accessibility_tree: BaseAccessibilityTree):
+        with phase("serialize"):
+            raw_id = page_accessibility_tree.raw_id_by_fingerprint(self.fingerprint) if self.fingerprint else None
+            if raw_id is None:
+                logger.debug(f"Area '{self.description}' is not found in the page, using the whole page")
+                self.accessibility_tree, self.element = page_accessibility_tree, None
+            else:
+                self.id = raw_id
+                self.accessibility_tree = page_accessibility_tree.scope_to_area(raw_id)
+                try:
+                    self.element = page_accessibility_tree.element_by_id(raw_id)
+                except (KeyError, ValueError):
+                    self.element = None
+            self._page_accessibility_tree = page_accessibility_tree
+            set_attributes(size=len(self.accessibility_tree.to_str()))
+
+    @retry(tries=RETRIES, delay=DELAY, logger=logger)
+    def _capture_page_state(self, vision: bool) -> PageState:
+        accessibility_tree = self._capture_accessibility_tree(self.accessibility_tree)
+        with phase("capture"):
+            state = self.driver.capture_page_state(accessibility_tree=False, screenshot=vision, clip=self.element)
+        return replace(state, accessibility_tree=accessibility_tree)
+
+    @retry(tries=RETRIES, delay=DELAY, logger=logger)
+    def _capture_scoped_state(self) -> PageState:
+        with phase("capture"):
+            state = self.driver.capture_page_state()
+        assert state.accessibility_tree is not None
+        self._scope(state.accessibility_tree)
+        return replace(state, accessibility_tree=self.accessibility_tree)
+
+    @retry(tries=RETRIES, delay=DELAY, logger=logger)
+    def _retrieve(self, question: str, state: PageState) -> tuple[str, Data]:
+        assert state.accessibility_tree is not None
+        return self.client.retrieve(
+            question,
+            state.accessibility_tree.to_str(),
+            title=state.title,
+            url=state.url,
+            screenshot=state.screenshot,
+            app=state.app,
+        )
@@ -0,0 +1,86 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from threading import local
+from typing import Callable
+
+from requests import Session
+
+from .clients.transport import new_session, worker_session
+from .clients.typecasting import Data
+from .drivers.page_state import PageState
+from .fast_path import LocalFastPath
+from .logutils import get_logger
+from .result import CheckResult
+
+logger = get_logger(__name__)
+
+# Upper bound of requests sent to the server at the same time by a single batch
+MAX_CONCURRENT_REQUESTS = 8
+
+Retrieve = Callable[[str, PageState], tuple[str, Data]]
+
+
+def retrieve_all(questions: list[str], state: PageState, retrieve: Retrieve) -> list[tuple[str, Data]]:
+    """
+    Asks the model all questions about the same page state concurrently.
+
+    Returns:
+        Explanations and values in the order of questions.
+    """
+    if len(questions) <= 1:
+        return [retrieve(question, state) for question in questions]
+
+    workers = local()
+    sessions: list[Session] = []
+
+    def retrieve_in_worker(question: str) -> tuple[str, Data]:
+        # Sessions are not thread-safe, so each worker sends its requests through a session of its own
+        if not hasattr(workers, "session"):
+            workers.session = new_session()
+            sessions.append(workers.session)
+        worker_session.set(workers.session)
+        return retrieve(question, state)
+
+    logger.debug(f"Retrieving {len(questions)} statements concurrently")
+    try:
+        with ThreadPoolExecutor(max_workers=min(len(questions), MAX_CONCURRENT_REQUESTS)) as executor:
+            # Requests run in copies of the caller context to count towards its timings and spans
+            futures = [executor.submit(copy_context().run, retrieve_in_worker, question) for question in questions]
+            return [future.result() for future in futures]
+    finally:
+        for session in sessions:
+            session.close()
+
+
+def check_all(
+    statements: list[str],
+    state: PageState,
+    retrieve: Retrieve,
+    fast_path: LocalFastPath,
+    vision: bool = False,
+) -> list[CheckResult]:
+    """
+    Checks all statements against the same page state, answering locally the ones the fast path can confirm.
+
+    Raises:
+        AssertionError: If any statement is false, with explanations of all false statements.
+    """
+    results: list[CheckResult | None] = [None] * len(statements)
+    remaining = []
+    for index, statement in enumerate(statements):
+        local_explanation = None
+        if not vision and state.accessibility_tree is not None:
+            local_explanation = fast_path.check(statement, state.accessibility_tree)
+        if local_explanation:
+            results[index] = CheckResult(statement, True, local_explanation)
+        else:
+            remaining.append(index)
+
+    questions = [f"Is the following true or false - {statements[index]}" for index in remaining]
+    for index, (explanation, value) in zip(remaining, retrieve_all(questions, state, retrieve)):
+        results[index] = CheckResult(statements[index], bool(value), explanation)
+
+    checked = [result for result in results if result is not None]
+    failed = [result for result in checked if not result.passed]
+    assert not failed, "\n".join(f"{result.statement}: {result.explanation}" for result in failed)
+    return checked
@@ -0,0 +1,174 @@
+import atexit
+import json
+import re
+from base64 import b64decode
+from hashlib import sha1
+from os import getenv
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+from ..logutils import get_logger
+
+logger = get_logger(__name__)
+
+CASSETTE_NAME = "cassette.json"
+CASSETTE_VERSION = 1
+# Payload fields that are too large to keep in cassettes and are stored as hashes
+HASHED_FIELDS = {"accessibility_tree", "screenshot"}
+# Attributes holding browser-assigned node IDs, which differ between runs on the same page
+VOLATILE_ATTRIBUTES = re.compile(r'\s(?:nodeId|backendDOMNodeId)="[^"]*"')
+
+
+# Cassettes opened in the process by their mode and path, shared by all clients using them
+_cassettes: dict[tuple[str, Path], "Cassette"] = {}
+_cassettes_lock = Lock()
+
+
+class CassetteMismatchError(Exception):
+    """Raised when a replayed request has no recorded response."""
+
+
+class Cassette:
+    """
+    Records responses of the server to a file and replays them later without the server.
+
+    Requests are keyed by the endpoint and the payload, with accessibility trees and screenshots
+    replaced by hashes. Trees are normalized before hashing, so that node IDs assigned by the browser
+    do not prevent replaying a cassette in another run. Responses to repeated requests are replayed
+    in the recorded order.
+    """
+
+    def __init__(self, mode: str, path: str | Path | None = None):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+
+        self.path = _path(path)
+        self.mode = mode
+        self.model: str | None = None
+        self.interactions: list[dict[str, Any]] = []
+        self._replayed: dict[str, int] = {}
+        self._lock = Lock()
+
+        if self.replaying:
+            if not self.path.exists():
+                raise FileNotFoundError(f"Cassette {self.path} does not exist, record it first")
+            data = json.loads(self.path.read_text())
+            if data.get("version") != CASSETTE_VERSION:
+                raise CassetteMismatchError(f"Cassette {self.path} has unsupported version {data.get('version')}")
+            self.model = data["model"]
+            self.interactions = data["interactions"]
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def record(self, endpoint: str, payload: dict[str, Any], response: Any):
+        interaction = {"endpoint": endpoint, "request": normalize_payload(payload), "response": response}
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def replay(self, endpoint: str, payload: dict[str, Any]) -> Any:
+        """
+        Returns the recorded response to the request.
+
+        Raises:
+            CassetteMismatchError: If there is no recorded response, with the closest recorded requests.
+        """
+        request = normalize_payload(payload)
+        key = _key(endpoint, request)
+        responses = [
+            interaction["response"]
+            for interaction in self.interactions
+            if _key(interaction["endpoint"], interaction["request"]) == key
+        ]
+        if not responses:
+            raise CassetteMismatchError(self._mismatch_report(endpoint, request))
+
+        # Repeat the last response when a request was replayed more times than recorded
+        with self._lock:
+            index = min(self._replayed.get(key, 0), len(responses) - 1)
+            self._replayed[key] = index + 1
+        return responses[index]
+
+    def save(self):
+        if self.replaying:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = {"version": CASSETTE_VERSION, "model": self.model, "interactions": list(self.interactions)}
+        self.path.write_text(json.dumps(data, indent=2, ensure_ascii=False))
+        logger.debug(f"Saved {len(data['interactions'])} interactions to cassette {self.path}")
+
+    def _mismatch_report(self, endpoint: str, request: dict[str, Any]) -> str:
+        lines = [f"No response to /{endpoint} request is recorded in cassette {self.path}:"]
+        lines += [f"  {field}: {_describe(value)}" for field, value in request.items()]
+
+        recorded = [interaction["request"] for interaction in self.interactions if interaction["endpoint"] == endpoint]
+        if not recorded:
+            lines.append(f"No /{endpoint} requests are recorded.")
+            return "\n".join(lines)
+
+        lines.append("Closest recorded requests:")
+        recorded.sort(key=lambda candidate: len(_differences(request, candidate)))
+        for candidate in recorded[:3]:
+            differences = ", ".join(
+                f"{field} is {_describe(candidate.get(field))}" for field in _differences(request, candidate)
+            )
+            lines.append(f"  - {differences}")
+        return "\n".join(lines)
+
+
+def open_cassette(mode: str, path: str | Path | None = None) -> Cassette:
+    """
+    Returns the cassette for the mode and path, shared by all clients of the process,
+    so that clients recording to the same file do not overwrite interactions of each other.
+    """
+    key = (mode, _path(path).resolve())
+    with _cassettes_lock:
+        if key not in _cassettes:
+            cassette = _cassettes[key] = Cassette(mode, path)
+            if not cassette.replaying:
+                atexit.register(cassette.save)
+        return _cassettes[key]
+
+
+def normalize_payload(payload: dict[str, Any]) -> dict[str, Any]:
+    normalized = {}
+    for field, value in payload.items():
+        if field in HASHED_FIELDS and value:
+            normalized[field] = _hash_screenshot(value) if field == "screenshot" else _hash_tree(value)
+        elif isinstance(value, dict):
+            normalized[field] = normalize_payload(value)
+        else:
+            normalized[field] = value
+    return normalized
+
+
+def _path(path: str | Path | None) -> Path:
+    return Path(path or Path(getenv("ALUMNIUM_STORE_DIR", ".alumnium")) / CASSETTE_NAME)
+
+
+def _hash_tree(tree: str) -> str:
+    tree = " ".join(VOLATILE_ATTRIBUTES.sub("", tree).split())
+    return sha1(tree.encode()).hexdigest()
+
+
+def _hash_screenshot(screenshot: str | bytes) -> str:
+    # Screenshots encoded as base64 are hashed as bytes to match raw uploads
+    image = b64decode(screenshot) if isinstance(screenshot, str) else screenshot
+    return sha1(image).hexdigest()
+
+
+def _key(endpoint: str, request: dict[str, Any]) -> str:
+    return f"{endpoint} {json.dumps(request, sort_keys=True)}"
+
+
+def _differences(request: dict[str, Any], candidate: dict[str, Any]) -> list[str]:
+    return [field for field in sorted(request.keys() | candidate.keys()) if request.get(field) != candidate.get(field)]
+
+
+def _describe(value: Any) -> str:
+    text = json.dumps(value, ensure_ascii=False)
+    return text if len(text) <= 80 else f"{text[:77]}..."
@@ -1,22 +1,40 @@
 from __future__ import annotations
 
 import atexit
+import re
+import socket
+from base64 import b64decode, b64encode
 from os import getpid
+from pathlib import Path
 from secrets import token_hex
+from tempfile import gettempdir
+from time import perf_counter
+from typing import Any, Callable
 
 from portpicker import pick_unused_port
-from requests import ConnectionError, delete, get, post
+from requests import ConnectionError, Response, Session
 
+from .. import CASSETTE, CASSETTE_PATH, SERVER_SHARED, SERVER_SOCKET, hooks
 from ..cli import run_server
 from ..logutils import get_logger
 from ..models import Model
+from ..telemetry import propagation_headers, set_attributes
+from ..timings import phase, record, record_transfer
 from ..tools.base_tool import BaseTool
 from ..tools.tool_to_schema_converter import convert_tools_to_schemas
+from .cassette import open_cassette
+from .shared_server import SharedServer
+from .transport import new_session, unix_socket_url, worker_session
 from .typecasting import Data, loosely_typecast
 
 logger = get_logger(__name__)
 
 DEFAULT_SERVER_HOST = "127.0.0.1"
+# Token usage reported while replaying a cassette, when no model is called
+REPLAYED_USAGE_KEYS = ("input_tokens", "output_tokens", "total_tokens", "cache_creation", "cache_read", "reasoning")
+
+# Time spent by the server handling a request, e.g. "handler;dur=12.5" (milliseconds)
+SERVER_TIMING = re.compile(r"handler;dur=(?P<duration>[\d.]+)")
 
 
 class HttpClient:
@@ -28,10 +46,37 @@ class HttpClient:
         tools: dict[str, type[BaseTool]],
         planner: bool = True,
         exclude_attributes: set[str] | None = None,
+        shared_server: bool = SERVER_SHARED,
+        server_socket: bool = SERVER_SOCKET,
+        cassette: str = CASSETTE,
     ):
+        if server_socket and not hasattr(socket, "AF_UNIX"):
+            logger.warning("Unix domain sockets are not supported on this platform, using TCP")
+            server_socket = False
+
         self._server_pid: str | None = None
-        self.base_url = self._resolve_url(url)
+        self._server_socket = server_socket
+        self._shared_server: SharedServer | None = (
+            SharedServer(DEFAULT_SERVER_HOST, socket=server_socket) if shared_server else None
+        )
+        self._shared_server_client: str | None = None
+        # Each client keeps its own connections, so that concurrent clients do not share a session
+        self._session = new_session()
+        # Older servers only accept screenshots as base64 strings in JSON bodies
+        self._multipart_screenshots = True
+        self._cassette = open_cassette(cassette, CASSETTE_PATH) if cassette != "none" else None
         self.session_id = None
+        self.planner = planner
+
+        if self._cassette and self._cassette.replaying:
+            # Responses are served from the cassette, so neither the server nor a session is needed
+            logger.info(f"Replaying server responses from cassette {self._cassette.path}")
+            self.base_url = ""
+            self.session_id = "cassette"
+            self.model = Model.from_string(self._cassette.model)
+            return
+
+        self.base_url = self._resolve_url(url)
 
         tool_schemas = convert_tools_to_schemas(tools)
 
@@ -50,7 +95,7 @@ class HttpClient:
             ),
         }
 
-        response = post(
+        response = self._session.post(
             f"{self.base_url}/v1/sessions",
             json=payload,
             timeout=30,
@@ -60,9 +105,13 @@ class HttpClient:
 
         self.session_id = response_data["session_id"]
         self.model = Model.from_string(response_data["model"])
+        if self._cassette:
+            self._cassette.model = response_data["model"]
 
     def get_health(self) -> dict[str, str]:
-        response = get(
+        if self._replaying:
+            return {"status": "healthy"}
+        response = self._session.get(
             f"{self.base_url}/v1/health",
             timeout=30,
         )
@@ -70,19 +119,25 @@ class HttpClient:
         return response.json()
 
     def quit(self):
+        if self._cassette:
+            self._cassette.save()
+        if self._replaying:
+            return
+
         try:
             if self.session_id:
-                response = delete(
+                response = self._session.delete(
                     f"{self.base_url}/v1/sessions/{self.session_id}",
                     timeout=30,
                 )
                 response.raise_for_status()
                 self.session_id = None
         except ConnectionError:
-            if not self._server_pid:
+            if not self._server_pid and not self._shared_server_client:
                 raise
             logger.debug("Skipping session cleanup: managed server already stopped")
         finally:
+            self._session.close()
             self._stop_server()
 
     def plan_actions(self, goal: str, accessibility_tree: str, app: str = "unknown") -> tuple[str, list[str]]:
@@ -91,17 +146,19 @@ class HttpClient:
         Returns:
             A tuple of (explanation, steps).
         """
-        response = post(
-            f"{self.base_url}/v1/sessions/{self.session_id}/plans",
-            json={"goal": goal, "accessibility_tree": accessibility_tree, "app": app},
-            timeout=120,
-        )
-        response.raise_for_status()
-        response_data = response.json()
+        if not self.planner:
+            # Without planner, the server makes the goal a single step,
+            # so the round trip is skipped and the actor is asked right away
+            return goal, [goal]
+
+        payload = {"goal": goal, "accessibility_tree": accessibility_tree, "app": app}
+        response_data = self._exchange("plans", payload, lambda: self._post_json("plans", payload, timeout=120))
         return (response_data["explanation"], response_data["steps"])
 
     def add_example(self, goal: str, actions: list[str]):
-        response = post(
+        if self._replaying:
+            return {}
+        response = self._session.post(
             f"{self.base_url}/v1/sessions/{self.session_id}/examples",
             json={"goal": goal, "actions": actions},
             timeout=30,
@@ -110,7 +167,9 @@ class HttpClient:
         return response.json()
 
     def clear_examples(self):
-        response = delete(
+        if self._replaying:
+            return
+        response = self._session.delete(
             f"{self.base_url}/v1/sessions/{self.session_id}/examples",
             timeout=30,
         )
@@ -119,13 +178,8 @@ class HttpClient:
     def execute_action(
         self, goal: str, step: str, accessibility_tree: str, app: str = "unknown"
     ) -> tuple[str, list[dict]]:
-        response = post(
-            f"{self.base_url}/v1/sessions/{self.session_id}/steps",
-            json={"goal": goal, "step": step, "accessibility_tree": accessibility_tree, "app": app},
-            timeout=120,
-        )
-        response.raise_for_status()
-        data = response.json()
+        payload = {"goal": goal, "step": step, "accessibility_tree": accessibility_tree, "app": app}
+        data = self._exchange("steps", payload, lambda: self._post_json("steps", payload, timeout=120))
         return data["explanation"], data["actions"]
 
     def retrieve(
@@ -134,43 +188,32 @@ class HttpClient:
         accessibility_tree: str,
         title: str,
         url: str,
-        screenshot: str | None,
+        screenshot: str | bytes | None,
         app: str = "unknown",
     ) -> tuple[str, Data]:
-        response = post(
-            f"{self.base_url}/v1/sessions/{self.session_id}/statements",
-            json={
-                "statement": statement,
-                "accessibility_tree": accessibility_tree,
-                "title": title,
-                "url": url,
-                "screenshot": screenshot if screenshot else None,
-                "app": app,
-            },
-            timeout=120,
+        payload = {
+            "statement": statement,
+            "accessibility_tree": accessibility_tree,
+            "title": title,
+            "url": url,
+            "app": app,
+        }
+        data = self._exchange(
+            "statements",
+            {**payload, "screenshot": screenshot},
+            lambda: self._post_statement(payload, screenshot),
         )
-        response.raise_for_status()
-        data = response.json()
         return data["explanation"], loosely_typecast(data["result"])
 
     def find_area(self, description: str, accessibility_tree: str, app: str = "unknown"):
-        response = post(
-            f"{self.base_url}/v1/sessions/{self.session_id}/areas",
-            json={"description": description, "accessibility_tree": accessibility_tree, "app": app},
-            timeout=60,
-        )
-        response.raise_for_status()
-        data = response.json()
+        payload = {"description": description, "accessibility_tree": accessibility_tree, "app": app}
+        data = self._exchange("areas", payload, lambda: self._post_json("areas", payload, timeout=60))
         return {"id": data["id"], "explanation": data["explanation"]}
 
     def find_element(self, description: str, accessibility_tree: str, app: str = "unknown") -> dict:
-        response = post(
-            f"{self.base_url}/v1/sessions/{self.session_id}/elements",
-            json={"description": description, "accessibility_tree": accessibility_tree, "app": app},
-            timeout=60,
-        )
-        response.raise_for_status()
-        return response.json()["elements"][0]
+        payload = {"description": description, "accessibility_tree": accessibility_tree, "app": app}
+        data = self._exchange("elements", payload, lambda: self._post_json("elements", payload, timeout=60))
+        return data["elements"][0]
 
     def analyze_changes(
         self,
@@ -180,33 +223,33 @@ class HttpClient:
         after_url: str,
         app: str = "unknown",
     ) -> str:
-        response = post(
-            f"{self.base_url}/v1/sessions/{self.session_id}/changes",
-            json={
-                "before": {
-                    "accessibility_tree": before_accessibility_tree,
-                    "url": before_url,
-                },
-                "after": {
-                    "accessibility_tree": after_accessibility_tree,
-                    "url": after_url,
-                },
-                "app": app,
+        payload = {
+            "before": {
+                "accessibility_tree": before_accessibility_tree,
+                "url": before_url,
             },
-            timeout=120,
-        )
-        response.raise_for_status()
-        return response.json()["result"]
+            "after": {
+                "accessibility_tree": after_accessibility_tree,
+                "url": after_url,
+            },
+            "app": app,
+        }
+        data = self._exchange("changes", payload, lambda: self._post_json("changes", payload, timeout=120))
+        return data["result"]
 
     def save_cache(self):
-        response = post(
+        if self._replaying:
+            return
+        response = self._session.post(
             f"{self.base_url}/v1/sessions/{self.session_id}/caches",
             timeout=30,
         )
         response.raise_for_status()
 
     def discard_cache(self):
-        response = delete(
+        if self._replaying:
+            return
+        response = self._session.delete(
             f"{self.base_url}/v1/sessions/{self.session_id}/caches",
             timeout=30,
         )
@@ -214,23 +257,96 @@ class HttpClient:
 
     @property
     def stats(self):
-        response = get(
+        if self._replaying:
+            usage = dict.fromkeys(REPLAYED_USAGE_KEYS, 0)
+            return {"total": usage, "cache": dict(usage)}
+        response = self._session.get(
             f"{self.base_url}/v1/sessions/{self.session_id}/stats",
             timeout=30,
         )
         response.raise_for_status()
         return response.json()
 
+    @property
+    def _replaying(self) -> bool:
+        return self._cassette is not None and self._cassette.replaying
+
+    def _exchange(self, endpoint: str, payload: dict, send: Callable[[], Any]) -> Any:
+        if not self._cassette:
+            return send()
+        if self._cassette.replaying:
+            return self._cassette.replay(endpoint, payload)
+
+        response = send()
+        self._cassette.record(endpoint, payload, response)
+        return response
+
+    def _post_json(self, endpoint: str, payload: dict, timeout: int) -> Any:
+        response = _timed_post(
+            self._session,
+            f"{self.base_url}/v1/sessions/{self.session_id}/{endpoint}",
+            json=payload,
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _post_statement(self, payload: dict, screenshot: str | bytes | None) -> dict:
+        endpoint = f"{self.base_url}/v1/sessions/{self.session_id}/statements"
+        session = worker_session.get() or self._session
+        response = None
+        if screenshot and self._multipart_screenshots:
+            # Upload raw image bytes instead of inflating them by a third with base64 inside JSON
+            image = b64decode(screenshot) if isinstance(screenshot, str) else screenshot
+            response = _timed_post(
+                session,
+                endpoint,
+                data=payload,
+                files={"screenshot": ("screenshot", image, "application/octet-stream")},
+                timeout=120,
+            )
+            # Older servers reject the file part during body validation, other errors are genuine
+            if response.status_code == 415 or (
+                response.status_code in (400, 422, 500) and "screenshot" in response.text
+            ):
+                logger.debug("Server does not accept multipart screenshots, falling back to JSON")
+                self._multipart_screenshots = False
+                response = None
+
+        if response is None:
+            if isinstance(screenshot, bytes):
+                screenshot = b64encode(screenshot).decode()
+            response = _timed_post(
+                session,
+                endpoint,
+                json={**payload, "screenshot": screenshot if screenshot else None},
+                timeout=120,
+            )
+        response.raise_for_status()
+        return response.json()
+
     def _resolve_url(self, url_option: str | None) -> str:
         if url_option:
             return url_option.rstrip("/")
 
-        port = pick_unused_port()
-        pid_name = self._build_server_pid_name(port)
+        if self._shared_server:
+            managed_url, self._shared_server_client = self._shared_server.acquire()
+            atexit.register(self._stop_server)
+            return managed_url
+
+        pid_name = self._build_server_pid_name()
+        if self._server_socket:
+            # Sockets need no port allocation and skip the loopback TCP stack
+            socket_path = str(Path(gettempdir()) / pid_name.replace(".pid", ".sock"))
+            address = {"socket": socket_path}
+            managed_url = unix_socket_url(socket_path)
+        else:
+            port = pick_unused_port()
+            address = {"host": DEFAULT_SERVER_HOST, "port": port}
+            managed_url = f"http://{DEFAULT_SERVER_HOST}:{port}"
 
         run_server(
-            host=DEFAULT_SERVER_HOST,
-            port=port,
+            **address,
             daemon=True,
             daemon_pid=pid_name,
             daemon_force=True,
@@ -242,11 +358,15 @@ class HttpClient:
         atexit.register(self._stop_server)
 
         self._server_pid = pid_name
-        managed_url = f"http://{DEFAULT_SERVER_HOST}:{port}"
         logger.debug(f"Started managed local server: {managed_url} ({pid_name})")
         return managed_url
 
     def _stop_server(self) -> None:
+        if self._shared_server and self._shared_server_client:
+            self._shared_server.release(self._shared_server_client)
+            self._shared_server_client = None
+            return
+
         if not self._server_pid:
             return
 
@@ -259,6 +379,34 @@ class HttpClient:
         self._server_pid = None
 
     @staticmethod
-    def _build_server_pid_name(port: int) -> str:
+    def _build_server_pid_name() -> str:
         random_id = token_hex(4)[:7]
         return f"server-{getpid()}-{random_id}.pid"
+
+
+def _timed_post(session: Session, url: str, **kwargs) -> Response:
+    started = perf_counter()
+    with phase("request", url=url):
+        # Server spans of the request become children of the client span
+        response = session.post(url, headers=propagation_headers(), **kwargs)
+
+        body = response.request.body if response.request is not None else None
+        bytes_sent, bytes_received = len(body or b""), len(response.content)
+        record_transfer(bytes_sent, bytes_received)
+        set_attributes(status_code=response.status_code, bytes_sent=bytes_sent, bytes_received=bytes_received)
+
+    server_duration = None
+    if match := SERVER_TIMING.search(response.headers.get("Server-Timing", "")):
+        server_duration = float(match["duration"]) / 1000
+        record("server", server_duration)
+
+    hooks.emit(
+        "request_sent",
+        url=url,
+        duration=perf_counter() - started,
+        status_code=response.status_code,
+        bytes_sent=bytes_sent,
+        bytes_received=bytes_received,
+        server_duration=server_duration,
+    )
+    return response
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import json
+import sys
+from contextlib import contextmanager
+from os import getenv, getpid
+from pathlib import Path
+from secrets import token_hex
+from tempfile import gettempdir
+from typing import Iterator
+
+from portpicker import pick_unused_port
+from requests import RequestException
+
+from ..cli import run_server
+from ..logutils import get_logger
+from .transport import new_session, unix_socket_url
+
+logger = get_logger(__name__)
+
+SHARED_SERVER_PID_NAME = "shared-server.pid"
+SHARED_SERVER_STATE_NAME = "shared-server.json"
+SHARED_SERVER_LOCK_NAME = "shared-server.lock"
+
+
+class SharedServer:
+    """
+    Local server shared by all clients on the machine that use the same store directory.
+
+    The server address and its clients are recorded in a state file guarded by an exclusive file lock,
+    so that concurrent processes (e.g. pytest-xdist workers) start at most one server between them.
+    Each client holds a reference until it is released, and the last one to leave stops the server.
+    Clients of processes that died without releasing their reference are pruned on the next change.
+    """
+
+    def __init__(self, host: str, store_dir: str | None = None, socket: bool = False):
+        self.host = host
+        self.socket = socket
+        self.store_dir = Path(store_dir or getenv("ALUMNIUM_STORE_DIR", ".alumnium"))
+        self.state_path = self.store_dir / SHARED_SERVER_STATE_NAME
+        self.lock_path = self.store_dir / SHARED_SERVER_LOCK_NAME
+
+    def acquire(self) -> tuple[str, str]:
+        """
+        Registers a new client, starting the server if it is not running yet.
+
+        Returns:
+            A tuple of (server URL, client ID to release).
+        """
+        client_id = f"{getpid()}-{token_hex(4)}"
+        with self._locked():
+            state = self._read_state()
+            url = state.get("url")
+            if not url or not self._is_healthy(url):
+                url = self._start()
+                state = {"url": url, "clients": []}
+                logger.debug(f"Started shared local server: {url}")
+            else:
+                logger.debug(f"Reusing shared local server: {url}")
+
+            state["clients"] = self._alive_clients(state) + [client_id]
+            self._write_state(state)
+
+        return url, client_id
+
+    def release(self, client_id: str):
+        """Unregisters the client, stopping the server if no other clients remain."""
+        with self._locked():
+            state = self._read_state()
+            clients = [client for client in self._alive_clients(state) if client != client_id]
+            if clients:
+                self._write_state({**state, "clients": clients})
+                logger.debug(f"Released shared local server, {len(clients)} client(s) remain")
+                return
+
+            run_server(
+                daemon_kill=True,
+                daemon_pid=SHARED_SERVER_PID_NAME,
+                daemon_force=True,
+            )
+            self.state_path.unlink(missing_ok=True)
+            logger.debug("Stopped shared local server")
+
+    def _start(self) -> str:
+        if self.socket:
+            socket_path = str(Path(gettempdir()) / f"alumnium-shared-server-{token_hex(4)}.sock")
+            address = {"socket": socket_path}
+            url = unix_socket_url(socket_path)
+        else:
+            port = pick_unused_port()
+            address = {"host": self.host, "port": port}
+            url = f"http://{self.host}:{port}"
+
+        run_server(
+            **address,
+            daemon=True,
+            daemon_pid=SHARED_SERVER_PID_NAME,
+            daemon_force=True,
+            daemon_wait=True,
+            check=True,
+        )
+        return url
+
+    def _read_state(self) -> dict:
+        try:
+            return json.loads(self.state_path.read_text())
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write_state(self, state: dict):
+        self.state_path.write_text(json.dumps(state))
+
+    @staticmethod
+    def _alive_clients(state: dict) -> list[str]:
+        return [client for client in state.get("clients", []) if _is_process_running(int(client.split("-")[0]))]
+
+    @staticmethod
+    def _is_healthy(url: str) -> bool:
+        try:
+            with new_session() as session:
+                return session.get(f"{url}/v1/health", timeout=5).ok
+        except RequestException:
+            return False
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a+b") as lock:
+            if sys.platform == "win32":
+                import msvcrt
+
+                lock.seek(0)
+                # LK_LOCK gives up after 10 seconds, so keep trying until the lock is acquired
+                while True:
+                    try:
+                        msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+                try:
+                    yield
+                finally:
+                    lock.seek(0)
+                    msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+def _is_process_running(pid: int) -> bool:
+    if pid == getpid():
+        return True
+
+    if sys.platform == "win32":
+        import ctypes
+
+        # os.kill() terminates processes on Windows, so query the exit code instead
+        PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+        STILL_ACTIVE = 259
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return False
+        try:
+            exit_code = ctypes.c_ulong()
+            return bool(kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))) and (
+                exit_code.value == STILL_ACTIVE
+            )
+        finally:
+            kernel32.CloseHandle(handle)
+
+    from os import kill
+
+    try:
+        kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
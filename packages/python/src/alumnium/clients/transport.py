@@ -0,0 +1,78 @@
+import socket
+from contextvars import ContextVar
+from threading import Lock
+from urllib.parse import quote, unquote, urlparse
+
+from requests import PreparedRequest, Session
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool
+
+UNIX_SOCKET_SCHEME = "http+unix://"
+# Connections kept alive by a session
+POOL_MAXSIZE = 10
+
+# Sessions are not thread-safe, so concurrent requests are sent through sessions of their workers, see retrieve_all()
+worker_session: ContextVar[Session | None] = ContextVar("worker_session", default=None)
+
+
+def unix_socket_url(path: str) -> str:
+    """Builds a server URL that is routed to the Unix domain socket at the given path."""
+    return f"{UNIX_SOCKET_SCHEME}{quote(path, safe='')}"
+
+
+class UnixSocketConnection(HTTPConnection):
+    def __init__(self, socket_path: str, **kwargs):
+        super().__init__("localhost", **kwargs)
+        self.socket_path = socket_path
+
+    def _new_conn(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if isinstance(self.timeout, (int, float)):
+            sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        return sock
+
+
+class UnixSocketConnectionPool(HTTPConnectionPool):
+    def __init__(self, socket_path: str, **kwargs):
+        super().__init__("localhost", **kwargs)
+        self.socket_path = socket_path
+
+    def _new_conn(self) -> UnixSocketConnection:
+        return UnixSocketConnection(self.socket_path, timeout=self.timeout.connect_timeout)
+
+
+class UnixSocketAdapter(HTTPAdapter):
+    """Sends requests for `http+unix://` URLs, whose host is the percent-encoded socket path."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._pools: dict[str, UnixSocketConnectionPool] = {}
+        self._pools_lock = Lock()
+
+    def get_connection_with_tls_context(self, request: PreparedRequest, verify, proxies=None, cert=None):
+        socket_path = unquote(urlparse(request.url).netloc)
+        with self._pools_lock:
+            if socket_path not in self._pools:
+                self._pools[socket_path] = UnixSocketConnectionPool(socket_path, maxsize=self._pool_maxsize)
+            return self._pools[socket_path]
+
+    def request_url(self, request: PreparedRequest, proxies) -> str:
+        return request.path_url
+
+    def close(self):
+        super().close()
+        with self._pools_lock:
+            for pool in self._pools.values():
+                pool.close()
+            self._pools.clear()
+
+
+def new_session() -> Session:
+    """Creates a session that keeps connections to the server alive between requests, including Unix sockets."""
+    session = Session()
+    session.mount("http://", HTTPAdapter(pool_maxsize=POOL_MAXSIZE))
+    session.mount("https://", HTTPAdapter(pool_maxsize=POOL_MAXSIZE))
+    session.mount(UNIX_SOCKET_SCHEME, UnixSocketAdapter(pool_maxsize=POOL_MAXSIZE))
+    return session
@@ -0,0 +1,156 @@
+from json import dumps
+
+from .result import DoResult, TracedAction, TracedElement
+
+# Roles of the accessibility tree that are named differently by Playwright
+PLAYWRIGHT_ROLES = {"image": "img"}
+# Selenium has no role locators, so roles are matched by HTML elements in XPath
+SELENIUM_ELEMENTS = {
+    "button": "self::button or self::input[@type='button' or @type='submit' or @type='reset']",
+    "checkbox": "self::input[@type='checkbox']",
+    "combobox": "self::select",
+    "heading": "self::h1 or self::h2 or self::h3 or self::h4 or self::h5 or self::h6",
+    "image": "self::img",
+    "link": "self::a",
+    "radio": "self::input[@type='radio']",
+    "textbox": "self::textarea or self::input[not(@type) or @type='text' or @type='email' or @type='password']",
+}
+# Conditions of XPath matching elements by their accessible names, including names given by labels
+SELENIUM_NAMES = (
+    "normalize-space(.)={name}",
+    "@aria-label={name}",
+    "@placeholder={name}",
+    "@title={name}",
+    "@value={name}",
+    "@alt={name}",
+    "@id=//label[normalize-space(.)={name}]/@for",
+    "ancestor::label[normalize-space(.)={name}]",
+    "@aria-labelledby=//*[normalize-space(.)={name}]/@id",
+)
+SELENIUM_KEYS = {"Backspace": "BACK_SPACE", "Enter": "ENTER", "Escape": "ESCAPE", "Tab": "TAB"}
+
+
+def generate_code(trace: DoResult | list[TracedAction], framework: str = "playwright") -> str:
+    """
+    Generates code that repeats the actions of do() with the driver directly, without the model.
+
+    Elements are located by their roles and names instead of IDs, so that the code keeps working
+    as long as the elements keep their names. Actions that cannot be converted are kept as comments.
+
+    Args:
+        trace: Result of do() or its trace.
+        framework: Either "playwright" (sync API, using `page`) or "selenium" (using `driver`, `By`, `Keys`
+            and `ActionChains`).
+
+    Returns:
+        Python code, one action per line (Selenium typing takes two).
+    """
+    if isinstance(trace, DoResult):
+        trace = trace.trace
+    if framework == "playwright":
+        convert = _playwright
+    elif framework == "selenium":
+        convert = _selenium
+    else:
+        raise ValueError(f"Unsupported framework: {framework}")
+
+    lines = []
+    for action in trace:
+        line = convert(action)
+        if line is None:
+            args = ", ".join(f"{name}={value!r}" for name, value in action.args.items())
+            line = f"# {action.tool}({args}) cannot be converted"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _playwright(action: TracedAction) -> str | None:
+    args = action.args
+    if action.tool == "NavigateToUrlTool":
+        return f"page.goto({_quote(args['url'])})"
+    if action.tool == "NavigateBackTool":
+        return "page.go_back()"
+    if action.tool == "PressKeyTool":
+        return f"page.keyboard.press({_quote(args['key'])})"
+
+    elements = {name: _playwright_locator(element) for name, element in action.elements.items()}
+    if None in elements.values() or not elements:
+        return None
+    if action.tool == "ClickTool":
+        return f"{elements['id']}.click()"
+    if action.tool == "TypeTool":
+        return f"{elements['id']}.fill({_quote(args['text'])})"
+    if action.tool == "HoverTool":
+        return f"{elements['id']}.hover()"
+    if action.tool == "ScrollTool":
+        return f"{elements['id']}.scroll_into_view_if_needed()"
+    if action.tool == "UploadTool":
+        return f"{elements['id']}.set_input_files({args['paths']!r})"
+    if action.tool == "DragAndDropTool":
+        return f"{elements['from_id']}.drag_to({elements['to_id']})"
+    return None
+
+
+def _playwright_locator(element: TracedElement) -> str | None:
+    if not element.role or not element.name:
+        return None
+    if element.role == "text":
+        return f"page.get_by_text({_quote(element.name)}, exact=True)"
+    role = PLAYWRIGHT_ROLES.get(element.role, element.role)
+    return f"page.get_by_role({_quote(role)}, name={_quote(element.name)}, exact=True)"
+
+
+def _selenium(action: TracedAction) -> str | None:
+    args = action.args
+    if action.tool == "NavigateToUrlTool":
+        return f"driver.get({_quote(args['url'])})"
+    if action.tool == "NavigateBackTool":
+        return "driver.back()"
+    if action.tool == "PressKeyTool":
+        key = SELENIUM_KEYS.get(args["key"])
+        return f"ActionChains(driver).send_keys(Keys.{key}).perform()" if key else None
+
+    elements = {name: _selenium_locator(element) for name, element in action.elements.items()}
+    if None in elements.values() or not elements:
+        return None
+    if action.tool == "ClickTool":
+        return f"{elements['id']}.click()"
+    if action.tool == "TypeTool":
+        return f"{elements['id']}.clear()\n{elements['id']}.send_keys({_quote(args['text'])})"
+    if action.tool == "HoverTool":
+        return f"ActionChains(driver).move_to_element({elements['id']}).perform()"
+    if action.tool == "ScrollTool":
+        return f"ActionChains(driver).scroll_to_element({elements['id']}).perform()"
+    if action.tool == "UploadTool":
+        # Multiple files are uploaded as newline-separated paths
+        paths = "\n".join(args["paths"])
+        return f"{elements['id']}.send_keys({_quote(paths)})"
+    if action.tool == "DragAndDropTool":
+        return f"ActionChains(driver).drag_and_drop({elements['from_id']}, {elements['to_id']}).perform()"
+    return None
+
+
+def _selenium_locator(element: TracedElement) -> str | None:
+    if not element.role or not element.name:
+        return None
+    name = _xpath_literal(element.name)
+    tags = SELENIUM_ELEMENTS.get(element.role, "false()")
+    if element.role == "text":
+        xpath = f"//*[normalize-space(text())={name}]"
+    else:
+        names = " or ".join(condition.format(name=name) for condition in SELENIUM_NAMES)
+        xpath = f"//*[({tags} or @role='{element.role}') and ({names})]"
+    return f"driver.find_element(By.XPATH, {_quote(xpath)})"
+
+
+def _quote(text: str) -> str:
+    return dumps(text, ensure_ascii=False)
+
+
+def _xpath_literal(text: str) -> str:
+    if "'" not in text:
+        return f"'{text}'"
+    if '"' not in text:
+        return f'"{text}"'
+    parts = ', "\'", '.join(f"'{part}'" for part in text.split("'"))
+    return f"concat({parts})"
@@ -1,8 +1,21 @@
-from typing import TypeAlias
+from typing import TYPE_CHECKING, TypeAlias
 
-from appium.webdriver.webelement import WebElement as AppiumElement
-from playwright.async_api import Locator as PlaywrightElementAsync
-from playwright.sync_api import Locator as PlaywrightElement
-from selenium.webdriver.remote.webelement import WebElement as SeleniumElement
+if TYPE_CHECKING:
+    from appium.webdriver.webelement import WebElement as AppiumElement
+    from playwright.async_api import Locator as PlaywrightElementAsync
+    from playwright.sync_api import Locator as PlaywrightElement
+    from selenium.webdriver.remote.webelement import WebElement as SeleniumElement
 
-Element: TypeAlias = AppiumElement | PlaywrightElement | PlaywrightElementAsync | SeleniumElement
+    Element: TypeAlias = AppiumElement | PlaywrightElement | PlaywrightElementAsync | SeleniumElement
+
+
+def __getattr__(name: str):
+    # Driver libraries are heavy to import, so only load all of them when the alias is used at runtime
+    if name == "Element":
+        from appium.webdriver.webelement import WebElement as AppiumElement
+        from playwright.async_api import Locator as PlaywrightElementAsync
+        from playwright.sync_api import Locator as PlaywrightElement
+        from selenium.webdriver.remote.webelement import WebElement as SeleniumElement
+
+        return AppiumElement | PlaywrightElement | PlaywrightElementAsync | SeleniumElement
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,6 @@
+from hashlib import sha1
 from math import ceil
-from time import sleep
+from time import perf_counter, sleep
 from typing import Literal
 
 from appium.webdriver import Remote
@@ -9,7 +10,13 @@ from selenium.common.exceptions import UnknownMethodException
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
 
-from ..accessibility import UIAutomator2AccessibilityTree, XCUITestAccessibilityTree
+from .. import hooks
+from ..accessibility import (
+    AccessibilityElement,
+    BaseAccessibilityTree,
+    UIAutomator2AccessibilityTree,
+    XCUITestAccessibilityTree,
+)
 from ..logutils import get_logger
 from ..tools.click_tool import ClickTool
 from ..tools.drag_and_drop_tool import DragAndDropTool
@@ -17,6 +24,8 @@ from ..tools.press_key_tool import PressKeyTool
 from ..tools.type_tool import TypeTool
 from .base_driver import BaseDriver
 from .keys import Key
+from .page_state import PageState
+from .screenshot_options import ScreenshotOptions
 
 logger = get_logger(__name__)
 
@@ -34,6 +43,7 @@ class AppiumDriver(BaseDriver):
         self.delay: float = 0
         self.hide_keyboard_after_typing = False
         self.double_fetch_page_source = False
+        self.screenshot_options = ScreenshotOptions()
         self.platform: Literal["uiautomator2", "xcuitest"]
         if self.driver.capabilities.get("automationName", "").lower() == "uiautomator2":
             self.platform = "uiautomator2"
@@ -42,18 +52,60 @@ class AppiumDriver(BaseDriver):
 
     @property
     def accessibility_tree(self) -> XCUITestAccessibilityTree | UIAutomator2AccessibilityTree:
+        return self._capture_accessibility_tree()
+
+    def refresh_accessibility_tree(self, previous: BaseAccessibilityTree) -> BaseAccessibilityTree:
+        return self._capture_accessibility_tree(previous)
+
+    def _capture_accessibility_tree(
+        self, previous: BaseAccessibilityTree | None = None
+    ) -> XCUITestAccessibilityTree | UIAutomator2AccessibilityTree:
         self._ensure_native_app_context()
+        started = perf_counter()
         sleep(self.delay)
+        hooks.emit("page_loaded", platform=self.platform, duration=perf_counter() - started)
+        started = perf_counter()
         # Hacky workaround for cloud providers reporting stale page source.
         # Intentionally fetch and discard the page source to refresh internal state.
         if self.double_fetch_page_source:
             _ = self.driver.page_source
         xml_string = self.driver.page_source
+        if hooks.enabled("tree_captured"):
+            # Counting elements of the page source needs a pass over it, which is only made when observed
+            nodes = xml_string.count("<") - xml_string.count("</") - xml_string.count("<?")
+            duration = perf_counter() - started
+            hooks.emit("tree_captured", platform=self.platform, duration=duration, nodes=nodes, frames=1)
+
+        # Page source is fetched anyway, so its hash tells whether the screen has changed since the previous capture
+        change_token = sha1(xml_string.encode()).hexdigest()
+        if previous is not None and change_token == previous.change_token:
+            logger.debug("Screen has not changed since the previous capture, reusing its accessibility tree")
+            return previous  # type: ignore[return-value]
 
         if self.platform == "uiautomator2":
-            return UIAutomator2AccessibilityTree(xml_string)
+            accessibility_tree = UIAutomator2AccessibilityTree(xml_string)
         else:
-            return XCUITestAccessibilityTree(xml_string)
+            accessibility_tree = XCUITestAccessibilityTree(xml_string)
+        accessibility_tree.change_token = change_token
+        return accessibility_tree
+
+    def capture_page_state(
+        self,
+        accessibility_tree: bool = True,
+        screenshot: bool = False,
+        clip: AccessibilityElement | None = None,
+    ) -> PageState:
+        tree = self.accessibility_tree if accessibility_tree else None
+        screenshot_data = self.capture_screenshot(clip) if screenshot else None
+
+        # Title and URL are only available in webview context, switch once and read both.
+        self._ensure_webview_context()
+        try:
+            title, url = self.driver.title, self.driver.current_url
+        except UnknownMethodException:
+            title, url = "", ""
+
+        return PageState(accessibility_tree=tree, title=title, url=url, app=self.app, screenshot=screenshot_data)
 
     def click(self, id: int) -> None:
         self._ensure_native_app_context()
@@ -66,8 +118,7 @@ class AppiumDriver(BaseDriver):
 
     def drag_and_drop(self, from_id: int, to_id: int) -> None:
         self._ensure_native_app_context()
-        from_element = self.find_element(from_id)
-        to_element = self.find_element(to_id)
+        from_element, to_element = self.resolve_elements([from_id, to_id])
         self._scroll_into_view(from_element)
         self.driver.drag_and_drop(from_element, to_element)
 
@@ -96,7 +147,24 @@ class AppiumDriver(BaseDriver):
 
     @property
     def screenshot(self) -> str:
-        return self.driver.get_screenshot_as_base64()
+        return self.capture_screenshot()
+
+    def capture_screenshot(self, clip: AccessibilityElement | None = None) -> str:
+        screenshot = None
+        if clip is not None:
+            self._ensure_native_app_context()
+            try:
+                if self.platform == "xcuitest":
+                    element = self._find_element_ios(clip)
+                else:
+                    element = self._find_element_android(clip)
+                screenshot = element.screenshot_as_base64
+            except Exception as e:
+                logger.debug(f"Could not capture element screenshot: {e}")
+        if screenshot is None:
+            screenshot = self.driver.get_screenshot_as_base64()
+        # Device screenshots are always PNG, so downscaling and format conversion happen locally
+        return self.screenshot_options.encode(screenshot)
 
     def scroll_to(self, id: int):
         element = self.find_element(id)
@@ -139,11 +207,30 @@ class AppiumDriver(BaseDriver):
         )
 
     def find_element(self, id: int) -> WebElement:
-        element = self.accessibility_tree.element_by_id(id)
+        return self.resolve_elements([id])[0]
+
+    def resolve_elements(self, ids: list[int]) -> list[WebElement]:
+        accessibility_tree = self.accessibility_tree
         if self.platform == "xcuitest":
-            return self._find_element_ios(element)
+            by, locate, separator = By.IOS_PREDICATE, self._ios_predicate, " OR "
         else:
-            return self._find_element_android(element)
+            by, locate, separator = By.XPATH, self._android_xpath, " | "
+        unique_ids = sorted(set(ids))
+        locators = {id: locate(accessibility_tree.element_by_id(id)) for id in unique_ids}
+
+        if len(unique_ids) > 1:
+            # Raw IDs follow the order of the page source, which combined queries return matches in,
+            # so matches map back to IDs as long as there is exactly one match per ID
+            query = separator.join(f"({locator})" for locator in locators.values())
+            logger.debug(f"Finding elements by combined query: {query}")
+            matches = self.driver.find_elements(by, query)
+            if len(matches) == len(unique_ids):
+                elements = dict(zip(unique_ids, matches))
+                return [elements[id] for id in ids]  # type: ignore[reportReturnType]
+            logger.debug(f"Combined query matched {len(matches)} elements, finding them one by one")
+
+        elements = {id: self.driver.find_element(by, locator) for id, locator in locators.items()}
+        return [elements[id] for id in ids]  # type: ignore[reportReturnType]
 
     def execute_script(self, script: str):
         self._ensure_webview_context()
@@ -167,6 +254,11 @@ class AppiumDriver(BaseDriver):
 
     # Use iOS Predicate locators for XCUITest
     def _find_element_ios(self, element):
+        predicate = self._ios_predicate(element)
+        logger.debug(f"Finding element by predicate: {predicate}")
+        return self.driver.find_element(By.IOS_PREDICATE, predicate)  # type: ignore[reportReturnType]
+
+    def _ios_predicate(self, element) -> str:
         predicate = f'type == "{element.type}"'
 
         props = {}
@@ -182,11 +274,15 @@ class AppiumDriver(BaseDriver):
             props_str = " AND ".join(props)
             predicate += f" AND {props_str}"
 
-        logger.debug(f"Finding element by predicate: {predicate}")
-        return self.driver.find_element(By.IOS_PREDICATE, predicate)  # type: ignore[reportReturnType]
+        return predicate
 
     # Use XPath for UIAutomator2
     def _find_element_android(self, element):
+        xpath = self._android_xpath(element)
+        logger.debug(f"Finding element by xpath: {xpath}")
+        return self.driver.find_element(By.XPATH, xpath)  # type: ignore[reportReturnType]
+
+    def _android_xpath(self, element) -> str:
         xpath = f"//{element.type}"
 
         props = {}
@@ -199,8 +295,7 @@ class AppiumDriver(BaseDriver):
             props = [f'@{k}="{v}"' for k, v in props.items()]
             xpath += f"[{' and '.join(props)}]"
 
-        logger.debug(f"Finding element by xpath: {xpath}")
-        return self.driver.find_element(By.XPATH, xpath)  # type: ignore[reportReturnType]
+        return xpath
 
     def _hide_keyboard(self):
         if self.platform == "uiautomator2":
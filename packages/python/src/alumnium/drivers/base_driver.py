@@ -1,16 +1,35 @@
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
+from threading import Thread
+from typing import TYPE_CHECKING
 
-from ..accessibility import BaseAccessibilityTree
-from . import Element
+from ..accessibility import AccessibilityElement, BaseAccessibilityTree
 from .keys import Key
+from .page_state import PageState
+
+if TYPE_CHECKING:
+    from . import Element
 
 
 class BaseDriver(ABC):
+    # Thread the driver can only be used from, if any, e.g. the one that started synchronous Playwright
+    owner_thread: Thread | None = None
+
     @property
     @abstractmethod
     def accessibility_tree(self) -> BaseAccessibilityTree:
         pass
 
+    def refresh_accessibility_tree(self, previous: BaseAccessibilityTree) -> BaseAccessibilityTree:
+        """
+        Captures the accessibility tree again, or returns the previous one if the page has not changed since.
+
+        Drivers override this when they can tell cheaply whether the page has changed,
+        so that actions that leave the page as it was do not cost a full tree capture.
+        """
+        return self.accessibility_tree
+
     @abstractmethod
     def click(self, id: int):
         pass
@@ -71,6 +90,15 @@ class BaseDriver(ABC):
     def find_element(self, id: int) -> Element:
         pass
 
+    def resolve_elements(self, ids: list[int]) -> list[Element]:
+        """
+        Finds native elements by their raw IDs at once, which is cheaper than finding them one by one.
+        Tools acting on several elements should use it.
+
+        Drivers override this to capture the accessibility tree once and look up all elements in a single pass.
+        """
+        return [self.find_element(id) for id in ids]
+
     @abstractmethod
     def execute_script(self, script: str):
         pass
@@ -86,3 +114,39 @@ class BaseDriver(ABC):
     @abstractmethod
     def print_to_pdf(self, filepath: str):
         pass
+
+    def capture_screenshot(self, clip: AccessibilityElement | None = None) -> str | bytes:
+        """
+        Captures a screenshot, optionally clipped to the element bounding box.
+        Drivers return raw image bytes when they have them, base64-encoded strings otherwise.
+        Drivers that cannot clip return the whole screenshot.
+        """
+        return self.screenshot
+
+    def capture_page_state(
+        self,
+        accessibility_tree: bool = True,
+        screenshot: bool = False,
+        clip: AccessibilityElement | None = None,
+    ) -> PageState:
+        """
+        Captures title, URL and optionally accessibility tree and screenshot of the current page.
+
+        Drivers override this to batch or parallelize retrievals that would otherwise
+        be issued one after another.
+
+        Args:
+            accessibility_tree: Whether to capture the accessibility tree. Defaults to True.
+            screenshot: Whether to capture the screenshot. Defaults to False.
+            clip: Element to clip the screenshot to. Defaults to the whole page.
+
+        Returns:
+            PageState with the requested data.
+        """
+        return PageState(
+            accessibility_tree=self.accessibility_tree if accessibility_tree else None,
+            title=self.title,
+            url=self.url,
+            app=self.app,
+            screenshot=self.capture_screenshot(clip) if screenshot else None,
+        )
@@ -0,0 +1,68 @@
+from base64 import b64decode
+from typing import Any, Awaitable, Callable, Generator
+
+CHUNK_SIZE = 1024 * 1024
+
+# CDP commands yielded as (method, params) pairs, which are sent their responses and return the result
+CdpCommands = Generator[tuple[str, dict], Any, Any]
+
+
+def stream_commands(handle: str, filepath: str) -> CdpCommands:
+    """
+    CDP commands reading an IO stream chunk by chunk and writing it to the file,
+    so that large payloads (e.g. PDFs) are never held in memory at once.
+
+    Args:
+        handle: Stream handle returned by CDP (e.g. by `Page.printToPDF` with `ReturnAsStream`).
+        filepath: Path to write the stream to.
+    """
+    try:
+        with open(filepath, "wb") as f:
+            while True:
+                chunk = yield "IO.read", {"handle": handle, "size": CHUNK_SIZE}
+                f.write(decode_chunk(chunk))
+                if chunk.get("eof"):
+                    break
+    finally:
+        yield "IO.close", {"handle": handle}
+
+
+def write_stream(send: Callable[[str, dict], dict], handle: str, filepath: str):
+    """Writes a CDP IO stream to the file, see `stream_commands()`."""
+    send_commands(stream_commands(handle, filepath), send)
+
+
+async def write_stream_async(send: Callable[[str, dict], Awaitable[dict]], handle: str, filepath: str):
+    await send_commands_async(stream_commands(handle, filepath), send)
+
+
+def decode_chunk(chunk: dict) -> bytes:
+    data = chunk.get("data", "")
+    return b64decode(data) if chunk.get("base64Encoded") else data.encode()
+
+
+def send_commands(commands: CdpCommands, send: Callable[[str, dict], Any]) -> Any:
+    """Sends the commands one by one, raising their errors into the generator, and returns its result."""
+    response, error = None, None
+    while True:
+        try:
+            method, params = commands.throw(error) if error else commands.send(response)
+        except StopIteration as stop:
+            return stop.value
+        try:
+            response, error = send(method, params), None
+        except Exception as e:
+            response, error = None, e
+
+
+async def send_commands_async(commands: CdpCommands, send: Callable[[str, dict], Awaitable[Any]]) -> Any:
+    response, error = None, None
+    while True:
+        try:
+            method, params = commands.throw(error) if error else commands.send(response)
+        except StopIteration as stop:
+            return stop.value
+        try:
+            response, error = await send(method, params), None
+        except Exception as e:
+            response, error = None, e
@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+
+from ..accessibility import BaseAccessibilityTree
+
+
+@dataclass
+class PageState:
+    """Snapshot of the page retrieved by the driver in a single capture."""
+
+    title: str
+    url: str
+    app: str
+    accessibility_tree: BaseAccessibilityTree | None = None
+    screenshot: str | bytes | None = None
@@ -1,12 +1,14 @@
-from asyncio import AbstractEventLoop, run_coroutine_threadsafe
+from asyncio import AbstractEventLoop, gather, run_coroutine_threadsafe
 from base64 import b64encode
 from contextlib import asynccontextmanager
+from time import perf_counter
+from typing import AsyncIterator
 from urllib.parse import urlparse
 
 from playwright.async_api import Error, Frame, Locator, Page, TimeoutError
 
-from .. import FULL_PAGE_SCREENSHOT
-from ..accessibility import ChromiumAccessibilityTree
+from .. import FULL_PAGE_SCREENSHOT, hooks
+from ..accessibility import AccessibilityElement, BaseAccessibilityTree, ChromiumAccessibilityTree
 from ..logutils import get_logger
 from ..tools.click_tool import ClickTool
 from ..tools.drag_and_drop_tool import DragAndDropTool
@@ -15,8 +17,11 @@ from ..tools.press_key_tool import PressKeyTool
 from ..tools.type_tool import TypeTool
 from ..tools.upload_tool import UploadTool
 from .base_driver import BaseDriver
+from .cdp_stream import send_commands_async, write_stream_async
 from .keys import Key
+from .page_state import PageState
 from .playwright_driver import PlaywrightDriver
+from .screenshot_options import ScreenshotOptions, capture_commands
 
 logger = get_logger(__name__)
 
@@ -28,6 +33,7 @@ class PlaywrightAsyncDriver(BaseDriver):
         self.loop = loop
         self.autoswitch_to_new_tab = True
         self.full_page_screenshot = FULL_PAGE_SCREENSHOT
+        self.screenshot_options = ScreenshotOptions()
         self.supported_tools = {
             ClickTool,
             DragAndDropTool,
@@ -37,6 +43,7 @@ class PlaywrightAsyncDriver(BaseDriver):
             UploadTool,
         }
         self.oopif_frames: set[Frame] = set()
+        self._found_elements: set[tuple[Frame, int]] = set()
         self._run_async(self._init_cdp_session())
         self._run_async(self._setup_page_tracking(page))
 
@@ -48,10 +55,27 @@ class PlaywrightAsyncDriver(BaseDriver):
     def accessibility_tree(self) -> ChromiumAccessibilityTree:
         return self._run_async(self._accessibility_tree)
 
+    def refresh_accessibility_tree(self, previous: BaseAccessibilityTree) -> BaseAccessibilityTree:
+        return self._run_async(self._capture_accessibility_tree(previous))
+
     @property
     async def _accessibility_tree(self) -> ChromiumAccessibilityTree:
-        await self._wait_for_page_to_load()
+        return await self._capture_accessibility_tree()
 
+    async def _capture_accessibility_tree(
+        self, previous: BaseAccessibilityTree | None = None
+    ) -> ChromiumAccessibilityTree:
+        started = perf_counter()
+        await self._wait_for_page_to_load()
+        hooks.emit("page_loaded", platform=self.platform, duration=perf_counter() - started)
+        change_token = await self._change_token()
+        if previous is not None and change_token is not None and change_token == previous.change_token:
+            logger.debug("Page has not changed since the previous capture, reusing its accessibility tree")
+            return previous  # type: ignore[return-value]
+        return await self._fetch_accessibility_tree(change_token)
+
+    async def _fetch_accessibility_tree(self, change_token: str | None = None) -> ChromiumAccessibilityTree:
+        started = perf_counter()
         frame_tree = await self._send_cdp_command("Page.getFrameTree")
         frame_ids = self._get_all_frame_ids(frame_tree["frameTree"])
         main_frame_id = frame_tree["frameTree"]["frame"]["id"]
@@ -79,43 +103,87 @@ class PlaywrightAsyncDriver(BaseDriver):
             self._merge_frame_nodes(nodes, oopif_frame_id, frame_to_iframe_map, pw_frame, frame_index, all_nodes)
             frame_index += 1
 
-        return ChromiumAccessibilityTree({"nodes": all_nodes})
+        hooks.emit(
+            "tree_captured",
+            platform=self.platform,
+            duration=perf_counter() - started,
+            nodes=len(all_nodes),
+            frames=len(frame_ids) + len(oopif_frame_ids),
+        )
+        accessibility_tree = ChromiumAccessibilityTree({"nodes": all_nodes})
+        accessibility_tree.change_token = change_token
+        return accessibility_tree
+
+    def capture_page_state(
+        self,
+        accessibility_tree: bool = True,
+        screenshot: bool = False,
+        clip: AccessibilityElement | None = None,
+    ) -> PageState:
+        return self._run_async(self._capture_page_state(accessibility_tree, screenshot, clip))
+
+    async def _capture_page_state(
+        self,
+        accessibility_tree: bool,
+        screenshot: bool,
+        clip: AccessibilityElement | None,
+    ) -> PageState:
+        change_token = None
+        if accessibility_tree:
+            await self._wait_for_page_to_load()
+            change_token = await self._change_token()
+
+        # Once the page is stable, tree, title and screenshot are independent and can be fetched concurrently.
+        tree, title, screenshot_data = await gather(
+            self._fetch_accessibility_tree(change_token) if accessibility_tree else self._none(),
+            self._title,
+            self._capture_screenshot(clip) if screenshot else self._none(),
+        )
+        return PageState(
+            accessibility_tree=tree,
+            title=title,
+            url=self.page.url,
+            app=self.app,
+            screenshot=screenshot_data,
+        )
+
+    async def _none(self) -> None:
+        return None
 
     def click(self, id: int):
         self._run_async(self._click(id))
 
     async def _click(self, id: int):
-        element = await self._find_element(id)
-        tag_name = await element.evaluate("el => el.tagName")
-        if tag_name.lower() == "option":
-            value = await element.evaluate("el => el.value")
-            async with self._autoswitch_to_new_tab():
-                await element.locator("xpath=ancestor::select").select_option(value)
-        else:
-            async with self._autoswitch_to_new_tab():
-                await element.click(force=True)
+        async with self._resolved_elements(id) as (element,):
+            tag_name = await element.evaluate("el => el.tagName")
+            if tag_name.lower() == "option":
+                value = await element.evaluate("el => el.value")
+                async with self._autoswitch_to_new_tab():
+                    await element.locator("xpath=ancestor::select").select_option(value)
+            else:
+                async with self._autoswitch_to_new_tab():
+                    await element.click(force=True)
 
     def drag_slider(self, id: int, value: float):
         self._run_async(self._drag_slider(id, value))
 
     async def _drag_slider(self, id: int, value: float):
-        element = await self._find_element(id)
-        await element.fill(f"{value:g}")
+        async with self._resolved_elements(id) as (element,):
+            await element.fill(f"{value:g}")
 
     def drag_and_drop(self, from_id: int, to_id: int):
         self._run_async(self._drag_and_drop(from_id, to_id))
 
     async def _drag_and_drop(self, from_id: int, to_id: int):
-        from_element = await self._find_element(from_id)
-        to_element = await self._find_element(to_id)
-        await from_element.drag_to(to_element)
+        async with self._resolved_elements(from_id, to_id) as (from_element, to_element):
+            await from_element.drag_to(to_element)
 
     def hover(self, id: int):
         self._run_async(self._hover(id))
 
     async def _hover(self, id: int):
-        element = await self._find_element(id)
-        await element.hover()
+        async with self._resolved_elements(id) as (element,):
+            await element.hover()
 
     def press_key(self, key: Key):
         self._run_async(self._press_key(key))
@@ -148,15 +216,31 @@ class PlaywrightAsyncDriver(BaseDriver):
 
     @property
     async def _screenshot(self) -> str:
-        screenshot_bytes = await self.page.screenshot(full_page=self.full_page_screenshot)
-        return b64encode(screenshot_bytes).decode()
+        screenshot = await self._capture_screenshot()
+        return b64encode(screenshot).decode() if isinstance(screenshot, bytes) else screenshot
+
+    def capture_screenshot(self, clip: AccessibilityElement | None = None) -> str | bytes:
+        return self._run_async(self._capture_screenshot(clip))
+
+    async def _capture_screenshot(self, clip: AccessibilityElement | None = None) -> str | bytes:
+        # Elements inside iframes report box model relative to their frame, so clip to main frame elements only
+        if clip is not None and (clip.backend_node_id is None or clip.frame not in (None, self.page.main_frame)):
+            clip = None
+
+        if self.screenshot_options.is_default and clip is None:
+            return await self.page.screenshot(full_page=self.full_page_screenshot)
+
+        commands = capture_commands(
+            self.screenshot_options, self.full_page_screenshot, clip.backend_node_id if clip else None
+        )
+        return await send_commands_async(commands, self._send_cdp_command)
 
     def scroll_to(self, id: int):
         self._run_async(self._scroll_to(id))
 
     async def _scroll_to(self, id: int):
-        element = await self._find_element(id)
-        await element.scroll_into_view_if_needed()
+        async with self._resolved_elements(id) as (element,):
+            await element.scroll_into_view_if_needed()
 
     @property
     def title(self) -> str:
@@ -170,18 +254,18 @@ class PlaywrightAsyncDriver(BaseDriver):
         self._run_async(self._type(id, text))
 
     async def _type(self, id: int, text: str):
-        element = await self._find_element(id)
-        await element.fill(text)
+        async with self._resolved_elements(id) as (element,):
+            await element.fill(text)
 
     def upload(self, id: int, paths: list[str]):
         self._run_async(self._upload(id, paths))
 
     async def _upload(self, id: int, paths: list[str]):
-        element = await self._find_element(id)
-        async with self.page.expect_file_chooser(timeout=5000) as fc_info:
-            await element.click(force=True)
-        file_chooser = await fc_info.value
-        await file_chooser.set_files(paths)
+        async with self._resolved_elements(id) as (element,):
+            async with self.page.expect_file_chooser(timeout=5000) as fc_info:
+                await element.click(force=True)
+            file_chooser = await fc_info.value
+            await file_chooser.set_files(paths)
 
     @property
     def url(self) -> str:
@@ -194,18 +278,65 @@ class PlaywrightAsyncDriver(BaseDriver):
     def find_element(self, id: int) -> Locator:
         return self._run_async(self._find_element(id))
 
+    def resolve_elements(self, ids: list[int]) -> list[Locator]:
+        return self._run_async(self._resolve_elements(ids))
+
     async def _find_element(self, id: int) -> Locator:
-        accessibility_tree = await self._accessibility_tree
-        accessibility_element = accessibility_tree.element_by_id(id)
-        frame = accessibility_element.frame or self.page.main_frame
+        return (await self._resolve_elements([id]))[0]
 
-        backend_node_id = accessibility_element.backend_node_id
-        if backend_node_id is None:
-            raise ValueError(f"Element {id} has no backendNodeId")
+    async def _resolve_elements(self, ids: list[int]) -> list[Locator]:
+        elements = await self._tag_elements_by_ids(ids)
+        self._found_elements.update(elements)
+        return [self._locator(frame, backend_node_id) for frame, backend_node_id in elements]
+
+    async def _tag_elements_by_ids(self, ids: list[int]) -> list[tuple[Frame, int]]:
+        accessibility_tree = await self._accessibility_tree
+        frames: list[Frame] = []
+        backend_node_ids: list[int] = []
+        for id in ids:
+            accessibility_element = accessibility_tree.element_by_id(id)
+            if accessibility_element.backend_node_id is None:
+                raise ValueError(f"Element {id} has no backendNodeId")
+            frames.append(accessibility_element.frame or self.page.main_frame)
+            backend_node_ids.append(accessibility_element.backend_node_id)
+
+        # Elements in out-of-process frames are only reachable through sessions of their frames,
+        # all other elements are tagged at once through the page session
+        sessions: dict[Frame | None, list[int]] = {}
+        for frame, backend_node_id in zip(frames, backend_node_ids):
+            is_oopif = frame != self.page.main_frame and frame in self.oopif_frames
+            sessions.setdefault(frame if is_oopif else None, []).append(backend_node_id)
+        for oopif_frame, session_backend_node_ids in sessions.items():
+            await self._tag_elements(oopif_frame, session_backend_node_ids)
+
+        return list(zip(frames, backend_node_ids))
+
+    def _locator(self, frame: Frame, backend_node_id: int) -> Locator:
+        return frame.locator(PlaywrightDriver._tagged_selector([backend_node_id]))
 
-        is_oopif = frame != self.page.main_frame and frame in self.oopif_frames
-        if is_oopif:
-            session = await self.page.context.new_cdp_session(frame)
+    @asynccontextmanager
+    async def _resolved_elements(self, *ids: int) -> AsyncIterator[list[Locator]]:
+        elements = await self._tag_elements_by_ids(list(ids))
+        try:
+            yield [self._locator(frame, backend_node_id) for frame, backend_node_id in elements]
+        finally:
+            await self._untag_elements(elements)
+
+    async def _untag_elements(self, elements: list[tuple[Frame, int]]):
+        backend_node_ids_by_frame: dict[Frame, list[int]] = {}
+        for frame, backend_node_id in elements:
+            if (frame, backend_node_id) not in self._found_elements:
+                backend_node_ids_by_frame.setdefault(frame, []).append(backend_node_id)
+        for frame, backend_node_ids in backend_node_ids_by_frame.items():
+            try:
+                selector = PlaywrightDriver._tagged_selector(backend_node_ids)
+                await frame.locator(selector).evaluate_all(PlaywrightDriver.UNTAG_SCRIPT)
+            except Error as error:
+                logger.debug(f"Could not remove tags in frame {frame.url}: {error.message}")
+
+    async def _tag_elements(self, oopif_frame: Frame | None, backend_node_ids: list[int]):
+        if oopif_frame:
+            session = await self.page.context.new_cdp_session(oopif_frame)
         else:
             if self.client is None:
                 self.client = await self.page.context.new_cdp_session(self.page)
@@ -216,25 +347,21 @@ class PlaywrightAsyncDriver(BaseDriver):
             await session.send("DOM.getFlattenedDocument")
             node_ids = await session.send(
                 "DOM.pushNodesByBackendIdsToFrontend",
-                {"backendNodeIds": [backend_node_id]},
-            )
-            node_id = node_ids["nodeIds"][0]
-            await session.send(
-                "DOM.setAttributeValue",
-                {
-                    "nodeId": node_id,
-                    "name": "data-alumnium-id",
-                    "value": str(backend_node_id),
-                },
+                {"backendNodeIds": backend_node_ids},
             )
+            for node_id, backend_node_id in zip(node_ids["nodeIds"], backend_node_ids):
+                await session.send(
+                    "DOM.setAttributeValue",
+                    {
+                        "nodeId": node_id,
+                        "name": PlaywrightDriver.TAG_ATTRIBUTE,
+                        "value": str(backend_node_id),
+                    },
+                )
         finally:
-            if is_oopif:
+            if oopif_frame:
                 await session.detach()
 
-        # TODO: We need to remove the attribute after we are done with the element,
-        # but Playwright locator is lazy and we cannot guarantee when it is safe to do so.
-        return frame.locator(f"css=[data-alumnium-id='{backend_node_id}']")
-
     def execute_script(self, script: str):
         self._run_async(self._execute_script(script))
 
@@ -245,7 +372,9 @@ class PlaywrightAsyncDriver(BaseDriver):
         self._run_async(self._print_to_pdf(filepath))
 
     async def _print_to_pdf(self, filepath: str):
-        await self.page.pdf(path=filepath)
+        # Page.pdf() buffers the whole document in memory, stream it to disk via CDP instead
+        result = await self._send_cdp_command("Page.printToPDF", {"transferMode": "ReturnAsStream"})
+        await write_stream_async(self._send_cdp_command, result["stream"], filepath)
 
     async def _wait_for_page_to_load(self):
         logger.debug("Waiting for page to finish loading:")
@@ -263,6 +392,13 @@ class PlaywrightAsyncDriver(BaseDriver):
             else:
                 raise error
 
+    async def _change_token(self) -> str | None:
+        try:
+            return await self.page.evaluate(PlaywrightDriver.CHANGE_TOKEN_SCRIPT)
+        except Error as error:
+            logger.debug(f"Could not get change token: {error.message}")
+            return None
+
     @asynccontextmanager
     async def _autoswitch_to_new_tab(self):
         if not self.autoswitch_to_new_tab:
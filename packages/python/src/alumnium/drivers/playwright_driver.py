@@ -2,13 +2,18 @@ from base64 import b64encode
 from contextlib import contextmanager
 from os import getenv
 from pathlib import Path
+from threading import current_thread
+from time import perf_counter
+from typing import Iterator
 from urllib.parse import urlparse
 
 from playwright.sync_api import Error, Frame, Locator, Page, TimeoutError
 
-from .. import FULL_PAGE_SCREENSHOT
-from ..accessibility import ChromiumAccessibilityTree
+from .. import FULL_PAGE_SCREENSHOT, hooks
+from ..accessibility import AccessibilityElement, BaseAccessibilityTree, ChromiumAccessibilityTree
 from ..logutils import get_logger
+from ..telemetry import set_attributes
+from ..timings import phase
 from ..tools.click_tool import ClickTool
 from ..tools.drag_and_drop_tool import DragAndDropTool
 from ..tools.hover_tool import HoverTool
@@ -16,7 +21,9 @@ from ..tools.press_key_tool import PressKeyTool
 from ..tools.type_tool import TypeTool
 from ..tools.upload_tool import UploadTool
 from .base_driver import BaseDriver
+from .cdp_stream import send_commands, write_stream
 from .keys import Key
+from .screenshot_options import ScreenshotOptions, capture_commands
 
 logger = get_logger(__name__)
 
@@ -33,11 +40,18 @@ class PlaywrightDriver(BaseDriver):
             f"(...scriptArgs) => new Promise((resolve) => "
             f"{{ const arguments = [...scriptArgs, resolve]; {f.read()} }})"
         )
+    CHANGE_TOKEN_SCRIPT = "() => window[Symbol.for('alumnium')]?.changeToken?.() ?? null"
+    # Elements are tagged with the attribute to be located by Playwright
+    TAG_ATTRIBUTE = "data-alumnium-id"
+    UNTAG_SCRIPT = f"elements => elements.forEach((element) => element.removeAttribute('{TAG_ATTRIBUTE}'))"
 
     def __init__(self, page: Page):
         self.page = page
+        # Synchronous Playwright API is bound to the greenlet of the thread it was started in
+        self.owner_thread = current_thread()
         self.autoswitch_to_new_tab = True
         self.full_page_screenshot = FULL_PAGE_SCREENSHOT
+        self.screenshot_options = ScreenshotOptions()
         self.supported_tools = {
             ClickTool,
             DragAndDropTool,
@@ -47,6 +61,8 @@ class PlaywrightDriver(BaseDriver):
             UploadTool,
         }
         self.oopif_frames: set[Frame] = set()
+        # Elements returned by find_element() and resolve_elements() keep their tags, so that their locators stay valid
+        self._found_elements: set[tuple[Frame, int]] = set()
         self._init_cdp_session()
         self._setup_page_tracking(page)
 
@@ -56,7 +72,21 @@ class PlaywrightDriver(BaseDriver):
 
     @property
     def accessibility_tree(self) -> ChromiumAccessibilityTree:
-        self._wait_for_page_to_load()
+        return self._capture_accessibility_tree()
+
+    def refresh_accessibility_tree(self, previous: BaseAccessibilityTree) -> BaseAccessibilityTree:
+        return self._capture_accessibility_tree(previous)
+
+    def _capture_accessibility_tree(self, previous: BaseAccessibilityTree | None = None) -> ChromiumAccessibilityTree:
+        started = perf_counter()
+        with phase("wait"):
+            self._wait_for_page_to_load()
+        hooks.emit("page_loaded", platform=self.platform, duration=perf_counter() - started)
+        change_token = self._change_token()
+        if previous is not None and change_token is not None and change_token == previous.change_token:
+            logger.debug("Page has not changed since the previous capture, reusing its accessibility tree")
+            return previous  # type: ignore[return-value]
+        started = perf_counter()
 
         frame_tree = self._send_cdp_command("Page.getFrameTree")
         frame_ids = self._get_all_frame_ids(frame_tree["frameTree"])
@@ -87,31 +117,40 @@ class PlaywrightDriver(BaseDriver):
             self._merge_frame_nodes(nodes, oopif_frame_id, frame_to_iframe_map, pw_frame, frame_index, all_nodes)
             frame_index += 1
 
-        return ChromiumAccessibilityTree({"nodes": all_nodes})
+        set_attributes(frames=len(frame_ids), oopifs=len(oopif_frame_ids), nodes=len(all_nodes))
+        hooks.emit(
+            "tree_captured",
+            platform=self.platform,
+            duration=perf_counter() - started,
+            nodes=len(all_nodes),
+            frames=len(frame_ids) + len(oopif_frame_ids),
+        )
+        accessibility_tree = ChromiumAccessibilityTree({"nodes": all_nodes})
+        accessibility_tree.change_token = change_token
+        return accessibility_tree
 
     def click(self, id: int):
-        element = self.find_element(id)
-        tag_name = element.evaluate("el => el.tagName")
-        if tag_name.lower() == "option":
-            value = element.evaluate("el => el.value")
-            with self._autoswitch_to_new_tab():
-                element.locator("xpath=ancestor::select").select_option(value)
-        else:
-            with self._autoswitch_to_new_tab():
-                element.click(force=True)
+        with self._resolved_elements(id) as (element,):
+            tag_name = element.evaluate("el => el.tagName")
+            if tag_name.lower() == "option":
+                value = element.evaluate("el => el.value")
+                with self._autoswitch_to_new_tab():
+                    element.locator("xpath=ancestor::select").select_option(value)
+            else:
+                with self._autoswitch_to_new_tab():
+                    element.click(force=True)
 
     def drag_slider(self, id: int, value: float):
-        element = self.find_element(id)
-        element.fill(f"{value:g}")
+        with self._resolved_elements(id) as (element,):
+            element.fill(f"{value:g}")
 
     def drag_and_drop(self, from_id: int, to_id: int):
-        from_element = self.find_element(from_id)
-        to_element = self.find_element(to_id)
-        from_element.drag_to(to_element)
+        with self._resolved_elements(from_id, to_id) as (from_element, to_element):
+            from_element.drag_to(to_element)
 
     def hover(self, id: int):
-        element = self.find_element(id)
-        element.hover()
+        with self._resolved_elements(id) as (element,):
+            element.hover()
 
     def press_key(self, key: Key):
         with self._autoswitch_to_new_tab():
@@ -128,26 +167,40 @@ class PlaywrightDriver(BaseDriver):
 
     @property
     def screenshot(self) -> str:
-        return b64encode(self.page.screenshot(full_page=self.full_page_screenshot)).decode()
+        screenshot = self.capture_screenshot()
+        return b64encode(screenshot).decode() if isinstance(screenshot, bytes) else screenshot
+
+    def capture_screenshot(self, clip: AccessibilityElement | None = None) -> str | bytes:
+        # Elements inside iframes report box model relative to their frame, so clip to main frame elements only
+        if clip is not None and (clip.backend_node_id is None or clip.frame not in (None, self.page.main_frame)):
+            clip = None
+
+        if self.screenshot_options.is_default and clip is None:
+            return self.page.screenshot(full_page=self.full_page_screenshot)
+
+        commands = capture_commands(
+            self.screenshot_options, self.full_page_screenshot, clip.backend_node_id if clip else None
+        )
+        return send_commands(commands, self._send_cdp_command)
 
     def scroll_to(self, id: int):
-        element = self.find_element(id)
-        element.scroll_into_view_if_needed()
+        with self._resolved_elements(id) as (element,):
+            element.scroll_into_view_if_needed()
 
     @property
     def title(self) -> str:
         return self.page.title()
 
     def type(self, id: int, text: str):
-        element = self.find_element(id)
-        element.fill(text)
+        with self._resolved_elements(id) as (element,):
+            element.fill(text)
 
     def upload(self, id: int, paths: list[str]):
-        element = self.find_element(id)
-        with self.page.expect_file_chooser(timeout=5000) as fc_info:
-            element.click(force=True)
-        file_chooser = fc_info.value
-        file_chooser.set_files(paths)
+        with self._resolved_elements(id) as (element,):
+            with self.page.expect_file_chooser(timeout=5000) as fc_info:
+                element.click(force=True)
+            file_chooser = fc_info.value
+            file_chooser.set_files(paths)
 
     @property
     def url(self) -> str:
@@ -158,45 +211,94 @@ class PlaywrightDriver(BaseDriver):
         return urlparse(self.page.url).hostname or "unknown"
 
     def find_element(self, id: int) -> Locator:
-        accessibility_element = self.accessibility_tree.element_by_id(id)
-        frame = accessibility_element.frame or self.page.main_frame
+        return self.resolve_elements([id])[0]
+
+    def resolve_elements(self, ids: list[int]) -> list[Locator]:
+        elements = self._tag_elements_by_ids(ids)
+        self._found_elements.update(elements)
+        return [self._locator(frame, backend_node_id) for frame, backend_node_id in elements]
+
+    def _tag_elements_by_ids(self, ids: list[int]) -> list[tuple[Frame, int]]:
+        accessibility_tree = self.accessibility_tree
+        frames: list[Frame] = []
+        backend_node_ids: list[int] = []
+        for id in ids:
+            accessibility_element = accessibility_tree.element_by_id(id)
+            if accessibility_element.backend_node_id is None:
+                raise ValueError(f"Element {id} has no backendNodeId")
+            frames.append(accessibility_element.frame or self.page.main_frame)
+            backend_node_ids.append(accessibility_element.backend_node_id)
+
+        # Elements in out-of-process frames are only reachable through sessions of their frames,
+        # all other elements are tagged at once through the page session
+        sessions: dict[Frame | None, list[int]] = {}
+        for frame, backend_node_id in zip(frames, backend_node_ids):
+            is_oopif = frame != self.page.main_frame and frame in self.oopif_frames
+            sessions.setdefault(frame if is_oopif else None, []).append(backend_node_id)
+        for oopif_frame, session_backend_node_ids in sessions.items():
+            self._tag_elements(oopif_frame, session_backend_node_ids)
+
+        return list(zip(frames, backend_node_ids))
+
+    def _locator(self, frame: Frame, backend_node_id: int) -> Locator:
+        return frame.locator(self._tagged_selector([backend_node_id]))
+
+    @classmethod
+    def _tagged_selector(cls, backend_node_ids: list[int]) -> str:
+        return "css=" + ", ".join(f"[{cls.TAG_ATTRIBUTE}='{backend_node_id}']" for backend_node_id in backend_node_ids)
 
-        backend_node_id = accessibility_element.backend_node_id
-        if backend_node_id is None:
-            raise ValueError(f"Element {id} has no backendNodeId")
+    @contextmanager
+    def _resolved_elements(self, *ids: int) -> Iterator[list[Locator]]:
+        """Resolves elements for an action and removes their tags once it is done, leaving the DOM as it was."""
+        elements = self._tag_elements_by_ids(list(ids))
+        try:
+            yield [self._locator(frame, backend_node_id) for frame, backend_node_id in elements]
+        finally:
+            self._untag_elements(elements)
+
+    def _untag_elements(self, elements: list[tuple[Frame, int]]):
+        """Removes tags of the elements, except the found ones, with a single call per frame."""
+        backend_node_ids_by_frame: dict[Frame, list[int]] = {}
+        for frame, backend_node_id in elements:
+            if (frame, backend_node_id) not in self._found_elements:
+                backend_node_ids_by_frame.setdefault(frame, []).append(backend_node_id)
+        for frame, backend_node_ids in backend_node_ids_by_frame.items():
+            try:
+                # Unlike evaluate(), evaluate_all() does not wait for elements that are gone, e.g. after navigation
+                frame.locator(self._tagged_selector(backend_node_ids)).evaluate_all(self.UNTAG_SCRIPT)
+            except Error as error:
+                logger.debug(f"Could not remove tags in frame {frame.url}: {error.message}")
 
-        is_oopif = frame != self.page.main_frame and frame in self.oopif_frames
-        session = self.page.context.new_cdp_session(frame) if is_oopif else self.client
+    def _tag_elements(self, oopif_frame: Frame | None, backend_node_ids: list[int]):
+        session = self.page.context.new_cdp_session(oopif_frame) if oopif_frame else self.client
         try:
             # Beware!
             session.send("DOM.enable")
             session.send("DOM.getFlattenedDocument")
             node_ids = session.send(
                 "DOM.pushNodesByBackendIdsToFrontend",
-                {"backendNodeIds": [backend_node_id]},
-            )
-            node_id = node_ids["nodeIds"][0]
-            session.send(
-                "DOM.setAttributeValue",
-                {
-                    "nodeId": node_id,
-                    "name": "data-alumnium-id",
-                    "value": str(backend_node_id),
-                },
+                {"backendNodeIds": backend_node_ids},
             )
+            for node_id, backend_node_id in zip(node_ids["nodeIds"], backend_node_ids):
+                session.send(
+                    "DOM.setAttributeValue",
+                    {
+                        "nodeId": node_id,
+                        "name": self.TAG_ATTRIBUTE,
+                        "value": str(backend_node_id),
+                    },
+                )
         finally:
-            if is_oopif:
+            if oopif_frame:
                 session.detach()
 
-        # TODO: We need to remove the attribute after we are done with the element,
-        # but Playwright locator is lazy and we cannot guarantee when it is safe to do so.
-        return frame.locator(f"css=[data-alumnium-id='{backend_node_id}']")
-
     def execute_script(self, script: str):
         self.page.evaluate(f"() => {{ {script} }}")
 
     def print_to_pdf(self, filepath: str):
-        self.page.pdf(path=filepath)
+        # Page.pdf() buffers the whole document in memory, stream it to disk via CDP instead
+        result = self._send_cdp_command("Page.printToPDF", {"transferMode": "ReturnAsStream"})
+        write_stream(self._send_cdp_command, result["stream"], filepath)
 
     def _wait_for_page_to_load(self):
         logger.debug("Waiting for page to finish loading:")
@@ -214,6 +316,13 @@ class PlaywrightDriver(BaseDriver):
             else:
                 raise error
 
+    def _change_token(self) -> str | None:
+        try:
+            return self.page.evaluate(self.CHANGE_TOKEN_SCRIPT)
+        except Error as error:
+            logger.debug(f"Could not get change token: {error.message}")
+            return None
+
     @contextmanager
     def _autoswitch_to_new_tab(self):
         # If auto-switch is disabled, just yield without waiting for new pages
@@ -0,0 +1,138 @@
+from base64 import b64decode, b64encode
+from dataclasses import dataclass
+from io import BytesIO
+
+from .. import (
+    SCREENSHOT_FORMAT,
+    SCREENSHOT_GRAYSCALE,
+    SCREENSHOT_MAX_HEIGHT,
+    SCREENSHOT_MAX_WIDTH,
+    SCREENSHOT_QUALITY,
+)
+from ..logutils import get_logger
+from .cdp_stream import CdpCommands
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class ScreenshotOptions:
+    """Encoding of screenshots sent along with vision-based checks and retrievals."""
+
+    format: str = SCREENSHOT_FORMAT  # png, jpeg or webp
+    quality: int = SCREENSHOT_QUALITY  # 0-100, ignored for png
+    max_width: int = SCREENSHOT_MAX_WIDTH  # 0 means no limit
+    max_height: int = SCREENSHOT_MAX_HEIGHT  # 0 means no limit
+    grayscale: bool = SCREENSHOT_GRAYSCALE
+
+    @property
+    def is_default(self) -> bool:
+        """Whether screenshots can be sent exactly as the driver returns them."""
+        return self.format == "png" and not self.max_width and not self.max_height and not self.grayscale
+
+    def scale(self, width: float, height: float) -> float:
+        """Returns the factor needed to fit the given size into the maximum dimensions."""
+        scale = 1.0
+        if self.max_width and width > self.max_width:
+            scale = min(scale, self.max_width / width)
+        if self.max_height and height > self.max_height:
+            scale = min(scale, self.max_height / height)
+        return scale
+
+    def cdp_params(self, layout_metrics: dict, full_page: bool, clip: dict | None = None) -> dict:
+        """
+        Builds `Page.captureScreenshot` parameters so that the browser does the encoding and downscaling.
+
+        Args:
+            layout_metrics: Response of `Page.getLayoutMetrics`.
+            full_page: Whether to capture beyond the viewport.
+            clip: Optional page region (x, y, width, height) in CSS pixels to capture.
+
+        Returns:
+            Parameters for `Page.captureScreenshot`.
+        """
+        params: dict = {"format": self.format}
+        if self.format != "png":
+            params["quality"] = self.quality
+
+        if clip is None:
+            if full_page:
+                size = layout_metrics["cssContentSize"]
+                clip = {"x": 0, "y": 0, "width": size["width"], "height": size["height"]}
+            else:
+                viewport = layout_metrics["cssVisualViewport"]
+                clip = {
+                    "x": viewport["pageX"],
+                    "y": viewport["pageY"],
+                    "width": viewport["clientWidth"],
+                    "height": viewport["clientHeight"],
+                }
+
+        params["clip"] = {**clip, "scale": self.scale(clip["width"], clip["height"])}
+        # Clipped regions may lie outside of the viewport even if full page screenshot is off
+        params["captureBeyondViewport"] = True
+        return params
+
+    def encode(self, screenshot: str) -> str:
+        """
+        Re-encodes a base64 PNG screenshot in Python for drivers that cannot do it natively.
+        Requires Pillow, otherwise the screenshot is returned as is.
+        """
+        if self.is_default:
+            return screenshot
+
+        try:
+            from PIL import Image, ImageOps
+        except ImportError:
+            logger.debug("Pillow is not installed, screenshot is sent without re-encoding")
+            return screenshot
+
+        image = Image.open(BytesIO(b64decode(screenshot)))
+        scale = self.scale(*image.size)
+        if scale < 1:
+            image = image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))))
+        if self.grayscale:
+            image = ImageOps.grayscale(image)
+        elif self.format == "jpeg" and image.mode != "RGB":
+            image = image.convert("RGB")
+
+        buffer = BytesIO()
+        image.save(buffer, format=self.format.upper(), quality=self.quality)
+        return b64encode(buffer.getvalue()).decode()
+
+
+def box_model_to_clip(box_model: dict, layout_metrics: dict) -> dict:
+    """Converts `DOM.getBoxModel` response into a page region for `Page.captureScreenshot`."""
+    quad = box_model["model"]["border"]
+    xs, ys = quad[0::2], quad[1::2]
+    viewport = layout_metrics["cssVisualViewport"]
+    return {
+        "x": min(xs) + viewport["pageX"],
+        "y": min(ys) + viewport["pageY"],
+        "width": max(xs) - min(xs),
+        "height": max(ys) - min(ys),
+    }
+
+
+def capture_commands(options: ScreenshotOptions, full_page: bool, backend_node_id: int | None = None) -> CdpCommands:
+    """
+    CDP commands capturing a base64 screenshot encoded by the browser, optionally clipped to the element.
+    Chromium drivers send them with `send_commands()` or `send_commands_async()`.
+    """
+    layout_metrics = yield "Page.getLayoutMetrics", {}
+    region = None
+    if backend_node_id is not None:
+        try:
+            box_model = yield "DOM.getBoxModel", {"backendNodeId": backend_node_id}
+            region = box_model_to_clip(box_model, layout_metrics)
+        except Exception as e:
+            logger.debug(f"Could not get box model for screenshot clip: {e}")
+
+    params = options.cdp_params(layout_metrics, full_page, region)
+    if options.grayscale:
+        yield "Emulation.setEmulatedVisionDeficiency", {"type": "achromatopsia"}
+    try:
+        return (yield "Page.captureScreenshot", params)["data"]
+    finally:
+        if options.grayscale:
+            yield "Emulation.setEmulatedVisionDeficiency", {"type": "none"}
@@ -16,6 +16,9 @@
    * @property {boolean} initialLoad
    * @property {boolean} mutationIdle
    * @property {ReturnType<typeof setTimeout> | null} mutationDebounceTimer
+   * @property {string} documentId
+   * @property {number} changes
+   * @property {boolean} unobservedShadowRoots
    */
   const symbol = Symbol.for("alumnium");
   if (/** @type {any} */ (window)[symbol]) return;
@@ -39,6 +42,11 @@
     initialLoad: false,
     mutationIdle: true,
     mutationDebounceTimer: null,
+    // Together these tell whether the page may have changed since a tree capture
+    documentId: Math.random().toString(36).slice(2),
+    changes: 0,
+    // Closed shadow roots attached before the script was installed cannot be reached
+    unobservedShadowRoots: false,
   };
 
   // Logging settings - can be enabled via options
@@ -67,6 +75,7 @@
 
   /** @type {any} */ (window)[symbol] = {
     waitForStability,
+    changeToken,
     state,
   };
 
@@ -178,6 +187,18 @@
     });
   }
 
+  /**
+   * Returns a token that stays the same as long as the page does not change,
+   * or null if changes cannot be tracked, e.g. inside frames or closed shadow roots.
+   *
+   * @returns {string | null}
+   */
+  function changeToken() {
+    if (state.unobservedShadowRoots) return null;
+    if (document.querySelector("iframe, frame")) return null;
+    return `${state.documentId}:${state.changes}`;
+  }
+
   //#region Resources
 
   /**
@@ -256,8 +277,15 @@
       return;
     }
 
-    const observer = new MutationObserver((mutationList) => {
+    const observer = new MutationObserver((records) => {
+      // Elements are tagged by the drivers to locate them, which is not a change of the page
+      const mutationList = records.filter(
+        (mutation) =>
+          mutation.type !== "attributes" ||
+          !mutation.attributeName?.startsWith("data-alumnium-"),
+      );
       if (mutationList.length === 0) return;
+      state.changes += mutationList.length;
 
       // Track new resources
       for (const mutation of mutationList) {
@@ -297,12 +325,50 @@
       updateActiveAt();
     });
 
-    observer.observe(document.documentElement, {
+    const options = {
       attributes: true,
       childList: true,
       characterData: true,
       subtree: true,
-    });
+    };
+    observer.observe(document.documentElement, options);
+
+    // Mutations inside shadow roots are not reported to observers of the document
+    /**
+     * @param {Document | ShadowRoot} root
+     */
+    function observeShadowRoots(root) {
+      root.querySelectorAll("*").forEach((el) => {
+        if (el.shadowRoot) {
+          observer.observe(el.shadowRoot, options);
+          observeShadowRoots(el.shadowRoot);
+        } else if (customElements.get(el.localName)) {
+          // Custom elements may hide their content in closed shadow roots
+          state.unobservedShadowRoots = true;
+        }
+      });
+    }
+    observeShadowRoots(document);
+    // oxlint-disable-next-line typescript/unbound-method
+    const nativeAttachShadow = Element.prototype.attachShadow;
+    Element.prototype.attachShadow = function (init) {
+      const shadowRoot = nativeAttachShadow.call(this, init);
+      observer.observe(shadowRoot, options);
+      return shadowRoot;
+    };
+
+    // Hovering can reveal elements through CSS without mutating the DOM,
+    // and form controls change their checked, selected and value properties without mutating it either.
+    // Focus is part of the tree as well.
+    for (const type of ["mouseover", "input", "change", "focusin", "focusout"]) {
+      document.addEventListener(
+        type,
+        () => {
+          state.changes++;
+        },
+        { capture: true, passive: true },
+      );
+    }
   }
 
   function trackInitialLoad() {
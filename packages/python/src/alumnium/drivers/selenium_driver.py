@@ -1,9 +1,12 @@
 from base64 import b64decode
+from itertools import groupby
 from pathlib import Path
+from time import perf_counter
 from typing import Callable
 from urllib.parse import urlparse
 
 from retry import retry
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.chrome.remote_connection import ChromiumRemoteConnection
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.by import By
@@ -12,9 +15,11 @@ from selenium.webdriver.remote.errorhandler import ElementNotInteractableExcepti
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.remote.webelement import WebElement
 
-from .. import FULL_PAGE_SCREENSHOT
-from ..accessibility import ChromiumAccessibilityTree
+from .. import FULL_PAGE_SCREENSHOT, hooks
+from ..accessibility import AccessibilityElement, BaseAccessibilityTree, ChromiumAccessibilityTree
 from ..logutils import get_logger
+from ..telemetry import set_attributes
+from ..timings import phase
 from ..tools.click_tool import ClickTool
 from ..tools.drag_and_drop_tool import DragAndDropTool
 from ..tools.hover_tool import HoverTool
@@ -22,7 +27,10 @@ from ..tools.press_key_tool import PressKeyTool
 from ..tools.type_tool import TypeTool
 from ..tools.upload_tool import UploadTool
 from .base_driver import BaseDriver
+from .cdp_stream import send_commands, write_stream
 from .keys import Key
+from .page_state import PageState
+from .screenshot_options import ScreenshotOptions, capture_commands
 
 logger = get_logger(__name__)
 
@@ -32,11 +40,13 @@ class SeleniumDriver(BaseDriver):
         WAITER_SCRIPT = f.read()
     with open(Path(__file__).parent / "scripts/waitFor.js") as f:
         WAIT_FOR_SCRIPT = f.read()
+    CHANGE_TOKEN_SCRIPT = "return window[Symbol.for('alumnium')]?.changeToken?.() ?? null;"
 
     def __init__(self, driver: WebDriver):
         self.driver = driver
         self.autoswitch_to_new_tab = True
         self.full_page_screenshot = FULL_PAGE_SCREENSHOT
+        self.screenshot_options = ScreenshotOptions()
         self.supported_tools = {
             ClickTool,
             DragAndDropTool,
@@ -55,9 +65,23 @@ class SeleniumDriver(BaseDriver):
 
     @property
     def accessibility_tree(self) -> ChromiumAccessibilityTree:
+        return self._capture_accessibility_tree()
+
+    def refresh_accessibility_tree(self, previous: BaseAccessibilityTree) -> BaseAccessibilityTree:
+        return self._capture_accessibility_tree(previous)
+
+    def _capture_accessibility_tree(self, previous: BaseAccessibilityTree | None = None) -> ChromiumAccessibilityTree:
         # Switch to default content to ensure we're at the top level for frame enumeration
         self.driver.switch_to.default_content()
-        self._wait_for_page_to_load()
+        started = perf_counter()
+        with phase("wait"):
+            self._wait_for_page_to_load()
+        hooks.emit("page_loaded", platform=self.platform, duration=perf_counter() - started)
+        change_token = self._change_token()
+        if previous is not None and change_token is not None and change_token == previous.change_token:
+            logger.debug("Page has not changed since the previous capture, reusing its accessibility tree")
+            return previous  # type: ignore[return-value]
+        started = perf_counter()
 
         # Get frame tree to enumerate all frames
         frame_tree = self.driver.execute_cdp_cmd("Page.getFrameTree", {})  # type: ignore[attr-defined]
@@ -101,7 +125,38 @@ class SeleniumDriver(BaseDriver):
         except Exception as e:
             logger.debug(f"  -> Shadow DOM failed ({e})")
 
-        return ChromiumAccessibilityTree({"nodes": all_nodes})
+        set_attributes(frames=len(frame_ids), nodes=len(all_nodes))
+        hooks.emit(
+            "tree_captured",
+            platform=self.platform,
+            duration=perf_counter() - started,
+            nodes=len(all_nodes),
+            frames=len(frame_ids),
+        )
+        accessibility_tree = ChromiumAccessibilityTree({"nodes": all_nodes})
+        accessibility_tree.change_token = change_token
+        return accessibility_tree
+
+    def capture_page_state(
+        self,
+        accessibility_tree: bool = True,
+        screenshot: bool = False,
+        clip: AccessibilityElement | None = None,
+    ) -> PageState:
+        if not accessibility_tree:
+            return super().capture_page_state(accessibility_tree=False, screenshot=screenshot, clip=clip)
+
+        tree = self.accessibility_tree
+        # Accessibility tree capture leaves the driver in the top-level browsing context,
+        # so a single script can read both title and URL instead of two WebDriver commands.
+        title, url = self.driver.execute_script("return [document.title, window.location.href];")
+        return PageState(
+            accessibility_tree=tree,
+            title=title,
+            url=url,
+            app=urlparse(url).hostname or "unknown",
+            screenshot=self.capture_screenshot(clip) if screenshot else None,
+        )
 
     @staticmethod
     def _autoswitch_to_new_tab(func: Callable) -> Callable:  # type: ignore[reportSelfClsParameterName]
@@ -146,11 +201,8 @@ class SeleniumDriver(BaseDriver):
         )
 
     def drag_and_drop(self, from_id: int, to_id: int):
-        actions = ActionChains(self.driver)
-        actions.drag_and_drop(
-            self.find_element(from_id),
-            self.find_element(to_id),
-        ).perform()
+        from_element, to_element = self.resolve_elements([from_id, to_id])
+        ActionChains(self.driver).drag_and_drop(from_element, to_element).perform()
 
     def hover(self, id: int):
         actions = ActionChains(self.driver)
@@ -181,16 +233,29 @@ class SeleniumDriver(BaseDriver):
 
     @property
     def screenshot(self) -> str:
-        if self.full_page_screenshot:
-            return self.driver.execute_cdp_cmd(
-                "Page.captureScreenshot",
-                {
-                    "format": "png",
-                    "captureBeyondViewport": True,
-                },
-            )["data"]  # type: ignore[attr-defined]
-        else:
-            return self.driver.get_screenshot_as_base64()
+        return self.capture_screenshot()
+
+    def capture_screenshot(self, clip: AccessibilityElement | None = None) -> str:
+        # Elements inside iframes report box model relative to their frame, so clip to top-level elements only
+        if clip is not None and (clip.backend_node_id is None or clip.frame_chain):
+            clip = None
+
+        if self.screenshot_options.is_default and clip is None:
+            if self.full_page_screenshot:
+                return self.driver.execute_cdp_cmd(
+                    "Page.captureScreenshot",
+                    {
+                        "format": "png",
+                        "captureBeyondViewport": True,
+                    },
+                )["data"]  # type: ignore[attr-defined]
+            else:
+                return self.driver.get_screenshot_as_base64()
+
+        commands = capture_commands(
+            self.screenshot_options, self.full_page_screenshot, clip.backend_node_id if clip else None
+        )
+        return send_commands(commands, self.driver.execute_cdp_cmd)  # type: ignore[attr-defined]
 
     def scroll_to(self, id: int):
         element = self.find_element(id)
@@ -218,22 +283,40 @@ class SeleniumDriver(BaseDriver):
         return urlparse(self.driver.current_url).hostname or "unknown"
 
     def find_element(self, id: int) -> WebElement:
-        accessibility_element = self.accessibility_tree.element_by_id(id)
+        return self.resolve_elements([id])[0]
+
+    def resolve_elements(self, ids: list[int]) -> list[WebElement]:
+        accessibility_tree = self.accessibility_tree
+        accessibility_elements = [accessibility_tree.element_by_id(id) for id in ids]
+
+        elements = []
+        in_frame = False
+        # Switching frames pushes the document again, which invalidates node IDs pushed before,
+        # so elements are pushed at once for each run of elements sharing a frame chain
+        for frame_chain, frame_elements in groupby(accessibility_elements, key=lambda element: element.frame_chain):
+            # Switch through the frame chain if elements are inside nested iframes
+            if frame_chain:
+                self._switch_to_frame_chain(frame_chain)
+            elif in_frame:
+                self.driver.switch_to.default_content()
+            in_frame = bool(frame_chain)
+
+            backend_node_ids = [accessibility_element.backend_node_id for accessibility_element in frame_elements]
+            # Beware!
+            self.driver.execute_cdp_cmd("DOM.enable", {})  # type: ignore[attr-defined]
+            self.driver.execute_cdp_cmd("DOM.getFlattenedDocument", {})  # type: ignore[attr-defined]
+            node_ids = self.driver.execute_cdp_cmd(  # type: ignore[attr-defined]
+                "DOM.pushNodesByBackendIdsToFrontend", {"backendNodeIds": backend_node_ids}
+            )["nodeIds"]
+            for backend_node_id, node_id in zip(backend_node_ids, node_ids):
+                elements.append(self._find_tagged_element(backend_node_id, node_id))
 
-        backend_node_id = accessibility_element.backend_node_id
-        frame_chain = accessibility_element.frame_chain
+        # Note: We don't switch back to default content here because the element
+        # needs to remain in its frame context for subsequent operations (click, type, etc.)
 
-        # Switch through the frame chain if element is inside nested iframes
-        if frame_chain:
-            self._switch_to_frame_chain(frame_chain)
+        return elements
 
-        # Beware!
-        self.driver.execute_cdp_cmd("DOM.enable", {})  # type: ignore[attr-defined]
-        self.driver.execute_cdp_cmd("DOM.getFlattenedDocument", {})  # type: ignore[attr-defined]
-        node_ids = self.driver.execute_cdp_cmd(  # type: ignore[attr-defined]
-            "DOM.pushNodesByBackendIdsToFrontend", {"backendNodeIds": [backend_node_id]}
-        )
-        node_id = node_ids["nodeIds"][0]
+    def _find_tagged_element(self, backend_node_id: int | None, node_id: int) -> WebElement:
         self.driver.execute_cdp_cmd(  # type: ignore[attr-defined]
             "DOM.setAttributeValue",
             {
@@ -258,10 +341,6 @@ class SeleniumDriver(BaseDriver):
                 "name": "data-alumnium-id",
             },
         )
-
-        # Note: We don't switch back to default content here because the element
-        # needs to remain in its frame context for subsequent operations (click, type, etc.)
-
         return element
 
     def _switch_to_frame_chain(self, frame_chain: list[int]):
@@ -307,9 +386,15 @@ class SeleniumDriver(BaseDriver):
         self.driver.execute_script(script)
 
     def print_to_pdf(self, filepath: str):
-        result = self.driver.execute_cdp_cmd("Page.printToPDF", {})  # type: ignore[attr-defined]
-        with open(filepath, "wb") as f:
-            f.write(b64decode(result["data"]))
+        result = self.driver.execute_cdp_cmd(  # type: ignore[attr-defined]
+            "Page.printToPDF", {"transferMode": "ReturnAsStream"}
+        )
+        if "stream" in result:
+            write_stream(self.driver.execute_cdp_cmd, result["stream"], filepath)  # type: ignore[attr-defined]
+        else:
+            # Some remote ends ignore transfer mode and return the whole document
+            with open(filepath, "wb") as f:
+                f.write(b64decode(result["data"]))
 
     # Remote Chromium instances support CDP commands, but the Python bindings don't expose them.
     # https://github.com/SeleniumHQ/selenium/issues/14799
@@ -346,6 +431,13 @@ class SeleniumDriver(BaseDriver):
         else:
             logger.debug("  <- Page finished loading")
 
+    def _change_token(self) -> str | None:
+        try:
+            return self.driver.execute_script(self.CHANGE_TOKEN_SCRIPT)
+        except WebDriverException as error:
+            logger.debug(f"Could not get change token: {error}")
+            return None
+
     def switch_to_next_tab(self):
         handles = self.driver.window_handles
         if len(handles) <= 1:
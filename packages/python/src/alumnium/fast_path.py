@@ -0,0 +1,88 @@
+import re
+
+from .accessibility.base_accessibility_tree import BaseAccessibilityTree
+from .accessibility.tree_index import TreeIndex
+from .logutils import get_logger
+
+logger = get_logger(__name__)
+
+_QUOTE = "[\"'“”‘’]"
+_VISIBLE = r"is (?:visible|displayed|shown|present)(?: on the page)?"
+_CONTAINS = "(?:the )?page (?:contains|has|shows|displays)(?: (?:the )?text)?"
+_ROLES = "button|link|checkbox|heading|textbox|text field|tab|image|radio|switch|menuitem|option"
+
+# Statements that can be answered by looking up the accessibility tree
+TEXT_STATEMENTS = [
+    re.compile(rf"^{_CONTAINS} {_QUOTE}(?P<text>.+){_QUOTE}$", re.IGNORECASE),
+    re.compile(rf"^(?:the )?(?:text )?{_QUOTE}(?P<text>.+){_QUOTE} (?:text )?{_VISIBLE}$", re.IGNORECASE),
+]
+ELEMENT_STATEMENTS = [
+    re.compile(rf"^(?:the |a )?(?P<role>{_ROLES}) {_QUOTE}?(?P<name>.+?){_QUOTE}? {_VISIBLE}$", re.IGNORECASE),
+    re.compile(rf"^(?:the |a )?{_QUOTE}?(?P<name>.+?){_QUOTE}? (?P<role>{_ROLES}) {_VISIBLE}$", re.IGNORECASE),
+]
+
+
+class LocalFastPath:
+    """
+    Answers a restricted class of requests directly from the accessibility tree,
+    so that they do not need to go through the server and the model.
+
+    Only confident answers are given, so that anything else falls back to the server.
+    """
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.hits = {"check": 0, "find": 0}
+
+    def check(self, statement: str, accessibility_tree: BaseAccessibilityTree) -> str | None:
+        """
+        Checks presence statements such as 'page contains "Order #1234"' or 'button Save is visible'.
+
+        Returns:
+            The explanation if the statement is true, or None if it cannot be confirmed locally.
+        """
+        if not self.enabled:
+            return None
+
+        statement = statement.strip().rstrip(".")
+        index = TreeIndex.from_tree(accessibility_tree)
+
+        explanation = None
+        for pattern in TEXT_STATEMENTS:
+            if match := pattern.match(statement):
+                if index.with_text(match["text"]):
+                    explanation = f"Text '{match['text']}' is present in the accessibility tree."
+                break
+        else:
+            for pattern in ELEMENT_STATEMENTS:
+                if match := pattern.match(statement):
+                    if index.with_role_and_name(match["role"], match["name"]):
+                        role, name = match["role"].capitalize(), match["name"]
+                        explanation = f"{role} '{name}' is present in the accessibility tree."
+                    break
+
+        if explanation:
+            self.hits["check"] += 1
+            logger.info(f"Statement checked locally: {statement}")
+        else:
+            logger.debug(f"Statement cannot be checked locally: {statement}")
+        return explanation
+
+    def find(self, description: str, accessibility_tree: BaseAccessibilityTree) -> int | None:
+        """
+        Finds an element matching a description such as 'Submit button' by its role, name, label and value.
+
+        Returns:
+            The raw ID of the element, or None if the description is ambiguous or does not match any element.
+        """
+        if not self.enabled:
+            return None
+
+        node = TreeIndex.from_tree(accessibility_tree).resolve(description)
+        if node is None:
+            logger.debug(f"Element cannot be found locally: {description}")
+            return None
+
+        self.hits["find"] += 1
+        logger.info(f"Element found locally: {description} (raw_id={node.raw_id})")
+        return node.raw_id
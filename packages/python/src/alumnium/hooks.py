@@ -0,0 +1,53 @@
+from typing import Callable
+
+# Events and keyword arguments their callbacks are called with (durations are in seconds):
+# - page_loaded: platform, duration
+# - tree_captured: platform, duration, nodes, frames
+# - request_sent: url, duration, status_code, bytes_sent, bytes_received, server_duration (None if unknown)
+# - tool_invoked: tool, args, duration, error (None if the tool succeeded)
+EVENTS = ("page_loaded", "tree_captured", "request_sent", "tool_invoked")
+
+Hook = Callable[..., None]
+
+_hooks: dict[str, list[Hook]] = {}
+
+
+def on(event: str, callback: Hook | None = None):
+    """
+    Registers the callback for the event, e.g. to attach profilers or account for costs.
+    Callbacks are called synchronously, so they should be fast and must not raise.
+
+    Can be used as a decorator:
+
+        @hooks.on("request_sent")
+        def log_request(url, duration, **_):
+            print(f"{url} took {duration:.2f}s")
+    """
+    if event not in EVENTS:
+        raise ValueError(f"Unknown event: {event}, expected one of {', '.join(EVENTS)}")
+
+    def register(callback: Hook) -> Hook:
+        # Lists are replaced rather than mutated, so that events emitted concurrently see a consistent list
+        _hooks[event] = [*_hooks.get(event, []), callback]
+        return callback
+
+    return register(callback) if callback else register
+
+
+def off(event: str, callback: Hook | None = None):
+    """Unregisters the callback for the event, or all callbacks if none is given."""
+    callbacks = [hook for hook in _hooks.get(event, []) if callback is not None and hook != callback]
+    if callbacks:
+        _hooks[event] = callbacks
+    else:
+        _hooks.pop(event, None)
+
+
+def enabled(event: str) -> bool:
+    """Tells whether the event has callbacks, to skip collecting its arguments otherwise."""
+    return event in _hooks
+
+
+def emit(event: str, **payload):
+    for callback in _hooks.get(event, ()):
+        callback(**payload)
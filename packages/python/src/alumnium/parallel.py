@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from asyncio import gather, to_thread
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from threading import Thread, current_thread
+from typing import TYPE_CHECKING, Any
+
+from .logutils import get_logger
+
+if TYPE_CHECKING:
+    from .alumni import Alumni
+
+logger = get_logger(__name__)
+
+# Methods of Alumni that can be called, with arguments, e.g. ("check", "chat shows 'Hi'", {"vision": True})
+METHODS = ("do", "check", "get", "check_all", "get_many", "find", "wait_until")
+
+Call = tuple[str, Any] | tuple[str, Any, dict[str, Any]]
+
+
+class Parallel:
+    """
+    Runs calls on several Alumni instances concurrently, e.g. one per browser tab or device,
+    so that their round trips to the server overlap instead of running one after another.
+
+    Calls of each instance run in order, one at a time, while calls of different instances run concurrently:
+
+        users = Parallel(alice=alice_al, bob=bob_al)
+        users.do(alice="send 'Hi' to Bob", bob="open chat with Alice")
+        users.check(bob="chat shows 'Hi' from Alice")
+
+    Instances with asynchronous Playwright drivers should use the `*_async` methods from their event loop,
+    which run the calls in threads without blocking the loop that drivers use.
+
+    Drivers bound to the thread they were created in, e.g. synchronous Playwright, cannot run in other threads.
+    Their calls run in the calling thread one instance after another, while other instances run concurrently.
+    """
+
+    def __init__(self, **alumni: Alumni):
+        self.alumni = alumni
+
+    def run(self, calls: dict[str, list[Call]], return_exceptions: bool = False) -> dict[str, list[Any]]:
+        """
+        Runs calls of each instance in order, with instances running concurrently in a thread pool.
+
+        Args:
+            calls: Calls to make, keyed by instance names.
+            return_exceptions: Whether to return the exception failing an instance as the last of its results,
+                instead of raising it once all instances are done. Calls after a failed one are not made.
+
+        Returns:
+            Results of the calls, keyed by instance names.
+        """
+        self._validate(calls)
+        if not calls:
+            return {}
+
+        bound = self._bound_to(calls, current_thread())
+        outcomes = {}
+        with ThreadPoolExecutor(max_workers=max(len(calls) - len(bound), 1)) as executor:
+            futures = {
+                name: executor.submit(copy_context().run, self._run_instance, name, instance_calls)
+                for name, instance_calls in calls.items()
+                if name not in bound
+            }
+            # Instances bound to the calling thread run in it while the others run in the pool
+            for name in bound:
+                outcomes[name] = self._run_instance(name, calls[name])
+            outcomes.update({name: future.result() for name, future in futures.items()})
+        return self._collect({name: outcomes[name] for name in calls}, return_exceptions)
+
+    async def run_async(self, calls: dict[str, list[Call]], return_exceptions: bool = False) -> dict[str, list[Any]]:
+        """Same as `run()`, awaiting the calls without blocking the event loop."""
+        self._validate(calls)
+        self._bound_to(calls, None)
+        outcomes = await gather(*(to_thread(self._run_instance, name, calls[name]) for name in calls))
+        return self._collect(dict(zip(calls, outcomes)), return_exceptions)
+
+    def do(self, **goals: str) -> dict[str, Any]:
+        """Executes a goal on each instance concurrently and returns DoResult by instance names."""
+        return _first(self.run(_single("do", goals)))
+
+    def check(self, **statements: str) -> dict[str, Any]:
+        """Checks a statement on each instance concurrently and returns explanations by instance names."""
+        return _first(self.run(_single("check", statements)))
+
+    def get(self, **data: str) -> dict[str, Any]:
+        """Extracts data on each instance concurrently and returns it by instance names."""
+        return _first(self.run(_single("get", data)))
+
+    async def do_async(self, **goals: str) -> dict[str, Any]:
+        return _first(await self.run_async(_single("do", goals)))
+
+    async def check_async(self, **statements: str) -> dict[str, Any]:
+        return _first(await self.run_async(_single("check", statements)))
+
+    async def get_async(self, **data: str) -> dict[str, Any]:
+        return _first(await self.run_async(_single("get", data)))
+
+    def _validate(self, calls: dict[str, list[Call]]):
+        for name, instance_calls in calls.items():
+            if name not in self.alumni:
+                raise ValueError(f"Unknown instance: {name}, expected one of {', '.join(self.alumni)}")
+            for call in instance_calls:
+                if call[0] not in METHODS:
+                    raise ValueError(f"Unsupported method: {call[0]}, expected one of {', '.join(METHODS)}")
+
+    def _bound_to(self, calls: dict[str, list[Call]], thread: Thread | None) -> list[str]:
+        """
+        Returns instances whose drivers can only be used from the thread.
+
+        Raises:
+            RuntimeError: If a driver can only be used from another thread.
+        """
+        bound = []
+        for name in calls:
+            owner_thread = self.alumni[name].driver.owner_thread
+            if owner_thread is None:
+                continue
+            if owner_thread is not thread:
+                raise RuntimeError(
+                    f"Driver of {name} can only be used from thread {owner_thread.name} it was created in, "
+                    f"call Parallel.run() from that thread"
+                )
+            bound.append(name)
+        return bound
+
+    def _run_instance(self, name: str, calls: list[Call]) -> tuple[list[Any], BaseException | None]:
+        alumni = self.alumni[name]
+        results = []
+        for call in calls:
+            method, argument, options = call[0], call[1], call[2] if len(call) > 2 else {}
+            try:
+                results.append(getattr(alumni, method)(argument, **options))
+            except Exception as error:
+                logger.debug(f"{name}.{method}() failed, skipping its remaining calls: {error}")
+                return results, error
+        return results, None
+
+    @staticmethod
+    def _collect(
+        outcomes: dict[str, tuple[list[Any], BaseException | None]], return_exceptions: bool
+    ) -> dict[str, list[Any]]:
+        results = {}
+        for name, (instance_results, error) in outcomes.items():
+            if error is not None:
+                if not return_exceptions:
+                    raise error
+                instance_results.append(error)
+            results[name] = instance_results
+        return results
+
+
+def _single(method: str, arguments: dict[str, str]) -> dict[str, list[Call]]:
+    return {name: [(method, argument)] for name, argument in arguments.items()}
+
+
+def _first(results: dict[str, list[Any]]) -> dict[str, Any]:
+    return {name: instance_results[0] for name, instance_results in results.items()}
@@ -1,4 +1,25 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Any
+
+from .timings import CallTimings
+
+
+@dataclass
+class TracedElement:
+    """Element a tool call was made on, described independently of its raw ID."""
+
+    fingerprint: str
+    role: str = ""
+    name: str = ""
+
+
+@dataclass
+class TracedAction:
+    """Tool call made in a do() execution, with the elements it was made on."""
+
+    tool: str
+    args: dict[str, Any]
+    elements: dict[str, TracedElement] = field(default_factory=dict)  # argument name -> element
 
 
 @dataclass
@@ -7,6 +28,9 @@ class DoStep:
 
     name: str
     tools: list[str]
+    attempts: int = 1
+    duration: float = 0.0  # seconds
+    actions: list[TracedAction] = field(default_factory=list)
 
 
 @dataclass
@@ -16,3 +40,34 @@ class DoResult:
     explanation: str
     steps: list[DoStep]
     changes: str = ""
+    duration: float = 0.0  # seconds
+    timings: CallTimings | None = None  # time spent in each phase and bytes transferred
+
+    @property
+    def attempts(self) -> int:
+        """Total number of attempts made across all steps."""
+        return sum(step.attempts for step in self.steps)
+
+    @property
+    def trace(self) -> list[TracedAction]:
+        """Tool calls made across all steps, which can be turned into code with `generate_code()`."""
+        return [action for step in self.steps for action in step.actions]
+
+
+@dataclass
+class CheckResult:
+    """Result of checking a single statement with Alumni.check_all()."""
+
+    statement: str
+    passed: bool
+    explanation: str
+
+
+@dataclass
+class WaitResult:
+    """Result of executing Alumni.wait_until()."""
+
+    explanation: str
+    duration: float  # seconds
+    evaluations: int  # number of times the statement was checked by the model
+    polls: int  # number of times the page was captured
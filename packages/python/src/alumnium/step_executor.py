@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+from time import perf_counter, sleep
+from typing import Callable
+
+from pydantic import ValidationError
+
+from . import DELAY, RETRIES
+from .accessibility.base_accessibility_tree import BaseAccessibilityTree
+from .accessibility.tree_index import TreeIndex
+from .clients.http_client import HttpClient
+from .drivers.base_driver import BaseDriver
+from .logutils import get_logger
+from .result import DoStep, TracedAction, TracedElement
+from .telemetry import span
+from .timings import phase
+from .tools import BaseTool
+
+logger = get_logger(__name__)
+
+
+class StepExecutor:
+    """
+    Executes planned steps, resuming from the failing tool call instead of starting the goal over.
+
+    When a tool call fails, the steps and tool calls completed so far are kept, and the failing step is retried:
+    first by asking the actor for the same step against a fresh accessibility tree,
+    then by re-planning the remaining work of the goal from the current state.
+
+    Each step gets the accessibility tree after the previous one, which is reused as is
+    when `refresh_accessibility_tree` can tell the page has not changed since.
+    """
+
+    def __init__(
+        self,
+        client: HttpClient,
+        driver: BaseDriver,
+        tools: dict[str, type[BaseTool]],
+        accessibility_tree: Callable[[], BaseAccessibilityTree],
+        retries: int = RETRIES,
+        delay: float = DELAY,
+        refresh_accessibility_tree: Callable[[BaseAccessibilityTree], BaseAccessibilityTree] | None = None,
+    ):
+        self.client = client
+        self.driver = driver
+        self.tools = tools
+        self.accessibility_tree = accessibility_tree
+        self.refresh_accessibility_tree = refresh_accessibility_tree
+        self.retries = retries
+        self.delay = delay
+
+    def execute(
+        self,
+        goal: str,
+        explanation: str,
+        steps: list[str],
+        initial_accessibility_tree: BaseAccessibilityTree | None = None,
+    ) -> tuple[str, list[DoStep]]:
+        """
+        Executes the steps planned for the goal.
+
+        Args:
+            goal: The goal the steps were planned for.
+            explanation: Planner explanation, replaced with the actor's one when planner is off.
+            steps: Planned steps.
+            initial_accessibility_tree: Accessibility tree the steps were planned with, reused for the first step.
+
+        Returns:
+            A tuple of (explanation, executed steps).
+        """
+        executed_steps: list[DoStep] = []
+        pending = list(steps)
+        accessibility_tree = initial_accessibility_tree
+        previous_tree: BaseAccessibilityTree | None = None
+        replans = 0
+        while pending:
+            step = pending.pop(0)
+            started = perf_counter()
+            do_step = DoStep(name=step, tools=[])
+            executed_steps.append(do_step)
+
+            with span("step", step=step):
+                actions: list[dict] | None = None
+                actions_tree: BaseAccessibilityTree | None = None
+                recovery: str | None = None
+                last_error: Exception | None = None
+                while True:
+                    if recovery == "replan" and replans >= self.retries and last_error is not None:
+                        do_step.duration = perf_counter() - started
+                        raise last_error
+
+                    try:
+                        if recovery == "refresh":
+                            actions_tree = self.accessibility_tree()
+                            fresh_actions = self._refresh_actions(goal, step, do_step, actions or [], actions_tree)
+                            if fresh_actions is None:
+                                recovery = "replan"
+                                continue
+                            actions, recovery = fresh_actions, None
+                        elif recovery == "replan":
+                            # Re-plan the rest of the goal, keeping what has been done already
+                            pending = self._replan(goal, executed_steps)
+                            replans += 1
+                            break
+
+                        if actions is None:
+                            if accessibility_tree is not None:
+                                actions_tree = accessibility_tree
+                            elif previous_tree is not None and self.refresh_accessibility_tree is not None:
+                                actions_tree = self.refresh_accessibility_tree(previous_tree)
+                            else:
+                                actions_tree = self.accessibility_tree()
+                            accessibility_tree = None
+                            actor_explanation, actions = self.client.execute_action(
+                                goal, step, actions_tree.to_str(), app=self.driver.app
+                            )
+                            # When planner is off, explanation is just the goal — replace with actor's reasoning.
+                            if explanation == goal:
+                                explanation = actor_explanation
+
+                        for tool_call in actions[len(do_step.tools) :]:
+                            traced_action = self._trace(tool_call, actions_tree)
+                            with phase("execute", tool=tool_call.get("name")):
+                                do_step.tools.append(BaseTool.execute_tool_call(tool_call, self.tools, self.driver))
+                            do_step.actions.append(traced_action)
+                        break
+                    except Exception as error:
+                        if do_step.attempts > self.retries:
+                            do_step.duration = perf_counter() - started
+                            raise
+                        logger.warning(f"Step '{step}' failed on attempt {do_step.attempts}: {error}")
+
+                        # Requests that failed before any tool call is executed are simply repeated
+                        if actions is not None and recovery != "replan":
+                            recovery = "refresh" if do_step.attempts == 1 else "replan"
+                        do_step.attempts += 1
+                        last_error = error
+                        sleep(self.delay)
+
+                # Trees captured before re-planning are outdated by the time the new steps run
+                previous_tree = actions_tree if recovery is None else None
+
+            do_step.duration = perf_counter() - started
+
+        return explanation, executed_steps
+
+    def _refresh_actions(
+        self, goal: str, step: str, do_step: DoStep, actions: list[dict], accessibility_tree: BaseAccessibilityTree
+    ) -> list[dict] | None:
+        """
+        Asks the actor for the step again against a fresh accessibility tree.
+        The tool calls that already succeeded must come out the same, as they are not repeated.
+        """
+        logger.info(f"Retrying step '{step}' with a fresh accessibility tree")
+        _, fresh_actions = self.client.execute_action(goal, step, accessibility_tree.to_str(), app=self.driver.app)
+        completed = len(do_step.tools)
+        if len(fresh_actions) <= completed or any(
+            fresh["name"] != done["name"] for fresh, done in zip(fresh_actions, actions[:completed])
+        ):
+            logger.info(f"Step '{step}' changed with a fresh accessibility tree, re-planning")
+            return None
+        return fresh_actions
+
+    def _replan(self, goal: str, executed_steps: list[DoStep]) -> list[str]:
+        logger.info(f"Re-planning goal '{goal}' from the current state")
+        completed = "\n".join(f"- {step.name}: {', '.join(step.tools) or 'no actions'}" for step in executed_steps)
+        targeted_goal = f"{goal}\n\nThe following steps are already done and must not be repeated:\n{completed}"
+        _, steps = self.client.plan_actions(targeted_goal, self.accessibility_tree().to_str(), app=self.driver.app)
+        return steps
+
+    def _trace(self, tool_call: dict, accessibility_tree: BaseAccessibilityTree | None) -> TracedAction:
+        """Describes elements of the tool call by their fingerprints, roles and names, which outlive raw IDs."""
+        args = dict(tool_call.get("args", {}))
+        tool = self.tools.get(tool_call.get("name", ""))
+        if tool is not None:
+            # Models may return IDs as strings, which tools coerce to integers
+            try:
+                coerced = tool.model_validate(args).model_dump()
+                args = {name: coerced.get(name, value) for name, value in args.items()}
+            except ValidationError:
+                pass
+        action = TracedAction(tool=tool_call.get("name", ""), args=args)
+        element_args = {
+            name: value
+            for name, value in args.items()
+            if (name == "id" or name.endswith("_id")) and isinstance(value, int) and not isinstance(value, bool)
+        }
+        if not element_args or accessibility_tree is None:
+            return action
+
+        index = TreeIndex.from_tree(accessibility_tree)
+        for name, raw_id in element_args.items():
+            fingerprint = accessibility_tree.fingerprints.get(raw_id)
+            if fingerprint is None:
+                continue
+            node = index.by_raw_id(raw_id)
+            action.elements[name] = TracedElement(
+                fingerprint=fingerprint,
+                role=node.role if node else "",
+                name=node.display_name if node else "",
+            )
+        return action
@@ -0,0 +1,42 @@
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+try:
+    from opentelemetry import trace
+    from opentelemetry.propagate import inject
+except ImportError:  # pragma: no cover - OpenTelemetry is an optional dependency
+    trace = None
+    inject = None
+
+# Spans are only recorded when OpenTelemetry is installed and a tracer provider is configured by the application,
+# otherwise the OpenTelemetry API and this module are no-ops.
+TRACER_NAME = "alumnium"
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[None]:
+    """Runs the block in an OpenTelemetry span, which becomes the parent of spans started within it."""
+    if trace is None:
+        yield
+        return
+
+    with trace.get_tracer(TRACER_NAME).start_as_current_span(f"alumnium.{name}", attributes=_compact(attributes)):
+        yield
+
+
+def set_attributes(**attributes: Any):
+    """Sets attributes of the current span."""
+    if trace is not None:
+        trace.get_current_span().set_attributes(_compact(attributes))
+
+
+def propagation_headers() -> dict[str, str]:
+    """Returns headers that continue the current trace in the server, such as `traceparent`."""
+    headers: dict[str, str] = {}
+    if inject is not None:
+        inject(headers)
+    return headers
+
+
+def _compact(attributes: dict[str, Any]) -> dict[str, Any]:
+    return {name: value for name, value in attributes.items() if value is not None}
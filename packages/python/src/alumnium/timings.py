@@ -0,0 +1,149 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from threading import Lock
+from time import perf_counter
+from typing import Any, Callable, Iterator, TypeVar
+
+from .telemetry import span
+
+# Phases of calls measured on the client:
+# - capture: getting the accessibility tree, page state and screenshot from the driver
+# - wait: waiting for the page to finish loading, part of capture and execute
+# - serialize: converting the accessibility tree to XML
+# - request: round trip of requests to the server, including server time
+# - server: handling of requests by the server, as reported in its Server-Timing header
+# - execute: executing tool calls with the driver
+PHASES = ("capture", "wait", "serialize", "request", "server", "execute")
+# Upper bounds of histogram buckets in seconds
+HISTOGRAM_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+T = TypeVar("T")
+
+# Phases of a call can be recorded from several threads, e.g. by concurrent requests of check_all()
+_lock = Lock()
+
+
+@dataclass
+class CallTimings:
+    """Time spent in each phase of a single call, and bytes sent to and received from the server."""
+
+    durations: dict[str, float] = field(default_factory=dict)  # phase -> seconds
+    bytes_sent: int = 0
+    bytes_received: int = 0
+
+    def add(self, other: "CallTimings"):
+        with _lock:
+            for name, duration in other.durations.items():
+                self.durations[name] = self.durations.get(name, 0.0) + duration
+            self.bytes_sent += other.bytes_sent
+            self.bytes_received += other.bytes_received
+
+
+_current: ContextVar[CallTimings | None] = ContextVar("alumnium_call_timings", default=None)
+
+
+@contextmanager
+def measure() -> Iterator[CallTimings]:
+    """Collects timings of phases executed within the block. Nested blocks also count towards outer ones."""
+    timings = CallTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+        if (outer := _current.get()) is not None:
+            outer.add(timings)
+
+
+@contextmanager
+def phase(name: str, **attributes: Any) -> Iterator[None]:
+    """Measures the block as a phase of the current call and traces it as a span with the attributes."""
+    started = perf_counter()
+    try:
+        with span(name, **attributes):
+            yield
+    finally:
+        record(name, perf_counter() - started)
+
+
+def record(name: str, duration: float):
+    if (timings := _current.get()) is not None:
+        timings.add(CallTimings(durations={name: duration}))
+
+
+def record_transfer(bytes_sent: int, bytes_received: int):
+    if (timings := _current.get()) is not None:
+        timings.add(CallTimings(bytes_sent=bytes_sent, bytes_received=bytes_received))
+
+
+def current() -> CallTimings | None:
+    return _current.get()
+
+
+class TimingStats:
+    """Timings of calls aggregated by their kind (do, check, check_all, get, get_many, find, area)."""
+
+    def __init__(self):
+        self.calls: dict[str, list[CallTimings]] = {}
+
+    def add(self, kind: str, timings: CallTimings):
+        self.calls.setdefault(kind, []).append(timings)
+
+    def summary(self) -> dict[str, dict]:
+        """
+        Returns per-kind statistics: number of calls, bytes transferred,
+        and per-phase totals, percentiles and histograms of durations in seconds.
+        """
+        summary = {}
+        for kind, calls in self.calls.items():
+            phases = {}
+            for name in PHASES:
+                durations = sorted(call.durations[name] for call in calls if name in call.durations)
+                if durations:
+                    phases[name] = _summarize(durations)
+            summary[kind] = {
+                "count": len(calls),
+                "bytes_sent": sum(call.bytes_sent for call in calls),
+                "bytes_received": sum(call.bytes_received for call in calls),
+                "phases": phases,
+            }
+        return summary
+
+
+def timed(kind: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Measures calls of the method, traces them as spans and adds them to the `timings` stats of its instance."""
+
+    def decorator(method: Callable[..., T]) -> Callable[..., T]:
+        @wraps(method)
+        def wrapper(self, *args, **kwargs) -> T:
+            with span(f"{type(self).__name__.lower()}.{kind}"), measure() as timings:
+                try:
+                    return method(self, *args, **kwargs)
+                finally:
+                    if self.timings is not None:
+                        self.timings.add(kind, timings)
+
+        return wrapper
+
+    return decorator
+
+
+def _summarize(durations: list[float]) -> dict:
+    histogram = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+    for duration in durations:
+        histogram[bisect_left(HISTOGRAM_BUCKETS, duration)] += 1
+    labels = [str(bound) for bound in HISTOGRAM_BUCKETS] + ["+Inf"]
+    return {
+        "total": sum(durations),
+        "p50": _percentile(durations, 0.5),
+        "p90": _percentile(durations, 0.9),
+        "max": durations[-1],
+        "histogram": dict(zip(labels, histogram)),
+    }
+
+
+def _percentile(durations: list[float], fraction: float) -> float:
+    return durations[min(int(len(durations) * fraction), len(durations) - 1)]
@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
+from time import perf_counter
 
 from pydantic import BaseModel
 
+from alumnium import hooks
 from alumnium.drivers.base_driver import BaseDriver
 
 
@@ -22,7 +24,15 @@ class BaseTool(ABC, BaseModel):
         tool_name = tool_call.get("name", "")
         tool_args = tool_call.get("args", {})
         tool = tools[tool_name](**tool_args)
-        tool.invoke(driver)
+        started = perf_counter()
+        error = None
+        try:
+            tool.invoke(driver)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            hooks.emit("tool_invoked", tool=tool_name, args=tool_args, duration=perf_counter() - started, error=error)
         args_str = ", ".join(f"{k}='{v}'" for k, v in tool_args.items())
         return f"{tool_name}({args_str})"
 
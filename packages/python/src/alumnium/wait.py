@@ -0,0 +1,115 @@
+from hashlib import sha1
+from time import perf_counter, sleep
+from typing import Callable
+
+from . import DELAY, RETRIES
+from .clients.typecasting import Data
+from .drivers.page_state import PageState
+from .logutils import get_logger
+from .result import WaitResult
+
+logger = get_logger(__name__)
+
+MAX_POLL_DELAY = 5.0
+
+
+def recheck_while_changing(
+    question: str,
+    state: PageState,
+    answer: tuple[str, Data],
+    capture: Callable[[], PageState],
+    retrieve: Callable[[str, PageState], tuple[str, Data]],
+    tries: int = RETRIES,
+    delay: float = DELAY,
+) -> tuple[str, Data]:
+    """
+    Asks the question again while the answer is false and the accessibility tree keeps changing.
+
+    Args:
+        question: The question the answer was given to.
+        state: The page state the answer was given for.
+        answer: The explanation and value of the answer.
+        capture: Function capturing the page state with the accessibility tree.
+        retrieve: Function asking the model a question about the captured page state.
+        tries: Maximum number of rechecks.
+        delay: Time to wait before every recheck in seconds.
+
+    Returns:
+        The explanation and value of the last answer.
+    """
+    for _ in range(tries):
+        if answer[1]:
+            break
+
+        sleep(delay)
+        assert state.accessibility_tree is not None
+        previous_tree = state.accessibility_tree.to_str()
+        state = capture()
+        assert state.accessibility_tree is not None
+        if state.accessibility_tree.to_str() == previous_tree:
+            logger.debug("Page has not changed since the check, skipping recheck")
+            break
+
+        logger.debug("Page has changed since the check, rechecking")
+        answer = retrieve(question, state)
+    return answer
+
+
+def poll_until(
+    statement: str,
+    capture: Callable[[], PageState],
+    retrieve: Callable[[str, PageState], tuple[str, Data]],
+    timeout: float,
+    delay: float = DELAY,
+) -> WaitResult:
+    """
+    Polls the page until the statement is true, asking the model only when the accessibility tree has changed.
+    Polling interval starts at `delay` and doubles after every poll up to `MAX_POLL_DELAY`.
+
+    Args:
+        statement: The statement to wait for.
+        capture: Function capturing the page state with the accessibility tree.
+        retrieve: Function asking the model a question about the captured page state.
+        timeout: Maximum time to wait in seconds.
+        delay: Initial polling interval in seconds.
+
+    Returns:
+        WaitResult with the explanation and timing details.
+
+    Raises:
+        AssertionError: If the statement is still false after the timeout.
+    """
+    question = f"Is the following true or false - {statement}"
+    started = perf_counter()
+    deadline = started + timeout
+    evaluations = polls = 0
+    explanation = ""
+    last_digest = None
+
+    while True:
+        state = capture()
+        polls += 1
+
+        assert state.accessibility_tree is not None
+        digest = sha1(state.accessibility_tree.to_str().encode()).hexdigest()
+        if digest != last_digest:
+            last_digest = digest
+            explanation, value = retrieve(question, state)
+            evaluations += 1
+            if value:
+                return WaitResult(
+                    explanation=explanation,
+                    duration=perf_counter() - started,
+                    evaluations=evaluations,
+                    polls=polls,
+                )
+        else:
+            logger.debug("Page has not changed, skipping evaluation")
+
+        remaining = deadline - perf_counter()
+        if remaining <= 0:
+            raise AssertionError(
+                f"Timed out after {timeout}s ({evaluations} evaluations, {polls} polls): {explanation}"
+            )
+        sleep(min(delay, remaining))
+        delay = min(delay * 2, MAX_POLL_DELAY)
@@ -0,0 +1,80 @@
+from pytest import raises
+
+from alumnium.accessibility import ChromiumAccessibilityTree, XCUITestAccessibilityTree
+
+
+def node(node_id: int, role: str, name: str, children: list[int] | None = None, parent: int | None = None) -> dict:
+    return {
+        "nodeId": node_id,
+        "backendDOMNodeId": node_id * 10,
+        "role": {"value": role},
+        "name": {"value": name},
+        "childIds": children or [],
+        **({"parentId": parent} if parent else {}),
+    }
+
+
+def chromium_tree(*nodes: dict) -> ChromiumAccessibilityTree:
+    return ChromiumAccessibilityTree({"nodes": list(nodes)})
+
+
+def test_fingerprint_survives_inserted_elements():
+    old = chromium_tree(
+        node(1, "RootWebArea", "Page", [2, 3]),
+        node(2, "button", "Save", parent=1),
+        node(3, "button", "Cancel", parent=1),
+    )
+    new = chromium_tree(
+        node(1, "RootWebArea", "Another page", [4, 2, 3]),
+        node(4, "alert", "Saved", parent=1),
+        node(2, "button", "Save", parent=1),
+        node(3, "button", "Cancel", parent=1),
+    )
+
+    assert new.raw_id_by_fingerprint(old.fingerprint(3)) == 4
+    assert new.element_by_id(4).backend_node_id == 30
+
+
+def test_fingerprint_falls_back_to_backend_node_id():
+    old = chromium_tree(node(1, "RootWebArea", "Page", [2]), node(2, "button", "Save", parent=1))
+    new = chromium_tree(node(1, "RootWebArea", "Page", [2]), node(2, "button", "Saving...", parent=1))
+
+    assert new.raw_id_by_fingerprint(old.fingerprint(2)) == 2
+
+
+def test_fingerprint_distinguishes_elements_with_same_name():
+    tree = chromium_tree(
+        node(1, "RootWebArea", "Page", [2, 3]),
+        node(2, "button", "Delete", parent=1),
+        node(3, "button", "Delete", parent=1),
+    )
+
+    assert tree.fingerprint(2) != tree.fingerprint(3)
+
+
+def test_scoped_tree_keeps_fingerprints():
+    tree = chromium_tree(
+        node(1, "RootWebArea", "Page", [2]),
+        node(2, "form", "Login", [3], parent=1),
+        node(3, "button", "Submit", parent=2),
+    )
+
+    assert tree.scope_to_area(2).fingerprints == {2: tree.fingerprint(2), 3: tree.fingerprint(3)}
+
+
+def test_fingerprint_of_missing_element():
+    with raises(KeyError):
+        chromium_tree(node(1, "RootWebArea", "Page", [])).fingerprint(2)
+
+
+def test_xcuitest_fingerprint_survives_inserted_elements():
+    old = XCUITestAccessibilityTree(
+        '<XCUIElementTypeApplication name="App"><XCUIElementTypeButton name="Continue"/></XCUIElementTypeApplication>'
+    )
+    new = XCUITestAccessibilityTree(
+        "<XCUIElementTypeApplication name='App'>"
+        "<XCUIElementTypeStaticText name='Welcome'/><XCUIElementTypeButton name='Continue'/>"
+        "</XCUIElementTypeApplication>"
+    )
+
+    assert new.raw_id_by_fingerprint(old.fingerprint(2)) == 3
@@ -0,0 +1,66 @@
+from json import load
+from pathlib import Path
+
+from pytest import fixture
+
+from alumnium.accessibility import ChromiumAccessibilityTree, XCUITestAccessibilityTree
+from alumnium.accessibility.tree_index import IndexedNode, TreeIndex
+
+FIXTURES = Path(__file__).parent.parent / "fixtures"
+
+
+@fixture
+def chromium_index() -> TreeIndex:
+    with open(FIXTURES / "chromium_accessibility_tree.json", "r") as f:
+        return TreeIndex.from_tree(ChromiumAccessibilityTree(load(f)))
+
+
+@fixture
+def xcuitest_index() -> TreeIndex:
+    with open(FIXTURES / "simple_xcuitest_accessibility_tree.xml", "r") as f:
+        return TreeIndex.from_tree(XCUITestAccessibilityTree(f.read()))
+
+
+def test_with_text(chromium_index: TreeIndex):
+    assert [node.raw_id for node in chromium_index.with_text("Item Left")] == [34]
+    assert chromium_index.with_text("Order #1234") == []
+
+
+def test_with_text_matches_whole_words():
+    index = TreeIndex(
+        [
+            IndexedNode(raw_id=1, role="heading", name="order #12345"),
+            IndexedNode(raw_id=2, role="text", value="discarted items"),
+        ]
+    )
+
+    assert [node.raw_id for node in index.with_text("Order #12345")] == [1]
+    assert index.with_text("Order #1234") == []
+    assert index.with_text("cart") == []
+
+
+def test_with_role_and_name(chromium_index: TreeIndex):
+    assert [node.raw_id for node in chromium_index.with_role_and_name("button", "Clear completed")] == [45]
+    assert [node.raw_id for node in chromium_index.with_role_and_name("text field", "New Todo Input")] == [9]
+    assert chromium_index.with_role_and_name("link", "Clear completed") == []
+
+
+def test_platform_roles_are_normalized(xcuitest_index: TreeIndex):
+    assert [node.raw_id for node in xcuitest_index.with_role_and_name("button", "Add task")] == [60]
+    assert [node.raw_id for node in xcuitest_index.with_role_and_name("textbox", "Enter code")] == [77]
+
+
+def test_resolve(chromium_index: TreeIndex):
+    assert chromium_index.resolve("Clear completed button").raw_id == 45  # pyright: ignore[reportOptionalMemberAccess]
+    assert chromium_index.resolve("'Clear completed'").raw_id == 45  # pyright: ignore[reportOptionalMemberAccess]
+    assert chromium_index.resolve("new todo field").raw_id == 9  # pyright: ignore[reportOptionalMemberAccess]
+    assert chromium_index.resolve("Activ link").raw_id == 40  # pyright: ignore[reportOptionalMemberAccess]
+    # Exact matches win over partial ones
+    assert chromium_index.resolve("Completed").raw_id == 43  # pyright: ignore[reportOptionalMemberAccess]
+
+
+def test_resolve_ambiguous_or_unknown(chromium_index: TreeIndex):
+    # Text box and its label
+    assert chromium_index.resolve("New Todo") is None
+    assert chromium_index.resolve("the button") is None
+    assert chromium_index.resolve("Save button") is None
@@ -0,0 +1,11 @@
+from pytest import MonkeyPatch, fixture
+
+from alumnium.clients import http_client
+from tests.fakes import FakeServer
+
+
+@fixture
+def server(monkeypatch: MonkeyPatch) -> FakeServer:
+    server = FakeServer()
+    monkeypatch.setattr(http_client, "new_session", lambda: server)
+    return server
@@ -0,0 +1,57 @@
+import json
+from pathlib import Path
+
+from pytest import MonkeyPatch, fixture, raises
+
+from alumnium.clients import http_client
+from alumnium.clients.cassette import CassetteMismatchError
+from alumnium.clients.http_client import HttpClient
+from tests.fakes import FakeServer
+
+
+@fixture(autouse=True)
+def cassette_path(monkeypatch: MonkeyPatch, tmp_path: Path):
+    monkeypatch.setattr(http_client, "CASSETTE_PATH", str(tmp_path / "cassette.json"))
+
+
+def record(server: FakeServer):
+    client = HttpClient("http://server", None, "chromium", {}, cassette="record")
+    client.plan_actions("log in", '<main nodeId="1"><button name="Log in" /></main>')
+    client.retrieve("title is Home", "<main />", "Home", "url", screenshot=b"\x89PNG")
+    client.quit()
+
+
+def test_replay_serves_recorded_responses_without_server(server: FakeServer):
+    record(server)
+    server.calls.clear()
+
+    client = HttpClient(None, None, "chromium", {}, cassette="replay")
+
+    assert client.model.name == "gpt"
+    # Node IDs assigned by the browser differ between runs and are ignored
+    plan = client.plan_actions("log in", '<main nodeId="7"><button name="Log in" /></main>')
+    assert plan == ("Plan for log in", ["log in"])
+    assert client.retrieve("title is Home", "<main />", "Home", "url", screenshot="iVBORw==") == ("Explanation", True)
+    assert server.calls == []
+
+
+def test_replay_reports_closest_recorded_request(server: FakeServer):
+    record(server)
+    client = HttpClient(None, None, "chromium", {}, cassette="replay")
+
+    with raises(CassetteMismatchError, match='goal is "log in"') as error:
+        client.plan_actions("sign up", '<main><button name="Log in" /></main>')
+    assert "accessibility_tree" not in str(error.value).split("Closest recorded requests:")[1]
+
+
+def test_clients_record_to_the_same_cassette(server: FakeServer, tmp_path: Path):
+    first = HttpClient("http://server", None, "chromium", {}, cassette="record")
+    second = HttpClient("http://server", None, "chromium", {}, cassette="record")
+    first.plan_actions("goal A", "<main />")
+    second.plan_actions("goal B", "<main />")
+    first.quit()
+    second.quit()
+
+    interactions = json.loads((tmp_path / "cassette.json").read_text())["interactions"]
+    goals = [interaction["request"]["goal"] for interaction in interactions]
+    assert goals == ["goal A", "goal B"]
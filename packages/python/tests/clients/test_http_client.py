@@ -0,0 +1,58 @@
+from pytest import raises
+
+from alumnium.clients.http_client import HttpClient
+from alumnium.timings import measure
+from tests.fakes import FakeResponse, FakeServer
+
+
+def test_retrieve_uploads_screenshot_as_multipart(server: FakeServer):
+    client = HttpClient("http://server", None, "chromium", {})
+    assert client.retrieve("statement", "<tree/>", "Title", "url", screenshot="iVBORw==") == ("Explanation", True)
+
+    call = server.calls[-1]
+    assert call["files"] == {"screenshot": ("screenshot", b"\x89PNG", "application/octet-stream")}
+    assert call["data"]["accessibility_tree"] == "<tree/>"
+    assert "json" not in call
+
+
+def test_retrieve_falls_back_to_json_for_older_servers(server: FakeServer):
+    server.supports_multipart = False
+    client = HttpClient("http://server", None, "chromium", {})
+
+    assert client.retrieve("statement", "<tree/>", "Title", "url", screenshot=b"\x89PNG") == ("Explanation", True)
+    assert server.calls[-1]["json"]["screenshot"] == "iVBORw=="
+
+    # Fallback is remembered for the following calls
+    client.retrieve("statement", "<tree/>", "Title", "url", screenshot=b"\x89PNG")
+    assert "files" not in server.calls[-1]
+
+
+def test_retrieve_keeps_multipart_after_unrelated_errors(server: FakeServer):
+    client = HttpClient("http://server", None, "chromium", {})
+    server.error = FakeResponse({"message": 'Error: {"type": "validation", "property": "statement"}'}, 422)
+
+    with raises(RuntimeError):
+        client.retrieve("statement", "<tree/>", "Title", "url", screenshot=b"\x89PNG")
+    assert "files" in server.calls[-1]
+
+    server.error = None
+    client.retrieve("statement", "<tree/>", "Title", "url", screenshot=b"\x89PNG")
+    assert "files" in server.calls[-1]
+
+
+def test_request_timings_are_recorded(server: FakeServer):
+    client = HttpClient("http://server", None, "chromium", {})
+
+    with measure() as timings:
+        client.retrieve("statement", "<tree/>", "Title", "url", screenshot=None)
+
+    assert timings.durations["server"] == 0.25
+    assert "request" in timings.durations
+    assert timings.bytes_received == 2
+
+
+def test_plan_is_not_requested_without_planner(server: FakeServer):
+    client = HttpClient("http://server", None, "chromium", {}, planner=False)
+
+    assert client.plan_actions("goal", "<tree/>") == ("goal", ["goal"])
+    assert [call["url"] for call in server.calls] == ["http://server/v1/sessions"]
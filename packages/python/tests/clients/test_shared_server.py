@@ -0,0 +1,34 @@
+import json
+from pathlib import Path
+
+import httpx
+from pytest import MonkeyPatch
+
+from alumnium.clients.shared_server import SharedServer
+
+
+def test_shared_server_is_reused_and_stopped_by_last_client(tmp_path: Path, monkeypatch: MonkeyPatch):
+    # Server resolves its PID file relative to the store directory too
+    monkeypatch.setenv("ALUMNIUM_STORE_DIR", str(tmp_path))
+    server = SharedServer("127.0.0.1")
+
+    first_url, first_client = server.acquire()
+    try:
+        second_url, second_client = SharedServer("127.0.0.1").acquire()
+        assert second_url == first_url
+
+        state = json.loads(server.state_path.read_text())
+        assert state["clients"] == [first_client, second_client]
+
+        server.release(first_client)
+        assert httpx.get(f"{first_url}/v1/health", timeout=10.0).status_code == 200
+
+        # Clients of dead processes do not keep the server alive
+        state = json.loads(server.state_path.read_text())
+        state["clients"].append("999999999-deadbeef")
+        server.state_path.write_text(json.dumps(state))
+    finally:
+        server.release(second_client)
+
+    assert not server.state_path.exists()
+    assert not SharedServer._is_healthy(first_url)
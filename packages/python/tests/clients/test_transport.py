@@ -0,0 +1,50 @@
+import json
+import socket
+import socketserver
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from tempfile import gettempdir
+from threading import Thread
+from uuid import uuid4
+
+from pytest import fixture, mark
+
+from alumnium.clients.transport import new_session, unix_socket_url
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        response = json.dumps({"path": self.path, "body": json.loads(body)}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@fixture
+def socket_path():
+    # Socket paths are limited to ~100 characters, so avoid deep pytest temporary directories
+    path = Path(gettempdir()) / f"alumnium-{uuid4().hex[:8]}.sock"
+    server = socketserver.ThreadingUnixStreamServer(str(path), Handler)
+    server.daemon_threads = True
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield str(path)
+    server.shutdown()
+    server.server_close()
+    path.unlink(missing_ok=True)
+
+
+@mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix domain sockets are not supported")
+def test_session_sends_requests_over_unix_socket(socket_path: str):
+    url = unix_socket_url(socket_path)
+    assert url.startswith("http+unix://%2F")
+
+    session = new_session()
+    for _ in range(2):
+        response = session.post(f"{url}/v1/sessions?a=1", json={"tree": "<tree/>"}, timeout=10)
+        assert response.json() == {"path": "/v1/sessions?a=1", "body": {"tree": "<tree/>"}}
@@ -0,0 +1,49 @@
+from alumnium.accessibility import AccessibilityElement
+from alumnium.drivers.appium_driver import AppiumDriver
+from tests.fakes import FakeTree
+
+
+def button(raw_id: int) -> AccessibilityElement:
+    return AccessibilityElement(id=raw_id, type="android.widget.Button", androidresourceid=f"button{raw_id}")
+
+
+class FakeRemote:
+    def __init__(self, matches: int | None = None):
+        self.matches = matches  # number of elements matched by combined queries, one per locator by default
+        self.queries: list[str] = []
+
+    def find_elements(self, by: str, query: str) -> list[str]:
+        self.queries.append(query)
+        locators = query.split(" | ")
+        return [f"match {index}" for index in range(self.matches or len(locators))]
+
+    def find_element(self, by: str, query: str) -> str:
+        self.queries.append(query)
+        return query
+
+
+class FakeAppiumDriver(AppiumDriver):
+    accessibility_tree = FakeTree(element=button)  # pyright: ignore[reportAssignmentType]
+
+    def __init__(self, driver: FakeRemote):
+        self.driver = driver  # pyright: ignore[reportAttributeAccessIssue]
+        self.platform = "uiautomator2"
+
+
+def test_elements_are_found_with_one_combined_query():
+    driver = FakeRemote()
+
+    # Matches come in the order of the page source, which raw IDs follow
+    assert FakeAppiumDriver(driver).resolve_elements([3, 1]) == ["match 1", "match 0"]
+    assert driver.queries == [
+        '(//android.widget.Button[@resource-id="button1"]) | (//android.widget.Button[@resource-id="button3"])'
+    ]
+
+
+def test_elements_are_found_one_by_one_when_combined_query_is_ambiguous():
+    driver = FakeRemote(matches=3)
+
+    assert FakeAppiumDriver(driver).resolve_elements([1, 2]) == [
+        '//android.widget.Button[@resource-id="button1"]',
+        '//android.widget.Button[@resource-id="button2"]',
+    ]
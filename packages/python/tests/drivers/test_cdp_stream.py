@@ -0,0 +1,40 @@
+import asyncio
+from base64 import b64encode
+from pathlib import Path
+
+from pytest import raises
+
+from alumnium.drivers.cdp_stream import write_stream, write_stream_async
+
+
+def test_write_stream_writes_chunks_and_closes_handle(tmp_path: Path):
+    chunks = [
+        {"data": b64encode(b"%PDF-").decode(), "base64Encoded": True, "eof": False},
+        {"data": b64encode(b"1.4").decode(), "base64Encoded": True, "eof": True},
+    ]
+    commands = []
+
+    def send(method: str, params: dict) -> dict:
+        commands.append((method, params))
+        return chunks.pop(0) if method == "IO.read" else {}
+
+    filepath = tmp_path / "page.pdf"
+    write_stream(send, "stream-1", str(filepath))
+
+    assert filepath.read_bytes() == b"%PDF-1.4"
+    assert [method for method, _ in commands] == ["IO.read", "IO.read", "IO.close"]
+    assert commands[-1][1] == {"handle": "stream-1"}
+
+
+def test_write_stream_async_closes_handle_when_read_fails(tmp_path: Path):
+    commands = []
+
+    async def send(method: str, params: dict) -> dict:
+        commands.append(method)
+        if method == "IO.read":
+            raise RuntimeError("Stream is gone")
+        return {}
+
+    with raises(RuntimeError, match="Stream is gone"):
+        asyncio.run(write_stream_async(send, "stream-1", str(tmp_path / "page.pdf")))
+    assert commands == ["IO.read", "IO.close"]
@@ -0,0 +1,118 @@
+from alumnium.accessibility import AccessibilityElement
+from alumnium.drivers.playwright_driver import PlaywrightDriver
+from tests.fakes import FakeTree
+
+
+class FakeSession:
+    def __init__(self):
+        self.commands: list[tuple[str, dict | None]] = []
+        self.tags: dict[int, str] = {}  # node ID -> value of data-alumnium-id
+
+    def send(self, method: str, params: dict | None = None) -> dict:
+        self.commands.append((method, params))
+        if method == "DOM.pushNodesByBackendIdsToFrontend":
+            assert params is not None
+            return {"nodeIds": [backend_node_id + 1 for backend_node_id in params["backendNodeIds"]]}
+        if method == "DOM.setAttributeValue":
+            assert params is not None
+            self.tags[params["nodeId"]] = params["value"]
+        return {}
+
+
+class FakeLocator:
+    def __init__(self, session: FakeSession, selector: str):
+        self.session = session
+        self.selector = selector
+
+    def __eq__(self, other) -> bool:
+        return self.selector == other
+
+    def _matches(self, value: str) -> bool:
+        return f"[data-alumnium-id='{value}']" in self.selector.removeprefix("css=").split(", ")
+
+    def _find(self):
+        # Locators are lazy, so elements are looked up by their tags when they are acted on
+        assert any(self._matches(value) for value in self.session.tags.values()), f"{self.selector} is not found"
+
+    def evaluate(self, script: str) -> str:
+        self._find()
+        return "BUTTON"
+
+    def evaluate_all(self, script: str):
+        assert script == PlaywrightDriver.UNTAG_SCRIPT
+        tags = self.session.tags.items()
+        self.session.tags = {node_id: value for node_id, value in tags if not self._matches(value)}
+
+    def click(self, force: bool = False):
+        self._find()
+
+    def drag_to(self, target: "FakeLocator"):
+        self._find()
+        target._find()
+
+    def fill(self, text: str):
+        self._find()
+
+    def hover(self):
+        self._find()
+
+
+class FakeFrame:
+    def __init__(self, session: FakeSession):
+        self.session = session
+
+    def locator(self, selector: str) -> FakeLocator:
+        return FakeLocator(self.session, selector)
+
+
+class FakePage:
+    def __init__(self, session: FakeSession):
+        self.main_frame = FakeFrame(session)
+
+
+class FakePlaywrightDriver(PlaywrightDriver):
+    accessibility_tree = FakeTree(element=lambda raw_id: AccessibilityElement(id=raw_id, backend_node_id=raw_id * 10))  # pyright: ignore[reportAssignmentType]
+
+    def __init__(self):
+        self.client = FakeSession()
+        self.page = FakePage(self.client)
+        self.oopif_frames = set()
+        self.autoswitch_to_new_tab = False
+        self._found_elements = set()
+
+
+def test_elements_are_resolved_in_one_pass():
+    driver = FakePlaywrightDriver()
+
+    assert driver.resolve_elements([1, 2]) == [
+        "css=[data-alumnium-id='10']",
+        "css=[data-alumnium-id='20']",
+    ]
+    pushes = [params for method, params in driver.client.commands if method == "DOM.pushNodesByBackendIdsToFrontend"]
+    assert pushes == [{"backendNodeIds": [10, 20]}]
+
+
+def test_actions_do_not_leave_elements_tagged():
+    driver = FakePlaywrightDriver()
+
+    driver.click(1)
+    driver.hover(2)
+    driver.type(3, "Hello")
+    driver.drag_and_drop(4, 5)
+    driver.click(1)
+
+    tagged = [params["nodeId"] for method, params in driver.client.commands if method == "DOM.setAttributeValue"]
+    assert tagged == [11, 21, 31, 41, 51, 11]
+    assert driver.client.tags == {}
+
+
+def test_found_elements_stay_tagged_across_actions():
+    driver = FakePlaywrightDriver()
+
+    source = driver.find_element(1)
+    target = driver.find_element(2)
+    driver.click(1)
+    driver.hover(3)
+
+    source.drag_to(target)  # pyright: ignore[reportArgumentType]
+    assert driver.client.tags == {11: "10", 21: "20"}
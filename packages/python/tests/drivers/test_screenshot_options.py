@@ -0,0 +1,105 @@
+import asyncio
+
+from pytest import raises
+
+from alumnium.drivers.cdp_stream import send_commands, send_commands_async
+from alumnium.drivers.screenshot_options import ScreenshotOptions, box_model_to_clip, capture_commands
+
+LAYOUT_METRICS = {
+    "cssVisualViewport": {"pageX": 0, "pageY": 200, "clientWidth": 1280, "clientHeight": 720},
+    "cssContentSize": {"width": 1280, "height": 4000},
+}
+
+
+def test_default_options_are_passthrough():
+    options = ScreenshotOptions(format="png", max_width=0, max_height=0, grayscale=False)
+    assert options.is_default
+    assert options.encode("iVBORw0KGgo=") == "iVBORw0KGgo="
+
+
+def test_scale_fits_into_max_dimensions():
+    options = ScreenshotOptions(max_width=640, max_height=0)
+    assert options.scale(1280, 720) == 0.5
+    assert options.scale(320, 200) == 1.0
+
+    options = ScreenshotOptions(max_width=640, max_height=180)
+    assert options.scale(1280, 720) == 0.25
+
+
+def test_cdp_params_for_viewport():
+    options = ScreenshotOptions(format="jpeg", quality=60, max_width=640, max_height=0)
+    assert options.cdp_params(LAYOUT_METRICS, full_page=False) == {
+        "format": "jpeg",
+        "quality": 60,
+        "clip": {"x": 0, "y": 200, "width": 1280, "height": 720, "scale": 0.5},
+        "captureBeyondViewport": True,
+    }
+
+
+def test_cdp_params_for_full_page():
+    options = ScreenshotOptions(format="webp", quality=50, max_width=0, max_height=2000)
+    assert options.cdp_params(LAYOUT_METRICS, full_page=True) == {
+        "format": "webp",
+        "quality": 50,
+        "clip": {"x": 0, "y": 0, "width": 1280, "height": 4000, "scale": 0.5},
+        "captureBeyondViewport": True,
+    }
+
+
+def test_cdp_params_for_clip():
+    options = ScreenshotOptions(format="png", max_width=0, max_height=0)
+    box_model = {"model": {"border": [10, 20, 110, 20, 110, 70, 10, 70]}}
+    clip = box_model_to_clip(box_model, LAYOUT_METRICS)
+    assert clip == {"x": 10, "y": 220, "width": 100, "height": 50}
+    assert options.cdp_params(LAYOUT_METRICS, full_page=False, clip=clip) == {
+        "format": "png",
+        "clip": {"x": 10, "y": 220, "width": 100, "height": 50, "scale": 1.0},
+        "captureBeyondViewport": True,
+    }
+
+
+class FakeCdp:
+    def __init__(self, fail: str | None = None):
+        self.fail = fail
+        self.sent: list[str] = []
+
+    def send(self, method: str, params: dict) -> dict:
+        self.sent.append(method)
+        if method == self.fail:
+            raise RuntimeError(f"{method} failed")
+        if method == "Page.getLayoutMetrics":
+            return LAYOUT_METRICS
+        return {"data": "iVBORw0KGgo="}
+
+    async def send_async(self, method: str, params: dict) -> dict:
+        return self.send(method, params)
+
+
+def test_capture_commands_reset_grayscale_after_screenshot():
+    cdp = FakeCdp()
+    options = ScreenshotOptions(grayscale=True)
+
+    assert send_commands(capture_commands(options, full_page=False), cdp.send) == "iVBORw0KGgo="
+    assert asyncio.run(send_commands_async(capture_commands(options, full_page=False), cdp.send_async))
+    assert cdp.sent == 2 * [
+        "Page.getLayoutMetrics",
+        "Emulation.setEmulatedVisionDeficiency",
+        "Page.captureScreenshot",
+        "Emulation.setEmulatedVisionDeficiency",
+    ]
+
+
+def test_capture_commands_reset_grayscale_when_screenshot_fails():
+    cdp = FakeCdp(fail="Page.captureScreenshot")
+
+    with raises(RuntimeError):
+        send_commands(capture_commands(ScreenshotOptions(grayscale=True), full_page=False), cdp.send)
+    assert cdp.sent[-1] == "Emulation.setEmulatedVisionDeficiency"
+
+
+def test_capture_commands_skip_clip_when_box_model_fails():
+    cdp = FakeCdp(fail="DOM.getBoxModel")
+
+    commands = capture_commands(ScreenshotOptions(), full_page=False, backend_node_id=42)
+    assert send_commands(commands, cdp.send) == "iVBORw0KGgo="
+    assert cdp.sent == ["Page.getLayoutMetrics", "DOM.getBoxModel", "Page.captureScreenshot"]
@@ -0,0 +1,59 @@
+from alumnium.accessibility import AccessibilityElement
+from alumnium.drivers.selenium_driver import SeleniumDriver
+from tests.fakes import FakeTree
+
+FRAMES = {1: [100], 2: [100], 3: None}  # raw ID -> frame chain
+
+
+def framed_element(raw_id: int) -> AccessibilityElement:
+    return AccessibilityElement(id=raw_id, backend_node_id=raw_id * 10, frame_chain=FRAMES[raw_id])
+
+
+class FakeSwitchTo:
+    def __init__(self, driver: "FakeWebDriver"):
+        self.driver = driver
+
+    def default_content(self):
+        self.driver.frame = None
+
+    def frame(self, element: tuple):
+        self.driver.frame = element[1]
+
+
+class FakeWebDriver:
+    def __init__(self):
+        self.documents = 0
+        self.frame: str | None = None
+        self.switch_to = FakeSwitchTo(self)
+
+    def execute_cdp_cmd(self, cmd: str, cmd_args: dict) -> dict:
+        # Node IDs are only valid until the document is pushed again
+        if cmd == "DOM.getFlattenedDocument":
+            self.documents += 1
+        elif cmd == "DOM.pushNodesByBackendIdsToFrontend":
+            return {"nodeIds": [(self.documents, backend_node_id) for backend_node_id in cmd_args["backendNodeIds"]]}
+        elif cmd in ("DOM.setAttributeValue", "DOM.removeAttribute"):
+            document, _ = cmd_args["nodeId"]
+            assert document == self.documents, f"Stale node ID {cmd_args['nodeId']}"
+        return {}
+
+    def find_element(self, by: str, selector: str) -> tuple:
+        return (self.frame, selector)
+
+
+class FakeSeleniumDriver(SeleniumDriver):
+    accessibility_tree = FakeTree(element=framed_element)  # pyright: ignore[reportAssignmentType]
+
+    def __init__(self):
+        self.driver = FakeWebDriver()  # pyright: ignore[reportAttributeAccessIssue]
+        self._shadow_child_to_host_map = {}
+
+
+def test_elements_in_frames_are_resolved_with_fresh_node_ids():
+    driver = FakeSeleniumDriver()
+
+    assert driver.resolve_elements([1, 2, 3]) == [
+        ("[data-alumnium-iframe-id='100']", "[data-alumnium-id='10']"),
+        ("[data-alumnium-iframe-id='100']", "[data-alumnium-id='20']"),
+        (None, "[data-alumnium-id='30']"),
+    ]
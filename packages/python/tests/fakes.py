@@ -0,0 +1,154 @@
+from typing import Callable
+
+from alumnium.accessibility import AccessibilityElement
+from alumnium.alumni import Alumni
+from alumnium.drivers.page_state import PageState
+from alumnium.fast_path import LocalFastPath
+from alumnium.timings import TimingStats
+
+
+class FakeTree:
+    """Accessibility tree serialized as the content, with elements built from raw IDs by the element function."""
+
+    change_token: str | None = None
+
+    def __init__(
+        self,
+        content: str = "",
+        element: Callable[[int], AccessibilityElement] | None = None,
+        fingerprints: dict[int, str] | None = None,
+    ):
+        self.content = content
+        self.element = element
+        self.fingerprints = fingerprints or {}
+
+    def to_str(self) -> str:
+        return self.content
+
+    def element_by_id(self, raw_id: int) -> AccessibilityElement:
+        assert self.element is not None
+        return self.element(raw_id)
+
+
+class FakeDriver:
+    """Driver returning the trees from consecutive captures, repeating the last one. None means an unchanged page."""
+
+    app = "app"
+
+    def __init__(self, trees: list):
+        self.trees = trees
+        self.captures = 0
+
+    def _next_tree(self):
+        return self.trees.pop(0) if len(self.trees) > 1 else self.trees[0]
+
+    @property
+    def accessibility_tree(self):
+        self.captures += 1
+        return self._next_tree()
+
+    def refresh_accessibility_tree(self, previous):
+        tree = self._next_tree()
+        return previous if tree is None else tree
+
+    def capture_page_state(self, accessibility_tree: bool = True, screenshot: bool = False, clip=None) -> PageState:
+        tree = self._next_tree() if accessibility_tree else None
+        return PageState(title="Title", url="url", app=self.app, accessibility_tree=tree)
+
+
+class FakeClient:
+    """
+    Client planning the given steps, or the goal itself, and answering statements with verdicts in order
+    or with answers by question. Trees sent with plans, actions and statements are recorded.
+    """
+
+    def __init__(
+        self,
+        steps: list[str] | None = None,
+        verdicts: list[bool | Exception] | None = None,
+        answers: dict[str, bool | str | None] | None = None,
+        planner: bool = True,
+    ):
+        self.steps = steps
+        self.verdicts = verdicts or []
+        self.answers = answers or {}
+        self.planner = planner
+        self.trees: list[str] = []
+        self.questions: list[str] = []
+
+    def plan_actions(self, goal, accessibility_tree, app):
+        self.trees.append(accessibility_tree)
+        return "Plan" if self.planner else goal, [goal] if self.steps is None else self.steps
+
+    def execute_action(self, goal, step, accessibility_tree, app):
+        self.trees.append(accessibility_tree)
+        return "Explanation", []
+
+    def retrieve(self, statement, accessibility_tree, title, url, screenshot, app):
+        self.trees.append(accessibility_tree)
+        self.questions.append(statement)
+        question = statement.removeprefix("Is the following true or false - ")
+        if question in self.answers:
+            return f"Explanation of {question}", self.answers[question]
+        verdict = self.verdicts.pop(0)
+        if isinstance(verdict, Exception):
+            raise verdict
+        return f"Explanation {len(self.questions)}", verdict
+
+
+def build_alumni(driver: FakeDriver, client: FakeClient, recheck_on_change: bool = False) -> Alumni:
+    al = Alumni.__new__(Alumni)
+    al.driver = driver  # pyright: ignore[reportAttributeAccessIssue]
+    al.client = client  # pyright: ignore[reportAttributeAccessIssue]
+    al.tools = {}
+    al.change_analysis = False
+    al.recheck_on_change = recheck_on_change
+    al.fast_path = LocalFastPath(enabled=False)
+    al.timings = TimingStats()
+    return al
+
+
+class FakeResponse:
+    headers = {"Server-Timing": "handler;dur=250.00"}
+    content = b"{}"
+    request = None
+
+    def __init__(self, data: dict, status_code: int = 200):
+        self.data = data
+        self.status_code = status_code
+        self.text = str(data)
+
+    def json(self) -> dict:
+        return self.data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class FakeServer:
+    """Server behind the HTTP session of clients, recording the URL and arguments of every request."""
+
+    def __init__(self):
+        self.calls: list[dict] = []
+        self.supports_multipart = True
+        self.error: FakeResponse | None = None
+
+    def post(self, url: str, **kwargs) -> FakeResponse:
+        self.calls.append({"url": url, **kwargs})
+        if url.endswith("/v1/sessions"):
+            return FakeResponse({"session_id": "session", "model": "openai/gpt"})
+        if self.error:
+            return self.error
+        if url.endswith("/plans"):
+            goal = kwargs["json"]["goal"]
+            return FakeResponse({"explanation": f"Plan for {goal}", "steps": [goal]})
+        if "files" in kwargs and not self.supports_multipart:
+            return FakeResponse({"message": 'Error: {"type": "validation", "property": "screenshot"}'}, 500)
+        return FakeResponse({"explanation": "Explanation", "result": "true"})
+
+    def delete(self, url: str, **kwargs) -> FakeResponse:
+        return FakeResponse({})
+
+    def close(self):
+        pass
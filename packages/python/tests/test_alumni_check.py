@@ -0,0 +1,74 @@
+from pytest import MonkeyPatch, fixture, raises
+
+from alumnium import wait
+from tests.fakes import FakeClient, FakeDriver, FakeTree, build_alumni
+
+
+@fixture(autouse=True)
+def no_delay(monkeypatch: MonkeyPatch):
+    monkeypatch.setattr(wait, "sleep", lambda _: None)
+
+
+def test_false_statement_fails_without_retrying():
+    client = FakeClient(verdicts=[False, True])
+
+    with raises(AssertionError, match="Explanation 1"):
+        build_alumni(FakeDriver([FakeTree("<tree/>")]), client).check("statement")
+    assert len(client.trees) == 1
+
+
+def test_server_errors_are_retried():
+    client = FakeClient(verdicts=[ConnectionError("Server is down"), True])
+
+    assert build_alumni(FakeDriver([FakeTree("<tree/>")]), client).check("statement") == "Explanation 2"
+
+
+def test_false_statement_is_rechecked_only_while_page_changes():
+    driver = FakeDriver([FakeTree("<a/>"), FakeTree("<b/>")])
+    client = FakeClient(verdicts=[False, False, True])
+
+    with raises(AssertionError, match="Explanation 2"):
+        build_alumni(driver, client, recheck_on_change=True).check("statement")
+    assert client.trees == ["<a/>", "<b/>"]
+
+
+def test_check_timings_are_aggregated():
+    al = build_alumni(FakeDriver([FakeTree("<tree/>")]), FakeClient(verdicts=[True, True]))
+    al.check("statement")
+    al.check("statement")
+
+    timings = al.timings.summary()["check"]
+    assert timings["count"] == 2
+    assert set(timings["phases"]) == {"capture", "serialize"}
+    assert sum(timings["phases"]["capture"]["histogram"].values()) == 2
+
+
+def test_check_all_captures_page_once_and_reports_every_statement():
+    driver = FakeDriver([FakeTree("<a/>"), FakeTree("<b/>")])
+    client = FakeClient(answers={"first": True, "second": False, "third": False})
+
+    with raises(AssertionError) as error:
+        build_alumni(driver, client).check_all(["first", "second", "third"])
+
+    assert str(error.value).splitlines() == [
+        "second: Explanation of second",
+        "third: Explanation of third",
+    ]
+    assert len(client.questions) == 3
+    assert [tree.to_str() for tree in driver.trees] == ["<b/>"]  # captured once
+
+
+def test_check_all_returns_results_in_order():
+    al = build_alumni(FakeDriver([FakeTree("<tree/>")]), FakeClient(answers={"first": True, "second": True}))
+
+    results = al.check_all(["first", "second"])
+
+    assert [(result.statement, result.passed) for result in results] == [("first", True), ("second", True)]
+    assert al.timings.summary()["check_all"]["count"] == 1
+
+
+def test_get_many_returns_data_by_name():
+    client = FakeClient(answers={"title": "Alumnium", "count": None})
+    al = build_alumni(FakeDriver([FakeTree("<tree/>")]), client)
+
+    assert al.get_many({"name": "title", "total": "count"}) == {"name": "Alumnium", "total": "Explanation of count"}
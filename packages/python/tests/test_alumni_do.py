@@ -0,0 +1,12 @@
+from tests.fakes import FakeClient, FakeDriver, FakeTree, build_alumni
+
+
+def test_first_step_reuses_planned_tree():
+    for planner in (True, False):
+        driver = FakeDriver([FakeTree("<initial/>")])
+        client = FakeClient(planner=planner)
+
+        build_alumni(driver, client).do("log in")
+
+        assert client.trees == ["<initial/>", "<initial/>"]  # plan and the first step
+        assert driver.captures == 1
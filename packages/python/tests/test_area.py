@@ -0,0 +1,112 @@
+import re
+
+from pytest import MonkeyPatch
+
+from alumnium import wait
+from alumnium.accessibility import ChromiumAccessibilityTree
+from alumnium.area import Area
+from tests.fakes import FakeClient, FakeDriver
+
+
+def node(node_id: int, role: str, name: str, children: list[int] | None = None, parent: int | None = None) -> dict:
+    return {
+        "nodeId": node_id,
+        "backendDOMNodeId": node_id * 10,
+        "role": {"value": role},
+        "name": {"value": name},
+        "childIds": children or [],
+        **({"parentId": parent} if parent else {}),
+    }
+
+
+def raw_id(tree: ChromiumAccessibilityTree, name: str) -> int:
+    match = re.search(rf'raw_id="(\d+)"[^>]* name="{name}"', tree.to_str())
+    assert match is not None
+    return int(match.group(1))
+
+
+def test_area_is_located_again_in_changed_page_for_every_step():
+    page = ChromiumAccessibilityTree(
+        {
+            "nodes": [
+                node(1, "RootWebArea", "Shop", [2, 3]),
+                node(2, "banner", "Header", parent=1),
+                node(3, "form", "Checkout", [4], parent=1),
+                node(4, "button", "Pay", parent=3),
+            ]
+        }
+    )
+    changed_page = ChromiumAccessibilityTree(
+        {
+            "nodes": [
+                node(1, "RootWebArea", "Shop", [5, 2, 3]),
+                node(5, "alert", "Payment failed", parent=1),
+                node(2, "banner", "Header", parent=1),
+                node(3, "form", "Checkout", [4, 6], parent=1),
+                node(4, "button", "Pay", parent=3),
+                node(6, "StaticText", "Card declined", parent=3),
+            ]
+        }
+    )
+    area_id = raw_id(page, "Checkout")
+    driver = FakeDriver([None, changed_page])
+    client = FakeClient(steps=["pay", "retry"])
+    area = Area(
+        id=area_id,
+        description="Checkout form",
+        driver=driver,  # pyright: ignore[reportArgumentType]
+        accessibility_tree=page.scope_to_area(area_id),
+        tools={},
+        client=client,  # pyright: ignore[reportArgumentType]
+        page_accessibility_tree=page,
+    )
+
+    area.do("pay")
+
+    plan_tree, first_step_tree, second_step_tree = client.trees
+    assert plan_tree == first_step_tree
+    assert "Card declined" not in first_step_tree
+    assert "Card declined" in second_step_tree
+    assert "Payment failed" not in second_step_tree
+    assert area.id == raw_id(changed_page, "Checkout") != area_id
+    assert driver.captures == 0
+
+
+def test_false_check_is_rechecked_in_changed_area(monkeypatch: MonkeyPatch):
+    monkeypatch.setattr(wait, "sleep", lambda _: None)
+    page = ChromiumAccessibilityTree(
+        {
+            "nodes": [
+                node(1, "RootWebArea", "Shop", [2]),
+                node(2, "form", "Checkout", [3], parent=1),
+                node(3, "StaticText", "Processing", parent=2),
+            ]
+        }
+    )
+    paid_page = ChromiumAccessibilityTree(
+        {
+            "nodes": [
+                node(1, "RootWebArea", "Shop", [2]),
+                node(2, "form", "Checkout", [3], parent=1),
+                node(3, "StaticText", "Paid", parent=2),
+            ]
+        }
+    )
+    area_id = raw_id(page, "Checkout")
+    client = FakeClient(verdicts=[False, True])
+    area = Area(
+        id=area_id,
+        description="Checkout form",
+        driver=FakeDriver([None, paid_page]),  # pyright: ignore[reportArgumentType]
+        accessibility_tree=page.scope_to_area(area_id),
+        tools={},
+        client=client,  # pyright: ignore[reportArgumentType]
+        page_accessibility_tree=page,
+        recheck_on_change=True,
+    )
+
+    area.check("payment is done")
+
+    first_tree, second_tree = client.trees
+    assert "Processing" in first_tree
+    assert "Paid" in second_tree
@@ -0,0 +1,22 @@
+from threading import Barrier
+
+from alumnium.batch import retrieve_all
+from alumnium.clients.transport import worker_session
+from alumnium.drivers.page_state import PageState
+
+
+def test_each_worker_sends_requests_through_its_own_session():
+    state = PageState(title="Title", url="url", app="app")
+    # Both questions are in flight at the same time, so they run in different workers
+    barrier = Barrier(2, timeout=5)
+    sessions = []
+
+    def retrieve(question: str, state: PageState) -> tuple[str, bool]:
+        sessions.append(worker_session.get())
+        barrier.wait()
+        return question, True
+
+    assert retrieve_all(["first", "second"], state, retrieve) == [("first", True), ("second", True)]
+    assert None not in sessions
+    assert sessions[0] is not sessions[1]
+    assert worker_session.get() is None
@@ -0,0 +1,55 @@
+from pytest import raises
+
+from alumnium.codegen import generate_code
+from alumnium.result import DoResult, DoStep, TracedAction, TracedElement
+
+SEARCH = TracedElement(fingerprint="a", role="textbox", name="Search")
+SUBMIT = TracedElement(fingerprint="b", role="button", name="Let's go")
+UNNAMED = TracedElement(fingerprint="c", role="generic")
+
+
+def result(*actions: TracedAction) -> DoResult:
+    return DoResult(explanation="", steps=[DoStep(name="step", tools=[], actions=list(actions))])
+
+
+def test_playwright_code_uses_role_locators():
+    code = generate_code(
+        result(
+            TracedAction("NavigateToUrlTool", {"url": "https://example.com"}),
+            TracedAction("TypeTool", {"id": 2, "text": "cats"}, {"id": SEARCH}),
+            TracedAction("ClickTool", {"id": 3}, {"id": SUBMIT}),
+        )
+    )
+
+    assert code.splitlines() == [
+        'page.goto("https://example.com")',
+        'page.get_by_role("textbox", name="Search", exact=True).fill("cats")',
+        'page.get_by_role("button", name="Let\'s go", exact=True).click()',
+    ]
+
+
+def test_selenium_code_uses_xpath_locators():
+    code = generate_code([TracedAction("ClickTool", {"id": 3}, {"id": SUBMIT})], framework="selenium")
+
+    assert code.startswith('driver.find_element(By.XPATH, "//*[(self::button or ')
+    assert '@aria-label=\\"Let\'s go\\"' in code
+    assert code.endswith(").click()")
+
+
+def test_selenium_code_locates_labelled_inputs():
+    code = generate_code([TracedAction("TypeTool", {"id": 2, "text": "cats"}, {"id": SEARCH})], framework="selenium")
+
+    assert "@id=//label[normalize-space(.)='Search']/@for" in code
+    assert "ancestor::label[normalize-space(.)='Search']" in code
+    assert "@aria-labelledby=//*[normalize-space(.)='Search']/@id" in code
+
+
+def test_actions_without_stable_locators_are_commented_out():
+    code = generate_code([TracedAction("ClickTool", {"id": 4}, {"id": UNNAMED})])
+
+    assert code == "# ClickTool(id=4) cannot be converted"
+
+
+def test_unsupported_framework():
+    with raises(ValueError, match="Unsupported framework"):
+        generate_code([], framework="appium")
@@ -0,0 +1,59 @@
+from json import load
+from pathlib import Path
+
+from pytest import fixture, mark
+
+from alumnium.accessibility import ChromiumAccessibilityTree
+from alumnium.fast_path import LocalFastPath
+
+
+@fixture
+def tree() -> ChromiumAccessibilityTree:
+    with open(Path(__file__).parent / "fixtures/chromium_accessibility_tree.json", "r") as f:
+        return ChromiumAccessibilityTree(load(f))
+
+
+@mark.parametrize(
+    "statement",
+    [
+        'page contains "1 item left!"',
+        "The page has text 'Created by the TodoMVC Team'.",
+        "'hello' is visible",
+        "button 'Clear completed' is visible",
+        "the Completed link is displayed",
+        "heading todos is shown",
+    ],
+)
+def test_presence_statements_are_checked_locally(tree: ChromiumAccessibilityTree, statement: str):
+    fast_path = LocalFastPath(enabled=True)
+
+    assert fast_path.check(statement, tree) is not None
+    assert fast_path.hits["check"] == 1
+
+
+@mark.parametrize(
+    "statement",
+    [
+        'page contains "Order #1234"',
+        "button 'Completed' is visible",
+        "button 'Clear completed' is not visible",
+        "task 'hello' is completed",
+    ],
+)
+def test_other_statements_fall_back_to_server(tree: ChromiumAccessibilityTree, statement: str):
+    fast_path = LocalFastPath(enabled=True)
+
+    assert fast_path.check(statement, tree) is None
+    assert fast_path.hits["check"] == 0
+
+
+def test_disabled_fast_path_is_skipped(tree: ChromiumAccessibilityTree):
+    assert LocalFastPath(enabled=False).check("heading todos is shown", tree) is None
+
+
+def test_unambiguous_elements_are_found_locally(tree: ChromiumAccessibilityTree):
+    fast_path = LocalFastPath(enabled=True)
+
+    assert fast_path.find("Clear completed button", tree) == 45
+    assert fast_path.find("checkbox", tree) is None
+    assert fast_path.hits == {"check": 0, "find": 1}
@@ -0,0 +1,47 @@
+from pytest import fixture, raises
+
+from alumnium import hooks
+from alumnium.tools import BaseTool
+
+
+class FailingTool(BaseTool):
+    def invoke(self, driver):
+        raise RuntimeError("Element is stale")
+
+
+@fixture(autouse=True)
+def no_hooks():
+    yield
+    for event in hooks.EVENTS:
+        hooks.off(event)
+
+
+def test_callbacks_are_called_until_unregistered():
+    calls = []
+
+    @hooks.on("page_loaded")
+    def on_page_loaded(**payload):
+        calls.append(payload)
+
+    hooks.emit("page_loaded", platform="chromium", duration=0.5)
+    hooks.off("page_loaded", on_page_loaded)
+    hooks.emit("page_loaded", platform="chromium", duration=0.5)
+
+    assert calls == [{"platform": "chromium", "duration": 0.5}]
+    assert not hooks.enabled("page_loaded")
+
+
+def test_unknown_events_are_rejected():
+    with raises(ValueError, match="Unknown event"):
+        hooks.on("tree_serialized", lambda **_: None)
+
+
+def test_tool_invocations_are_reported_with_errors():
+    calls = []
+    hooks.on("tool_invoked", lambda **payload: calls.append(payload))
+
+    with raises(RuntimeError):
+        BaseTool.execute_tool_call({"name": "FailingTool", "args": {}}, {"FailingTool": FailingTool}, None)
+
+    assert calls[0]["tool"] == "FailingTool"
+    assert isinstance(calls[0]["error"], RuntimeError)
@@ -0,0 +1,27 @@
+import json
+import os
+import subprocess
+import sys
+
+DRIVER_LIBRARIES = ("appium", "playwright", "selenium")
+
+IMPORT_SCRIPT = f"""
+import json, sys
+import alumnium
+print(json.dumps([name for name in {DRIVER_LIBRARIES!r} if name in sys.modules]))
+"""
+
+
+def test_import_does_not_load_driver_libraries():
+    output = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT], capture_output=True, text=True, check=True)
+
+    # Driver libraries are loaded only once Alumni is given a driver
+    assert json.loads(output.stdout.splitlines()[-1]) == []
+
+
+def test_import_rejects_unsupported_screenshot_format():
+    env = {**os.environ, "ALUMNIUM_SCREENSHOT_FORMAT": "jpg"}
+    output = subprocess.run([sys.executable, "-c", "import alumnium"], capture_output=True, text=True, env=env)
+
+    assert output.returncode != 0
+    assert "ValueError: Unsupported ALUMNIUM_SCREENSHOT_FORMAT 'jpg'" in output.stderr
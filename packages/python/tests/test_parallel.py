@@ -0,0 +1,95 @@
+from asyncio import run
+from threading import Barrier, Thread, current_thread
+
+from pytest import raises
+
+from alumnium.parallel import Parallel
+
+
+class FakeDriver:
+    def __init__(self, owner_thread: Thread | None = None):
+        self.owner_thread = owner_thread
+
+
+class FakeAlumni:
+    def __init__(self, barrier: Barrier | None = None, owner_thread: Thread | None = None):
+        self.barrier = barrier
+        self.driver = FakeDriver(owner_thread)
+        self.calls: list[str] = []
+        self.threads: list[Thread] = []
+
+    def do(self, goal: str) -> str:
+        if self.barrier is not None:
+            # Times out unless all instances run at the same time
+            self.barrier.wait(timeout=5)
+        self.calls.append(goal)
+        self.threads.append(current_thread())
+        return f"done {goal}"
+
+    def check(self, statement: str, vision: bool = False) -> str:
+        self.calls.append(statement)
+        assert statement != "false", "Statement is false"
+        return f"checked {statement} with vision={vision}"
+
+
+def test_instances_run_concurrently():
+    barrier = Barrier(2)
+    users = Parallel(alice=FakeAlumni(barrier), bob=FakeAlumni(barrier))  # pyright: ignore[reportArgumentType]
+
+    assert users.do(alice="send", bob="receive") == {"alice": "done send", "bob": "done receive"}
+
+
+def test_calls_of_instance_run_in_order():
+    alice = FakeAlumni()
+    users = Parallel(alice=alice)  # pyright: ignore[reportArgumentType]
+
+    results = users.run({"alice": [("do", "first"), ("check", "second", {"vision": True}), ("do", "third")]})
+
+    assert alice.calls == ["first", "second", "third"]
+    assert results["alice"][1] == "checked second with vision=True"
+
+
+def test_failure_skips_remaining_calls_of_instance_only():
+    alice, bob = FakeAlumni(), FakeAlumni()
+    users = Parallel(alice=alice, bob=bob)  # pyright: ignore[reportArgumentType]
+    calls = {"alice": [("check", "false"), ("do", "skipped")], "bob": [("do", "first"), ("do", "second")]}
+
+    results = users.run(calls, return_exceptions=True)  # pyright: ignore[reportArgumentType]
+
+    assert isinstance(results["alice"][0], AssertionError)
+    assert alice.calls == ["false"]
+    assert results["bob"] == ["done first", "done second"]
+    with raises(AssertionError, match="Statement is false"):
+        users.run(calls)  # pyright: ignore[reportArgumentType]
+
+
+def test_async_calls_run_concurrently():
+    barrier = Barrier(2)
+    users = Parallel(alice=FakeAlumni(barrier), bob=FakeAlumni(barrier))  # pyright: ignore[reportArgumentType]
+
+    assert run(users.do_async(alice="send", bob="receive")) == {"alice": "done send", "bob": "done receive"}
+
+
+def test_unknown_instances_are_rejected():
+    with raises(ValueError, match="Unknown instance: carol"):
+        Parallel(alice=FakeAlumni()).check(carol="statement")  # pyright: ignore[reportArgumentType]
+
+
+def test_instances_bound_to_calling_thread_run_in_it():
+    barrier = Barrier(2)
+    alice, bob = FakeAlumni(barrier, owner_thread=current_thread()), FakeAlumni(barrier)
+    users = Parallel(alice=alice, bob=bob)  # pyright: ignore[reportArgumentType]
+
+    assert users.do(alice="send", bob="receive") == {"alice": "done send", "bob": "done receive"}
+    assert alice.threads == [current_thread()]
+    assert bob.threads != [current_thread()]
+
+
+def test_instances_bound_to_other_threads_are_rejected():
+    thread = Thread(name="owner")
+    users = Parallel(alice=FakeAlumni(owner_thread=thread))  # pyright: ignore[reportArgumentType]
+
+    with raises(RuntimeError, match="only be used from thread owner"):
+        users.do(alice="send")
+    with raises(RuntimeError, match="only be used from thread owner"):
+        run(users.do_async(alice="send"))
@@ -1,12 +1,16 @@
+from pathlib import Path
 from uuid import uuid4
 
 import httpx
 from portpicker import pick_unused_port
+from pytest import MonkeyPatch
 
 from alumnium.cli import run_server
 
 
-def test_server_starts_and_health_endpoint_responds():
+def test_server_starts_and_health_endpoint_responds(tmp_path: Path, monkeypatch: MonkeyPatch):
+    # Server writes its logs and PID file to the store directory
+    monkeypatch.setenv("ALUMNIUM_STORE_DIR", str(tmp_path))
     server_pid = f"pytest-{uuid4().hex}.pid"
     port = pick_unused_port()
 
@@ -0,0 +1,168 @@
+from pytest import raises
+
+from alumnium.result import TracedElement
+from alumnium.step_executor import StepExecutor
+from alumnium.tools import BaseTool
+from tests.fakes import FakeTree
+
+
+def buttons_tree() -> FakeTree:
+    return FakeTree(
+        "".join(f'<button raw_id="{id}" name="Button {id}" />' for id in range(1, 6)),
+        fingerprints={id: f"fingerprint-{id}" for id in range(1, 6)},
+    )
+
+
+class FakeDriver:
+    app = "app"
+
+    def __init__(self, failures: dict[int, int]):
+        self.failures = failures  # element id -> number of times clicking it fails
+        self.clicked: list[int] = []
+
+    def click(self, id: int):
+        if self.failures.get(id, 0) > 0:
+            self.failures[id] -= 1
+            raise RuntimeError(f"Element {id} is stale")
+        self.clicked.append(id)
+
+
+class ClickTool(BaseTool):
+    id: int
+
+    def invoke(self, driver):
+        driver.click(self.id)
+
+
+class FakeClient:
+    def __init__(self, actions: dict[str, list[list[int]]], replan: list[str] | None = None):
+        self.actions = actions  # step -> ids clicked by the actor on each request
+        self.replan = replan or []
+        self.goals: list[str] = []
+
+    def execute_action(self, goal, step, accessibility_tree, app):
+        ids = self.actions[step].pop(0) if len(self.actions[step]) > 1 else self.actions[step][0]
+        return "Explanation", [{"name": "ClickTool", "args": {"id": id}} for id in ids]
+
+    def plan_actions(self, goal, accessibility_tree, app):
+        self.goals.append(goal)
+        return "Explanation", self.replan
+
+
+def build_executor(client: FakeClient, driver: FakeDriver, retries: int = 2) -> StepExecutor:
+    return StepExecutor(client, driver, {"ClickTool": ClickTool}, buttons_tree, retries=retries, delay=0)
+
+
+def test_failing_tool_call_is_retried_without_repeating_completed_calls():
+    driver = FakeDriver(failures={2: 1})
+    client = FakeClient({"first": [[1]], "second": [[3, 2], [3, 4]]})
+
+    _, steps = build_executor(client, driver).execute("goal", "Plan", ["first", "second"])
+
+    assert driver.clicked == [1, 3, 4]
+    assert [step.attempts for step in steps] == [1, 2]
+    assert steps[1].tools == ["ClickTool(id='3')", "ClickTool(id='4')"]
+    assert client.goals == []
+
+
+def test_remaining_work_is_replanned_when_fresh_tree_does_not_help():
+    driver = FakeDriver(failures={2: 2})
+    client = FakeClient({"first": [[1]], "second": [[2]], "third": [[5]]}, replan=["third"])
+
+    _, steps = build_executor(client, driver).execute("goal", "Plan", ["first", "second"])
+
+    assert driver.clicked == [1, 5]
+    assert [(step.name, step.attempts) for step in steps] == [("first", 1), ("second", 3), ("third", 1)]
+    assert "- first: ClickTool(id='1')" in client.goals[0]
+
+
+def test_error_is_raised_when_retries_are_exhausted():
+    driver = FakeDriver(failures={1: 10})
+    client = FakeClient({"first": [[1]]}, replan=["first"])
+
+    with raises(RuntimeError, match="stale"):
+        build_executor(client, driver, retries=1).execute("goal", "Plan", ["first"])
+
+
+def test_tool_calls_are_traced_with_elements():
+    driver = FakeDriver(failures={})
+    client = FakeClient({"first": [[1, 2]]})
+
+    _, steps = build_executor(client, driver).execute("goal", "Plan", ["first"])
+
+    action = steps[0].actions[1]
+    assert (action.tool, action.args) == ("ClickTool", {"id": 2})
+    assert action.elements["id"] == TracedElement(fingerprint="fingerprint-2", role="button", name="Button 2")
+
+
+def test_tool_calls_with_string_ids_are_traced_with_elements():
+    executor = build_executor(FakeClient({}), FakeDriver(failures={}))
+
+    action = executor._trace({"name": "ClickTool", "args": {"id": "3"}}, buttons_tree())  # pyright: ignore[reportArgumentType]
+
+    assert action.args == {"id": 3}
+    assert action.elements["id"].fingerprint == "fingerprint-3"
+
+
+def test_unchanged_tree_of_previous_step_is_refreshed_instead_of_captured():
+    initial, refreshed = buttons_tree(), buttons_tree()
+    previous_trees: list[FakeTree] = []
+
+    def refresh(previous: FakeTree) -> FakeTree:
+        previous_trees.append(previous)
+        return refreshed
+
+    def capture() -> FakeTree:
+        raise AssertionError("Tree should not be captured from scratch")
+
+    executor = StepExecutor(
+        FakeClient({"first": [[1]], "second": [[2]], "third": [[3]]}),  # pyright: ignore[reportArgumentType]
+        FakeDriver(failures={}),  # pyright: ignore[reportArgumentType]
+        {"ClickTool": ClickTool},
+        capture,  # pyright: ignore[reportArgumentType]
+        delay=0,
+        refresh_accessibility_tree=refresh,  # pyright: ignore[reportArgumentType]
+    )
+    executor.execute("goal", "Plan", ["first", "second", "third"], initial)  # pyright: ignore[reportArgumentType]
+
+    assert previous_trees == [initial, refreshed]
+
+
+class FakeSelectDriver(FakeDriver):
+    def __init__(self):
+        super().__init__(failures={})
+        self.changes = 0
+
+    def click(self, id: int):
+        # Selecting an option sets a property without mutating the DOM, but fires a change event
+        # that the waiter counts towards the change token
+        super().click(id)
+        self.changes += 1
+
+
+def test_tree_is_captured_again_after_form_control_changes():
+    driver = FakeSelectDriver()
+    captured: list[FakeTree] = []
+
+    def capture() -> FakeTree:
+        tree = buttons_tree()
+        tree.change_token = f"document:{driver.changes}"
+        captured.append(tree)
+        return tree
+
+    def refresh(previous: FakeTree) -> FakeTree:
+        if previous.change_token == f"document:{driver.changes}":
+            return previous
+        return capture()
+
+    executor = StepExecutor(
+        FakeClient({"select": [[1]], "submit": [[2]]}),  # pyright: ignore[reportArgumentType]
+        driver,  # pyright: ignore[reportArgumentType]
+        {"ClickTool": ClickTool},
+        capture,  # pyright: ignore[reportArgumentType]
+        delay=0,
+        refresh_accessibility_tree=refresh,  # pyright: ignore[reportArgumentType]
+    )
+    executor.execute("goal", "Plan", ["select", "submit"], capture())  # pyright: ignore[reportArgumentType]
+
+    assert [tree.change_token for tree in captured] == ["document:0", "document:1"]
@@ -0,0 +1,39 @@
+from alumnium.timings import TimingStats, measure, phase, record, record_transfer
+
+
+def test_phases_are_recorded_only_within_measured_calls():
+    record("capture", 1.0)
+
+    with measure() as timings:
+        record("capture", 0.5)
+        record("capture", 0.25)
+        record_transfer(10, 20)
+
+    assert timings.durations == {"capture": 0.75}
+    assert (timings.bytes_sent, timings.bytes_received) == (10, 20)
+
+
+def test_nested_calls_count_towards_outer_calls():
+    with measure() as outer:
+        with measure() as inner:
+            with phase("execute"):
+                pass
+        record("request", 1.0)
+
+    assert set(inner.durations) == {"execute"}
+    assert set(outer.durations) == {"execute", "request"}
+
+
+def test_summary_aggregates_calls_by_kind():
+    stats = TimingStats()
+    for duration in (0.02, 0.3, 7.0):
+        with measure() as timings:
+            record("request", duration)
+        stats.add("do", timings)
+
+    summary = stats.summary()["do"]
+    assert summary["count"] == 3
+    assert summary["phases"]["request"]["max"] == 7.0
+    assert summary["phases"]["request"]["p50"] == 0.3
+    histogram = summary["phases"]["request"]["histogram"]
+    assert (histogram["0.05"], histogram["0.5"], histogram["10.0"], histogram["+Inf"]) == (1, 1, 1, 0)
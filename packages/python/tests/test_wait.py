@@ -0,0 +1,33 @@
+from pytest import raises
+
+from alumnium.drivers.page_state import PageState
+from alumnium.wait import poll_until
+from tests.fakes import FakeTree
+
+
+def capture_from(trees: list[str]):
+    def capture() -> PageState:
+        tree = trees.pop(0) if len(trees) > 1 else trees[0]
+        return PageState(title="Title", url="url", app="app", accessibility_tree=FakeTree(tree))
+
+    return capture
+
+
+def test_statement_is_evaluated_only_when_page_changes():
+    evaluated: list[str] = []
+
+    def retrieve(question: str, state: PageState):
+        evaluated.append(state.accessibility_tree.to_str())  # pyright: ignore[reportOptionalMemberAccess]
+        return "Explanation", state.accessibility_tree.to_str() == "<done/>"  # pyright: ignore[reportOptionalMemberAccess]
+
+    capture = capture_from(["<running/>", "<running/>", "<running/>", "<done/>"])
+    result = poll_until("job is done", capture, retrieve, timeout=10, delay=0.001)
+
+    assert evaluated == ["<running/>", "<done/>"]
+    assert (result.evaluations, result.polls) == (2, 4)
+    assert result.explanation == "Explanation"
+
+
+def test_timeout_raises_assertion_error():
+    with raises(AssertionError, match="Timed out after 0.05s"):
+        poll_until("job is done", capture_from(["<running/>"]), lambda *_: ("Not done", False), 0.05, delay=0.01)
@@ -89,6 +89,11 @@ export class HttpClient extends Client {
     props: Client.PlanActionsProps,
   ): Promise<Client.PlanActionsResult> {
     const { goal, accessibilityTree, app } = props;
+    if (!this.planner) {
+      // Without planner, the server makes the goal a single step,
+      // so the round trip is skipped and the actor is asked right away
+      return { explanation: goal, steps: [goal] };
+    }
     const body: PlanRequest = {
       goal,
       accessibility_tree: accessibilityTree,
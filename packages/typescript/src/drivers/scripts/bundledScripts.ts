@@ -1,7 +1,7 @@
 // This file is auto-generated by scripts/generate-bundles.ts. Do not edit it directly.
 
 export const waiterScriptSource =
-  '// @ts-check\n\n/// <reference lib="dom" />\n\n(() => {\n  /**\n   * @typedef {Element | HTMLAnchorElement | HTMLMediaElement | HTMLLinkElement | HTMLIFrameElement} ResourceElement\n   */\n\n  /**\n   * @typedef {Object} WaitState\n   * @property {number} pendingRequests\n   * @property {Set<string>} pendingUrls\n   * @property {Set<ResourceElement>} resources\n   * @property {number} activeAt\n   * @property {boolean} initialLoad\n   * @property {boolean} mutationIdle\n   * @property {ReturnType<typeof setTimeout> | null} mutationDebounceTimer\n   */\n  const symbol = Symbol.for("alumnium");\n  if (/** @type {any} */ (window)[symbol]) return;\n\n  const resourceTags = [\n    "img",\n    "video",\n    "audio",\n    "embed",\n    "object",\n    // "script" and "iframe" should be tracked only when "src" is set\n    // "link" should be tracked only when rel="stylesheet" and "href" is set\n  ];\n\n  /** @type {WaitState} */\n  const state = {\n    pendingRequests: 0,\n    pendingUrls: new Set(),\n    resources: new Set(),\n    activeAt: Date.now(),\n    initialLoad: false,\n    mutationIdle: true,\n    mutationDebounceTimer: null,\n  };\n\n  // Logging settings - can be enabled via options\n  let logEnabled = false;\n\n  /**\n   * @param {string} message\n   * @param {unknown=} data\n   */\n  function log(message, data) {\n    if (logEnabled) {\n      const dataStr = data ? " " + JSON.stringify(data) : "";\n      console.debug("[alumnium:waiter] " + message + dataStr);\n    }\n  }\n\n  function updateActiveAt() {\n    state.activeAt = Date.now();\n  }\n\n  trackInitialLoad();\n  observeDom();\n  trackExistingResources();\n  hookXHR();\n  hookFetch();\n\n  /** @type {any} */ (window)[symbol] = {\n    waitForStability,\n    state,\n  };\n\n  /**\n   * @typedef {Object} WaitForStabilityOptions\n   * @property {number=} idle\n   * @property {number=} timeout\n   * @property {boolean=} log\n   */\n\n  /**\n   *\n   * @param {WaitForStabilityOptions?} options\n   * @returns {Promise<void>}\n   */\n  function waitForStability(options) {\n    const idle = options?.idle ?? 500;\n    const timeout = options?.timeout ?? 10000;\n    logEnabled = options?.log ?? false;\n\n    // Reset the idle timer to ensure we wait at least the idle period from now\n    updateActiveAt();\n\n    log("waitForStability started", { idle, timeout });\n\n    return new Promise((resolve, reject) => {\n      const startTime = Date.now();\n      let lastLogged = startTime;\n\n      checkStability();\n\n      function checkStability() {\n        const now = Date.now();\n        const elapsed = now - startTime;\n\n        const noRequests = !state.pendingRequests;\n        const noResources = !state.resources.size;\n        const noMutations = state.mutationIdle;\n        const idleTime = now - state.activeAt;\n        const isIdle = idleTime >= idle;\n\n        // Log state every second\n        if (logEnabled && now - lastLogged >= 1000) {\n          const resourceInfo = Array.from(state.resources).map((el) => {\n            const tag = el.tagName?.toLowerCase() || "unknown";\n            const src =\n              ("src" in el && el.src) || ("href" in el && el.href) || "";\n            return `${tag}:${src.slice(0, 60)}`;\n          });\n          const pendingUrlsInfo = Array.from(state.pendingUrls).map((url) =>\n            url.slice(0, 80),\n          );\n\n          log("state check", {\n            elapsed: `${elapsed}ms`,\n            initialLoad: state.initialLoad,\n            pendingRequests: state.pendingRequests,\n            pendingUrls: pendingUrlsInfo,\n            resourcesCount: state.resources.size,\n            resources: resourceInfo.slice(0, 5),\n            mutationIdle: state.mutationIdle,\n            idleTime: `${idleTime}ms`,\n            isIdle,\n          });\n          lastLogged = now;\n        }\n\n        if (\n          state.initialLoad &&\n          noRequests &&\n          noResources &&\n          noMutations &&\n          isIdle\n        ) {\n          log("page stable", { elapsed: `${elapsed}ms` });\n          return resolve(void 0);\n        }\n\n        if (now - startTime >= timeout) {\n          const pendingUrlsInfo = Array.from(state.pendingUrls).map((url) =>\n            url.slice(0, 100),\n          );\n          const resourceInfo = Array.from(state.resources).map((el) => {\n            const tag = el.tagName?.toLowerCase() || "unknown";\n            const src =\n              ("src" in el && el.src) || ("href" in el && el.href) || "";\n            return `${tag}:${src.slice(0, 100)}`;\n          });\n\n          log("timeout", {\n            pendingRequests: state.pendingRequests,\n            pendingUrls: pendingUrlsInfo,\n            resourcesCount: state.resources.size,\n            resources: resourceInfo,\n            mutationIdle: state.mutationIdle,\n            initialLoad: state.initialLoad,\n          });\n\n          return reject(\n            new Error(\n              `Timed out waiting for page to stabilize after ${timeout}ms. ` +\n                `pendingRequests=${state.pendingRequests}, resources=${state.resources.size}, mutationIdle=${state.mutationIdle}`,\n            ),\n          );\n        }\n\n        requestAnimationFrame(checkStability);\n      }\n    });\n  }\n\n  //#region Resources\n\n  /**\n   * @param {ResourceElement} el\n   */\n  function trackResource(el) {\n    const tag = el.tagName.toLowerCase();\n    const src = ("src" in el && el.src) || ("href" in el && el.href) || "";\n\n    if ((tag === "video" || tag === "audio") && !src) {\n      return;\n    }\n\n    let isLoaded =\n      ("loading" in el && el.loading === "lazy") || // lazy loading\n      ("complete" in el && !!el.complete) || // img\n      ("readyState" in el &&\n        el.readyState >= HTMLMediaElement.HAVE_CURRENT_DATA) || // media\n      (tag === "link" && "sheet" in el && !!el.sheet); // CSS\n\n    if (tag === "iframe") {\n      const doc = "contentDocument" in el && el.contentDocument;\n      if (doc) {\n        isLoaded = doc.readyState === "complete";\n      } else {\n        // Cross-origin iframe; assume loaded\n        isLoaded = true;\n      }\n    }\n\n    if (isLoaded) return;\n\n    state.resources.add(el);\n    log("resource loading", {\n      tag,\n      src: (src || "(no src)").slice(0, 100),\n      total: state.resources.size,\n    });\n    updateActiveAt();\n\n    el.addEventListener("load", onDone);\n    el.addEventListener("error", onDone);\n\n    function onDone() {\n      el.removeEventListener("load", onDone);\n      el.removeEventListener("error", onDone);\n\n      state.resources.delete(el);\n      log("resource loaded", {\n        tag,\n        src: (src || "(no src)").slice(0, 100),\n        remaining: state.resources.size,\n      });\n      updateActiveAt();\n    }\n  }\n\n  function trackExistingResources() {\n    const selector = [\n      ...resourceTags,\n      // [NOTE] Do not track script tags, as it is not possible to determine if\n      // they are loaded or not:\n      // "script[src]",\n      "iframe[src]",\n      \'link[rel="stylesheet"][href]\',\n    ].join(",");\n    const resources = document.querySelectorAll(selector);\n    resources.forEach(trackResource);\n  }\n\n  function observeDom() {\n    const mutationDebounceMs = 400;\n\n    // Skip if documentElement is not available (e.g., about:blank)\n    if (!(document.documentElement instanceof Node)) {\n      return;\n    }\n\n    const observer = new MutationObserver((mutationList) => {\n      if (mutationList.length === 0) return;\n\n      // Track new resources\n      for (const mutation of mutationList) {\n        for (const node of mutation.addedNodes) {\n          if (!(node instanceof Element)) continue;\n          const tag = node.tagName.toLowerCase();\n          const isResource =\n            resourceTags.includes(tag) ||\n            (tag === "script" && "src" in node && !!node.src) ||\n            (tag === "iframe" && "src" in node && !!node.src) ||\n            (tag === "link" &&\n              "rel" in node &&\n              node.rel === "stylesheet" &&\n              "href" in node &&\n              !!node.href);\n          if (isResource) trackResource(node);\n        }\n      }\n\n      // Track mutation idle state with debouncing\n      if (state.mutationIdle) {\n        state.mutationIdle = false;\n        log("DOM mutations started");\n      }\n\n      if (state.mutationDebounceTimer) {\n        clearTimeout(state.mutationDebounceTimer);\n      }\n\n      state.mutationDebounceTimer = setTimeout(() => {\n        state.mutationIdle = true;\n        state.mutationDebounceTimer = null;\n        log("DOM mutations settled");\n        updateActiveAt();\n      }, mutationDebounceMs);\n\n      updateActiveAt();\n    });\n\n    observer.observe(document.documentElement, {\n      attributes: true,\n      childList: true,\n      characterData: true,\n      subtree: true,\n    });\n  }\n\n  function trackInitialLoad() {\n    if (document.readyState === "complete") {\n      state.initialLoad = true;\n    } else {\n      window.addEventListener("load", () => {\n        state.initialLoad = true;\n        updateActiveAt();\n      });\n    }\n  }\n\n  //#endregion\n\n  //#region Requests\n\n  function hookXHR() {\n    // oxlint-disable-next-line typescript/unbound-method\n    const nativeOpen = XMLHttpRequest.prototype.open;\n    // oxlint-disable-next-line typescript/unbound-method\n    const nativeSend = XMLHttpRequest.prototype.send;\n\n    /**\n     * @typedef {{ _alumniumUrl?: string }} XhrExtra\n     */\n\n    /**\n     * @this {XMLHttpRequest & XhrExtra}\n     * @param {string} method\n     * @param {string | URL} url\n     * @param {...any} rest\n     */\n    XMLHttpRequest.prototype.open = function (method, url, ...rest) {\n      this._alumniumUrl = String(url).slice(0, 200);\n      this.addEventListener("loadend", () => {\n        state.pendingRequests--;\n        state.pendingUrls.delete(this._alumniumUrl || "");\n        log("XHR complete", {\n          url: this._alumniumUrl,\n          pending: state.pendingRequests,\n        });\n        updateActiveAt();\n      });\n\n      // @ts-expect-error -- It is tricky to type\n      return nativeOpen.call(this, method, url, ...rest);\n    };\n\n    /**\n     * @this  {XMLHttpRequest & XhrExtra}\n     * @param {Document | XMLHttpRequestBodyInit | null} body\n     */\n    XMLHttpRequest.prototype.send = function (body) {\n      state.pendingRequests++;\n      state.pendingUrls.add(this._alumniumUrl || "");\n      log("XHR start", {\n        url: this._alumniumUrl,\n        pending: state.pendingRequests,\n      });\n      updateActiveAt();\n\n      return nativeSend.call(this, body);\n    };\n  }\n\n  function hookFetch() {\n    const nativeFetch = window.fetch.bind(window);\n\n    /**\n     * @param {RequestInfo | URL} input\n     * @returns {string}\n     */\n    function getFetchUrl(input) {\n      if (typeof input === "string") return input;\n      if (input instanceof URL) return input.href;\n      return input.url;\n    }\n\n    window.fetch = async function (input, ...args) {\n      const url = getFetchUrl(input).slice(0, 200);\n      state.pendingRequests++;\n      state.pendingUrls.add(url);\n      log("fetch start", { url, pending: state.pendingRequests });\n      updateActiveAt();\n\n      try {\n        return await nativeFetch(input, ...args);\n      } finally {\n        state.pendingRequests--;\n        state.pendingUrls.delete(url);\n        log("fetch complete", { url, pending: state.pendingRequests });\n        updateActiveAt();\n      }\n    };\n  }\n\n  //#endregion\n})();\n';
+  '// @ts-check\n\n/// <reference lib="dom" />\n\n(() => {\n  /**\n   * @typedef {Element | HTMLAnchorElement | HTMLMediaElement | HTMLLinkElement | HTMLIFrameElement} ResourceElement\n   */\n\n  /**\n   * @typedef {Object} WaitState\n   * @property {number} pendingRequests\n   * @property {Set<string>} pendingUrls\n   * @property {Set<ResourceElement>} resources\n   * @property {number} activeAt\n   * @property {boolean} initialLoad\n   * @property {boolean} mutationIdle\n   * @property {ReturnType<typeof setTimeout> | null} mutationDebounceTimer\n   * @property {string} documentId\n   * @property {number} changes\n   * @property {boolean} unobservedShadowRoots\n   */\n  const symbol = Symbol.for("alumnium");\n  if (/** @type {any} */ (window)[symbol]) return;\n\n  const resourceTags = [\n    "img",\n    "video",\n    "audio",\n    "embed",\n    "object",\n    // "script" and "iframe" should be tracked only when "src" is set\n    // "link" should be tracked only when rel="stylesheet" and "href" is set\n  ];\n\n  /** @type {WaitState} */\n  const state = {\n    pendingRequests: 0,\n    pendingUrls: new Set(),\n    resources: new Set(),\n    activeAt: Date.now(),\n    initialLoad: false,\n    mutationIdle: true,\n    mutationDebounceTimer: null,\n    // Together these tell whether the page may have changed since a tree capture\n    documentId: Math.random().toString(36).slice(2),\n    changes: 0,\n    // Closed shadow roots attached before the script was installed cannot be reached\n    unobservedShadowRoots: false,\n  };\n\n  // Logging settings - can be enabled via options\n  let logEnabled = false;\n\n  /**\n   * @param {string} message\n   * @param {unknown=} data\n   */\n  function log(message, data) {\n    if (logEnabled) {\n      const dataStr = data ? " " + JSON.stringify(data) : "";\n      console.debug("[alumnium:waiter] " + message + dataStr);\n    }\n  }\n\n  function updateActiveAt() {\n    state.activeAt = Date.now();\n  }\n\n  trackInitialLoad();\n  observeDom();\n  trackExistingResources();\n  hookXHR();\n  hookFetch();\n\n  /** @type {any} */ (window)[symbol] = {\n    waitForStability,\n    changeToken,\n    state,\n  };\n\n  /**\n   * @typedef {Object} WaitForStabilityOptions\n   * @property {number=} idle\n   * @property {number=} timeout\n   * @property {boolean=} log\n   */\n\n  /**\n   *\n   * @param {WaitForStabilityOptions?} options\n   * @returns {Promise<void>}\n   */\n  function waitForStability(options) {\n    const idle = options?.idle ?? 500;\n    const timeout = options?.timeout ?? 10000;\n    logEnabled = options?.log ?? false;\n\n    // Reset the idle timer to ensure we wait at least the idle period from now\n    updateActiveAt();\n\n    log("waitForStability started", { idle, timeout });\n\n    return new Promise((resolve, reject) => {\n      const startTime = Date.now();\n      let lastLogged = startTime;\n\n      checkStability();\n\n      function checkStability() {\n        const now = Date.now();\n        const elapsed = now - startTime;\n\n        const noRequests = !state.pendingRequests;\n        const noResources = !state.resources.size;\n        const noMutations = state.mutationIdle;\n        const idleTime = now - state.activeAt;\n        const isIdle = idleTime >= idle;\n\n        // Log state every second\n        if (logEnabled && now - lastLogged >= 1000) {\n          const resourceInfo = Array.from(state.resources).map((el) => {\n            const tag = el.tagName?.toLowerCase() || "unknown";\n            const src =\n              ("src" in el && el.src) || ("href" in el && el.href) || "";\n            return `${tag}:${src.slice(0, 60)}`;\n          });\n          const pendingUrlsInfo = Array.from(state.pendingUrls).map((url) =>\n            url.slice(0, 80),\n          );\n\n          log("state check", {\n            elapsed: `${elapsed}ms`,\n            initialLoad: state.initialLoad,\n            pendingRequests: state.pendingRequests,\n            pendingUrls: pendingUrlsInfo,\n            resourcesCount: state.resources.size,\n            resources: resourceInfo.slice(0, 5),\n            mutationIdle: state.mutationIdle,\n            idleTime: `${idleTime}ms`,\n            isIdle,\n          });\n          lastLogged = now;\n        }\n\n        if (\n          state.initialLoad &&\n          noRequests &&\n          noResources &&\n          noMutations &&\n          isIdle\n        ) {\n          log("page stable", { elapsed: `${elapsed}ms` });\n          return resolve(void 0);\n        }\n\n        if (now - startTime >= timeout) {\n          const pendingUrlsInfo = Array.from(state.pendingUrls).map((url) =>\n            url.slice(0, 100),\n          );\n          const resourceInfo = Array.from(state.resources).map((el) => {\n            const tag = el.tagName?.toLowerCase() || "unknown";\n            const src =\n              ("src" in el && el.src) || ("href" in el && el.href) || "";\n            return `${tag}:${src.slice(0, 100)}`;\n          });\n\n          log("timeout", {\n            pendingRequests: state.pendingRequests,\n            pendingUrls: pendingUrlsInfo,\n            resourcesCount: state.resources.size,\n            resources: resourceInfo,\n            mutationIdle: state.mutationIdle,\n            initialLoad: state.initialLoad,\n          });\n\n          return reject(\n            new Error(\n              `Timed out waiting for page to stabilize after ${timeout}ms. ` +\n                `pendingRequests=${state.pendingRequests}, resources=${state.resources.size}, mutationIdle=${state.mutationIdle}`,\n            ),\n          );\n        }\n\n        requestAnimationFrame(checkStability);\n      }\n    });\n  }\n\n  /**\n   * Returns a token that stays the same as long as the page does not change,\n   * or null if changes cannot be tracked, e.g. inside frames or closed shadow roots.\n   *\n   * @returns {string | null}\n   */\n  function changeToken() {\n    if (state.unobservedShadowRoots) return null;\n    if (document.querySelector("iframe, frame")) return null;\n    return `${state.documentId}:${state.changes}`;\n  }\n\n  //#region Resources\n\n  /**\n   * @param {ResourceElement} el\n   */\n  function trackResource(el) {\n    const tag = el.tagName.toLowerCase();\n    const src = ("src" in el && el.src) || ("href" in el && el.href) || "";\n\n    if ((tag === "video" || tag === "audio") && !src) {\n      return;\n    }\n\n    let isLoaded =\n      ("loading" in el && el.loading === "lazy") || // lazy loading\n      ("complete" in el && !!el.complete) || // img\n      ("readyState" in el &&\n        el.readyState >= HTMLMediaElement.HAVE_CURRENT_DATA) || // media\n      (tag === "link" && "sheet" in el && !!el.sheet); // CSS\n\n    if (tag === "iframe") {\n      const doc = "contentDocument" in el && el.contentDocument;\n      if (doc) {\n        isLoaded = doc.readyState === "complete";\n      } else {\n        // Cross-origin iframe; assume loaded\n        isLoaded = true;\n      }\n    }\n\n    if (isLoaded) return;\n\n    state.resources.add(el);\n    log("resource loading", {\n      tag,\n      src: (src || "(no src)").slice(0, 100),\n      total: state.resources.size,\n    });\n    updateActiveAt();\n\n    el.addEventListener("load", onDone);\n    el.addEventListener("error", onDone);\n\n    function onDone() {\n      el.removeEventListener("load", onDone);\n      el.removeEventListener("error", onDone);\n\n      state.resources.delete(el);\n      log("resource loaded", {\n        tag,\n        src: (src || "(no src)").slice(0, 100),\n        remaining: state.resources.size,\n      });\n      updateActiveAt();\n    }\n  }\n\n  function trackExistingResources() {\n    const selector = [\n      ...resourceTags,\n      // [NOTE] Do not track script tags, as it is not possible to determine if\n      // they are loaded or not:\n      // "script[src]",\n      "iframe[src]",\n      \'link[rel="stylesheet"][href]\',\n    ].join(",");\n    const resources = document.querySelectorAll(selector);\n    resources.forEach(trackResource);\n  }\n\n  function observeDom() {\n    const mutationDebounceMs = 400;\n\n    // Skip if documentElement is not available (e.g., about:blank)\n    if (!(document.documentElement instanceof Node)) {\n      return;\n    }\n\n    const observer = new MutationObserver((records) => {\n      // Elements are tagged by the drivers to locate them, which is not a change of the page\n      const mutationList = records.filter(\n        (mutation) =>\n          mutation.type !== "attributes" ||\n          !mutation.attributeName?.startsWith("data-alumnium-"),\n      );\n      if (mutationList.length === 0) return;\n      state.changes += mutationList.length;\n\n      // Track new resources\n      for (const mutation of mutationList) {\n        for (const node of mutation.addedNodes) {\n          if (!(node instanceof Element)) continue;\n          const tag = node.tagName.toLowerCase();\n          const isResource =\n            resourceTags.includes(tag) ||\n            (tag === "script" && "src" in node && !!node.src) ||\n            (tag === "iframe" && "src" in node && !!node.src) ||\n            (tag === "link" &&\n              "rel" in node &&\n              node.rel === "stylesheet" &&\n              "href" in node &&\n              !!node.href);\n          if (isResource) trackResource(node);\n        }\n      }\n\n      // Track mutation idle state with debouncing\n      if (state.mutationIdle) {\n        state.mutationIdle = false;\n        log("DOM mutations started");\n      }\n\n      if (state.mutationDebounceTimer) {\n        clearTimeout(state.mutationDebounceTimer);\n      }\n\n      state.mutationDebounceTimer = setTimeout(() => {\n        state.mutationIdle = true;\n        state.mutationDebounceTimer = null;\n        log("DOM mutations settled");\n        updateActiveAt();\n      }, mutationDebounceMs);\n\n      updateActiveAt();\n    });\n\n    const options = {\n      attributes: true,\n      childList: true,\n      characterData: true,\n      subtree: true,\n    };\n    observer.observe(document.documentElement, options);\n\n    // Mutations inside shadow roots are not reported to observers of the document\n    /**\n     * @param {Document | ShadowRoot} root\n     */\n    function observeShadowRoots(root) {\n      root.querySelectorAll("*").forEach((el) => {\n        if (el.shadowRoot) {\n          observer.observe(el.shadowRoot, options);\n          observeShadowRoots(el.shadowRoot);\n        } else if (customElements.get(el.localName)) {\n          // Custom elements may hide their content in closed shadow roots\n          state.unobservedShadowRoots = true;\n        }\n      });\n    }\n    observeShadowRoots(document);\n    // oxlint-disable-next-line typescript/unbound-method\n    const nativeAttachShadow = Element.prototype.attachShadow;\n    Element.prototype.attachShadow = function (init) {\n      const shadowRoot = nativeAttachShadow.call(this, init);\n      observer.observe(shadowRoot, options);\n      return shadowRoot;\n    };\n\n    // Hovering can reveal elements through CSS without mutating the DOM,\n    // and form controls change their checked, selected and value properties without mutating it either.\n    // Focus is part of the tree as well.\n    for (const type of ["mouseover", "input", "change", "focusin", "focusout"]) {\n      document.addEventListener(\n        type,\n        () => {\n          state.changes++;\n        },\n        { capture: true, passive: true },\n      );\n    }\n  }\n\n  function trackInitialLoad() {\n    if (document.readyState === "complete") {\n      state.initialLoad = true;\n    } else {\n      window.addEventListener("load", () => {\n        state.initialLoad = true;\n        updateActiveAt();\n      });\n    }\n  }\n\n  //#endregion\n\n  //#region Requests\n\n  function hookXHR() {\n    // oxlint-disable-next-line typescript/unbound-method\n    const nativeOpen = XMLHttpRequest.prototype.open;\n    // oxlint-disable-next-line typescript/unbound-method\n    const nativeSend = XMLHttpRequest.prototype.send;\n\n    /**\n     * @typedef {{ _alumniumUrl?: string }} XhrExtra\n     */\n\n    /**\n     * @this {XMLHttpRequest & XhrExtra}\n     * @param {string} method\n     * @param {string | URL} url\n     * @param {...any} rest\n     */\n    XMLHttpRequest.prototype.open = function (method, url, ...rest) {\n      this._alumniumUrl = String(url).slice(0, 200);\n      this.addEventListener("loadend", () => {\n        state.pendingRequests--;\n        state.pendingUrls.delete(this._alumniumUrl || "");\n        log("XHR complete", {\n          url: this._alumniumUrl,\n          pending: state.pendingRequests,\n        });\n        updateActiveAt();\n      });\n\n      // @ts-expect-error -- It is tricky to type\n      return nativeOpen.call(this, method, url, ...rest);\n    };\n\n    /**\n     * @this  {XMLHttpRequest & XhrExtra}\n     * @param {Document | XMLHttpRequestBodyInit | null} body\n     */\n    XMLHttpRequest.prototype.send = function (body) {\n      state.pendingRequests++;\n      state.pendingUrls.add(this._alumniumUrl || "");\n      log("XHR start", {\n        url: this._alumniumUrl,\n        pending: state.pendingRequests,\n      });\n      updateActiveAt();\n\n      return nativeSend.call(this, body);\n    };\n  }\n\n  function hookFetch() {\n    const nativeFetch = window.fetch.bind(window);\n\n    /**\n     * @param {RequestInfo | URL} input\n     * @returns {string}\n     */\n    function getFetchUrl(input) {\n      if (typeof input === "string") return input;\n      if (input instanceof URL) return input.href;\n      return input.url;\n    }\n\n    window.fetch = async function (input, ...args) {\n      const url = getFetchUrl(input).slice(0, 200);\n      state.pendingRequests++;\n      state.pendingUrls.add(url);\n      log("fetch start", { url, pending: state.pendingRequests });\n      updateActiveAt();\n\n      try {\n        return await nativeFetch(input, ...args);\n      } finally {\n        state.pendingRequests--;\n        state.pendingUrls.delete(url);\n        log("fetch complete", { url, pending: state.pendingRequests });\n        updateActiveAt();\n      }\n    };\n  }\n\n  //#endregion\n})();\n';
 
 export const waitForScriptSource =
   'const done = arguments[arguments.length - 1];\nconst args = Array.from(arguments).slice(0, -1);\nconst symbol = Symbol.for("alumnium");\n\nwindow[symbol]\n  .waitForStability(...args)\n  .then(done)\n  .catch((err) => done(err.message));\n';
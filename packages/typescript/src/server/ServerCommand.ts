@@ -43,6 +43,12 @@ export const ServerCommand = CliCommand.define({
         description: "Port to bind to",
       }),
 
+    socket: z.string().optional().register(CliCommand.option, {
+      name: "socket",
+      syntax: "--socket <path.sock>",
+      description: "Unix domain socket path to bind to instead of host and port",
+    }),
+
     daemon: z
       .union([z.boolean(), z.stringbool()])
       .default(false)
@@ -107,6 +113,7 @@ export const ServerCommand = CliCommand.define({
     const {
       host,
       port,
+      socket,
       daemon,
       daemonKill,
       daemonPid,
@@ -142,14 +149,14 @@ export const ServerCommand = CliCommand.define({
         process.exit(1);
       }
 
-      const healthy = await waitForHealth(host, port, pid, deadline);
+      const healthy = await waitForHealth(host, port, socket, pid, deadline);
       if (!healthy) {
         logger.error(
           `Server health check timed out after ${daemonWaitTimeout}ms`,
         );
         process.exit(1);
       }
-      logger.info(`Server is healthy at http://${host}:${port}/v1/health`);
+      logger.info(`Server is healthy at ${healthUrl(host, port, socket)}`);
       process.exit(0);
     }
 
@@ -170,6 +177,17 @@ export const ServerCommand = CliCommand.define({
 
     logger.debug("Starting server");
 
+    if (socket) {
+      // Stale socket files from killed servers prevent binding
+      removeSocketFileSync(socket);
+      process.on("exit", removeSocketFileSync.bind(null, socket));
+
+      serverApp.listen({ unix: socket }, () => {
+        logger.info(`Started at ${socket}`);
+      });
+      return;
+    }
+
     serverApp.listen({ hostname: host, port, reusePort: false }, (server) => {
       logger.info(`Started at http://${server.hostname}:${server.port}`);
     });
@@ -246,16 +264,29 @@ async function waitForPidFile(
   return null;
 }
 
+function healthUrl(
+  host: string,
+  port: number,
+  socket: string | undefined,
+): string {
+  return socket
+    ? `http://localhost/v1/health (${socket})`
+    : `http://${host}:${port}/v1/health`;
+}
+
 async function waitForHealth(
   host: string,
   port: number,
+  socket: string | undefined,
   pid: number,
   deadline: number,
 ): Promise<boolean> {
   while (Date.now() < deadline) {
     if (!isProcessRunning(pid)) return false;
     try {
-      const response = await fetch(`http://${host}:${port}/v1/health`);
+      const response = socket
+        ? await fetch("http://localhost/v1/health", { unix: socket })
+        : await fetch(`http://${host}:${port}/v1/health`);
       if (response.ok) return true;
     } catch {}
     await Bun.sleep(WAIT_POLL_INTERVAL_MS);
@@ -278,6 +309,12 @@ function removePidFileSync(pidPath: string) {
   } catch {}
 }
 
+function removeSocketFileSync(socketPath: string) {
+  try {
+    fsSync.rmSync(socketPath, { force: true });
+  } catch {}
+}
+
 async function readPid(pidPath: string): Promise<number | null> {
   const pidStr = await fs.readFile(pidPath, "utf-8").catch(() => {});
   const pid = pidStr && parseInt(pidStr.trim());
@@ -1,3 +1,4 @@
+import { context, propagation } from "@opentelemetry/api";
 import { Elysia } from "elysia";
 import { nanoid } from "nanoid";
 import { Logger } from "../telemetry/Logger.ts";
@@ -48,10 +49,17 @@ export abstract class ServerTelemetry {
         const contentType = ctx.request.headers.get("content-type");
         const contentLength = ctx.request.headers.get("content-length");
 
-        tracer.span(
-          "server.request",
-          { "http.request.method": ctx.request.method },
-          requestId,
+        // Continue traces started by clients that send W3C trace context headers
+        const parentContext = propagation.extract(
+          context.active(),
+          Object.fromEntries(ctx.request.headers),
+        );
+        context.with(parentContext, () =>
+          tracer.span(
+            "server.request",
+            { "http.request.method": ctx.request.method },
+            requestId,
+          ),
         );
 
         logger.debug(`-> ${this.#fmtSignature(ctx.request)}`);
@@ -61,11 +69,15 @@ export abstract class ServerTelemetry {
       .onAfterHandle((ctx) => {
         const { headers, status } = ctx.set;
         const requestId = ctx.store.telemetryRequestId;
+        const duration = this.#handlerDuration(ctx);
 
         tracer.end(requestId);
 
+        // Lets clients tell the server time from the network and transfer time
+        headers["server-timing"] = `handler;dur=${duration.toFixed(2)}`;
+
         logger.info(
-          `<- ${this.#fmtSignature(ctx.request)}: ${status} (${this.#fmtDuration(this.#handlerDuration(ctx))})`,
+          `<- ${this.#fmtSignature(ctx.request)}: ${status} (${this.#fmtDuration(duration)})`,
         );
         logger.debug(`  <- content-type: ${headers["content-type"] || "-"}`);
         logger.debug(
@@ -61,6 +61,14 @@ export class RetrieverAgent extends BaseAgent {
   static readonly EXCLUDE_ATTRIBUTES = new Set(["id"]);
   static readonly #LIST_SEPARATOR = "<SEP>";
 
+  // Clients may downscale screenshots to JPEG or WebP, so detect the format
+  // from the base64-encoded magic bytes instead of assuming PNG.
+  static #imageMediaType(screenshot: string): string {
+    if (screenshot.startsWith("/9j/")) return "image/jpeg";
+    if (screenshot.startsWith("UklGR")) return "image/webp";
+    return "image/png";
+  }
+
   chain;
 
   constructor(llmContext: LlmContext, llm: BaseChatModel) {
@@ -106,10 +114,11 @@ export class RetrieverAgent extends BaseAgent {
     const humanMessages: MessageContent = [{ type: "text", text: prompt }];
 
     if (screenshot) {
+      const mediaType = RetrieverAgent.#imageMediaType(screenshot);
       humanMessages.push({
         type: "image_url",
         image_url: {
-          url: `data:image/png;base64,${screenshot}`,
+          url: `data:${mediaType};base64,${screenshot}`,
         },
       });
     }
@@ -272,6 +272,30 @@ describe("serverApp", () => {
         result: "true",
       });
     });
+
+    it("accepts screenshot as multipart file", async () => {
+      const sessionId = await createSession();
+      const body = new FormData();
+      body.set("app", "test");
+      body.set("statement", "there is a submit button on the page");
+      body.set("accessibility_tree", sampleAccessibilityTree);
+      body.set("url", "https://example.com");
+      body.set("title", "Test Page");
+      body.set(
+        "screenshot",
+        new File([new Uint8Array([137, 80, 78, 71])], "screenshot"),
+      );
+      const response = await serverApp.handle(
+        new Request(`http://localhost/v1/sessions/${sessionId}/statements`, {
+          method: "POST",
+          body,
+        }),
+      );
+      expect(response.status).toBe(200);
+      expect(RetrieverAgent.prototype.invoke).toHaveBeenCalledWith(
+        expect.objectContaining({ screenshot: "iVBORw==" }),
+      );
+    });
   });
 
   describe("POST /sessions/:session_id/areas", () => {
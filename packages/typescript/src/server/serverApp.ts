@@ -234,7 +234,13 @@ export const serverApp = new Elysia({ prefix: "/v1" })
                 const accessibilityTree = session.processTree(
                   ctx.body.accessibility_tree,
                 );
-                const { statement, title, url, screenshot } = ctx.body;
+                const { statement, title, url } = ctx.body;
+                const screenshot =
+                  ctx.body.screenshot instanceof Blob
+                    ? Buffer.from(
+                        await ctx.body.screenshot.arrayBuffer(),
+                      ).toString("base64")
+                    : ctx.body.screenshot;
                 const treeXml = accessibilityTree.toXml(
                   new Set([
                     ...RetrieverAgent.EXCLUDE_ATTRIBUTES,
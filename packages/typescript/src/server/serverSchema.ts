@@ -126,7 +126,8 @@ export const ExecuteStatementBody = CacheableRequestBody.extend({
   accessibility_tree: z.string(),
   url: z.string().optional(),
   title: z.string().optional(),
-  screenshot: z.string().nullable().optional(),
+  // Base64 string in JSON bodies or raw image file in multipart bodies
+  screenshot: z.union([z.string(), z.instanceof(Blob)]).nullable().optional(),
 });
 
 export const ExecuteStatementResponse = z.object({